@@ -1,6 +1,6 @@
 # File: app/__init__.py
 from flask import Flask, send_from_directory
-from app.extensions import mysql, cors
+from app.extensions import cors
 import os
 from app.routes.keranjang_routes import keranjang_bp
 
@@ -29,12 +29,7 @@ def create_app(config_name=None):
     print(f"   MYSQL_PORT: {app.config.get('MYSQL_PORT')}")
     print("=" * 70)
     
-    # Initialize extensions
-    try:
-        mysql.init_app(app)
-        print("✅ MySQL initialized")
-    except Exception as e:
-        print(f"⚠️ MySQL init warning: {e}")
+    # MySQL tidak butuh extension: semua query lewat pool di app/config/database.py
     
     # CORS origins
     cors_origins = app.config.get('CORS_ORIGINS', '*')
@@ -65,6 +60,13 @@ def create_app(config_name=None):
         import traceback
         traceback.print_exc()
     
+    # Muat snapshot data master BI ke memori (per worker)
+    try:
+        from app.services import master_snapshot
+        master_snapshot.load()
+    except Exception as e:
+        print(f"⚠️ Master snapshot warning: {e}")
+    
     # Create upload folders
     os.makedirs('uploads/produk', exist_ok=True)
     os.makedirs('uploads/bukti_pembayaran', exist_ok=True)
@@ -1,6 +1,23 @@
+"""
+app/config/database.py
+Lapisan akses data MySQL (pymysql) untuk semua route dan service
+
+Semua query lewat pool koneksi per worker di modul ini:
+  - fetch_one / fetch_all       : SELECT satu statement, tanpa commit
+  - transaction()               : beberapa statement dalam satu transaksi,
+                                  commit kalau blok selesai, rollback kalau exception
+  - executemany                 : INSERT/UPDATE banyak baris per batch DB_BATCH_SIZE
+Setiap statement diukur waktunya (per bentuk SQL) untuk /test/db-pool.
+Baris dikembalikan sebagai dict (DictCursor).
+"""
+
 import pymysql
 import os
 import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 
 # Tambahkan root project ke sys.path
 root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
@@ -9,18 +26,8 @@ if root_path not in sys.path:
 
 from config import Config
 
-# DEBUG: Print config values
-print("="*50)
-print("DATABASE CONFIG DEBUG:")
-print(f"MYSQL_HOST: {Config.MYSQL_HOST}")
-print(f"MYSQL_USER: {Config.MYSQL_USER}")
-print(f"MYSQL_DB: {Config.MYSQL_DB}")
-print(f"MYSQL_PORT: {Config.MYSQL_PORT}")
-print(f"MYSQL_PASSWORD: {'*' * len(Config.MYSQL_PASSWORD) if Config.MYSQL_PASSWORD else 'NOT SET'}")
-print("="*50)
-
 def get_db_connection():
-    """Membuat koneksi database MySQL berdasarkan config"""
+    """Membuat koneksi database MySQL baru berdasarkan config (tanpa pool)"""
     try:
         connection = pymysql.connect(
             host=Config.MYSQL_HOST,
@@ -28,39 +35,413 @@ def get_db_connection():
             password=Config.MYSQL_PASSWORD,
             database=Config.MYSQL_DB,
             port=Config.MYSQL_PORT,
+            connect_timeout=Config.DB_CONNECT_TIMEOUT,
             cursorclass=pymysql.cursors.DictCursor
         )
-        print("✅ Database connection successful!")
         return connection
     except Exception as e:
         print("❌ DATABASE CONNECTION ERROR:", e)
         return None
 
+# -------------------------------------------------
+# 🔧 CONNECTION POOL
+# -------------------------------------------------
+
+class PoolTimeout(Exception):
+    """Tidak ada koneksi yang bisa dipinjam dalam DB_POOL_TIMEOUT"""
+
+
+class _PooledConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    Pool koneksi pymysql per worker process.
+      - size         : koneksi idle yang dipertahankan
+      - max_overflow : koneksi tambahan saat ramai, ditutup begitu dikembalikan
+      - timeout      : detik maksimal menunggu koneksi bebas (PoolTimeout)
+      - recycle      : umur maksimal koneksi (detik), lalu dibuka ulang
+      - ping_idle    : koneksi yang idle lebih lama dari ini di-ping saat dipinjam
+    Koneksi idle dipakai LIFO supaya yang paling hangat dipakai duluan.
+    """
+
+    def __init__(self, connect=get_db_connection, size: int = 5, max_overflow: int = 5,
+                 timeout: float = 10.0, recycle: float = 1800.0, ping_idle: float = 30.0):
+        self.connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_idle = ping_idle
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._in_use = 0
+        self._pid = os.getpid()
+        self._stats = {"checkouts": 0, "connections_opened": 0, "recycled": 0,
+                       "ping_failures": 0, "waits": 0, "timeouts": 0,
+                       "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    def _check_pid(self) -> None:
+        """Setelah fork (gunicorn), socket milik parent tidak boleh dipakai: buang tanpa close"""
+        if self._pid != os.getpid():
+            self._idle.clear()
+            self._in_use = 0
+            self._pid = os.getpid()
+
+    def _open(self) -> _PooledConnection:
+        conn = self.connect()
+        if conn is None:
+            raise pymysql.err.OperationalError("Koneksi database gagal")
+        with self._cond:
+            self._stats["connections_opened"] += 1
+        return _PooledConnection(conn)
+
+    @staticmethod
+    def _close(pooled: _PooledConnection) -> None:
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+
+    def _usable(self, pooled: _PooledConnection) -> bool:
+        """Cek umur dan liveness koneksi idle sebelum dipinjamkan"""
+        now = time.monotonic()
+        if now - pooled.created_at > self.recycle:
+            with self._cond:
+                self._stats["recycled"] += 1
+            return False
+        if now - pooled.last_used > self.ping_idle:
+            try:
+                pooled.conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._stats["ping_failures"] += 1
+                return False
+        return True
+
+    def acquire(self) -> _PooledConnection:
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            self._check_pid()
+            self._stats["checkouts"] += 1
+            while True:
+                if self._idle:
+                    pooled = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.size + self.max_overflow:
+                    pooled = None
+                    self._in_use += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"Tidak ada koneksi database bebas dalam {self.timeout}s "
+                                      f"({self._in_use} dipakai)")
+                waited = True
+                self._cond.wait(remaining)
+
+            if waited:
+                wait_ms = (time.monotonic() - started) * 1000
+                self._stats["waits"] += 1
+                self._stats["wait_ms_total"] += wait_ms
+                self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+
+        # Connect / ping di luar lock
+        try:
+            if pooled is not None and not self._usable(pooled):
+                self._close(pooled)
+                pooled = None
+            if pooled is None:
+                pooled = self._open()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return pooled
+
+    def release(self, pooled: _PooledConnection, broken: bool = False) -> None:
+        if not broken:
+            try:
+                # Transaksi yang tidak di-commit tidak boleh bocor ke peminjam berikutnya
+                pooled.conn.rollback()
+            except Exception:
+                broken = True
+
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            self._in_use -= 1
+            keep = not broken and len(self._idle) < self.size
+            if keep:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            self._cond.notify()
+        if not keep:
+            self._close(pooled)
+
+    @contextmanager
+    def connection(self):
+        """Pinjam koneksi; dikembalikan ke pool (atau ditutup kalau rusak) setelah blok selesai"""
+        pooled = self.acquire()
+        broken = False
+        try:
+            yield pooled.conn
+        except pymysql.err.OperationalError:
+            broken = True
+            raise
+        finally:
+            self.release(pooled, broken)
+
+    def stats(self) -> dict:
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "pid": os.getpid(),
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                **self._stats,
+                "wait_ms_total": round(self._stats["wait_ms_total"], 1),
+                "wait_ms_max": round(self._stats["wait_ms_max"], 1),
+                "wait_ms_avg": round(self._stats["wait_ms_total"] / checkouts, 2) if checkouts else 0.0
+            }
+
+
+pool = ConnectionPool(
+    size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_POOL_OVERFLOW,
+    timeout=Config.DB_POOL_TIMEOUT,
+    recycle=Config.DB_POOL_RECYCLE,
+    ping_idle=Config.DB_POOL_PING_IDLE
+)
+
+def pool_stats():
+    """Statistik pool koneksi database worker ini"""
+    return pool.stats()
+
+# -------------------------------------------------
+# 📊 STATISTIK PER STATEMENT
+# -------------------------------------------------
+
+class StatementStats:
+    """
+    Waktu eksekusi per bentuk SQL (whitespace dirapatkan, parameter tidak
+    ikut), dibatasi max_statements bentuk supaya SQL dinamis tidak membengkak.
+    Statement lebih lambat dari slow_ms dicetak ke log.
+    """
+
+    def __init__(self, max_statements: int = 200, slow_ms: float = 500.0):
+        self.max_statements = max_statements
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._by_sql = {}
+        self._totals = {"statements": 0, "errors": 0, "slow": 0, "ms_total": 0.0}
+
+    @staticmethod
+    def fingerprint(sql: str) -> str:
+        return " ".join(sql.split())
+
+    def record(self, sql: str, elapsed_ms: float, rows: int = 0, error: bool = False) -> None:
+        key = self.fingerprint(sql)
+        slow = elapsed_ms >= self.slow_ms
+        with self._lock:
+            self._totals["statements"] += 1
+            self._totals["ms_total"] += elapsed_ms
+            self._totals["errors"] += error
+            self._totals["slow"] += slow
+            entry = self._by_sql.get(key)
+            if entry is None:
+                if len(self._by_sql) >= self.max_statements:
+                    key = "(lainnya)"
+                    entry = self._by_sql.get(key)
+                if entry is None:
+                    entry = self._by_sql[key] = {"count": 0, "errors": 0, "rows": 0,
+                                                 "ms_total": 0.0, "ms_max": 0.0}
+            entry["count"] += 1
+            entry["errors"] += error
+            entry["rows"] += max(rows, 0)
+            entry["ms_total"] += elapsed_ms
+            entry["ms_max"] = max(entry["ms_max"], elapsed_ms)
+        if slow:
+            print(f"[DB] Query lambat {elapsed_ms:.0f} ms: {key[:200]}")
+
+    def snapshot(self, top: int = 20) -> dict:
+        """Total + top statement berdasarkan total waktu"""
+        with self._lock:
+            ranked = sorted(self._by_sql.items(), key=lambda kv: kv[1]["ms_total"], reverse=True)
+            return {
+                **self._totals,
+                "ms_total": round(self._totals["ms_total"], 1),
+                "slow_ms": self.slow_ms,
+                "top": [{
+                    "sql": sql[:300],
+                    **entry,
+                    "ms_total": round(entry["ms_total"], 1),
+                    "ms_max": round(entry["ms_max"], 1),
+                    "ms_avg": round(entry["ms_total"] / entry["count"], 2)
+                } for sql, entry in ranked[:top]]
+            }
+
+
+statements = StatementStats(slow_ms=Config.DB_SLOW_QUERY_MS)
+
+def statement_stats(top: int = 20):
+    """Statistik waktu per statement worker ini"""
+    return statements.snapshot(top)
+
+# -------------------------------------------------
+# 🔹 SESSION & TRANSAKSI
+# -------------------------------------------------
+
+class Session:
+    """
+    Pembungkus satu koneksi pinjaman dari pool. Semua statement lewat _run
+    supaya tercatat di StatementStats. lastrowid / rowcount mengikuti
+    statement terakhir.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = None
+        self.rowcount = 0
+
+    def _run(self, sql, params=None, many: bool = False):
+        started = time.perf_counter()
+        error = True
+        try:
+            with self.conn.cursor() as cursor:
+                if many:
+                    cursor.executemany(sql, params)
+                else:
+                    cursor.execute(sql, params)
+                rows = cursor.fetchall() if cursor.description else None
+                self.lastrowid, self.rowcount = cursor.lastrowid, cursor.rowcount
+            error = False
+            return rows
+        finally:
+            statements.record(sql, (time.perf_counter() - started) * 1000,
+                              -1 if error else self.rowcount, error)
+
+    def execute(self, sql, params=None) -> int:
+        """INSERT/UPDATE/DELETE; return jumlah baris yang terpengaruh"""
+        self._run(sql, params)
+        return self.rowcount
+
+    def fetch_one(self, sql, params=None):
+        rows = self._run(sql, params)
+        return rows[0] if rows else None
+
+    def fetch_all(self, sql, params=None) -> list:
+        return list(self._run(sql, params) or [])
+
+    def executemany(self, sql, seq_params, batch_size: int = None) -> int:
+        """
+        Jalankan sql untuk setiap parameter, per batch. pymysql menggabungkan
+        INSERT ... VALUES satu batch menjadi satu statement multi-baris.
+        Return: total baris yang terpengaruh
+        """
+        batch_size = batch_size or Config.DB_BATCH_SIZE
+        seq_params = list(seq_params)
+        total = 0
+        for i in range(0, len(seq_params), batch_size):
+            self._run(sql, seq_params[i:i + batch_size], many=True)
+            total += max(self.rowcount, 0)
+        return total
+
+    def commit(self) -> None:
+        started = time.perf_counter()
+        error = True
+        try:
+            self.conn.commit()
+            error = False
+        finally:
+            statements.record("COMMIT", (time.perf_counter() - started) * 1000, 0, error)
+
+
+@contextmanager
+def session():
+    """Session tanpa commit (untuk beberapa SELECT beruntun di satu koneksi)"""
+    with pool.connection() as conn:
+        yield Session(conn)
+
+
+@contextmanager
+def transaction():
+    """
+    Session dalam satu transaksi: commit kalau blok selesai tanpa exception.
+    Kalau ada exception, commit dilewati dan pool me-rollback koneksi saat
+    dikembalikan.
+    """
+    with pool.connection() as conn:
+        tx = Session(conn)
+        yield tx
+        tx.commit()
+
+
+def fetch_one(sql, params=None):
+    """SELECT satu baris (dict) atau None"""
+    with session() as s:
+        return s.fetch_one(sql, params)
+
+
+def fetch_all(sql, params=None) -> list:
+    """SELECT semua baris (list dict)"""
+    with session() as s:
+        return s.fetch_all(sql, params)
+
+
+def executemany(sql, seq_params, batch_size: int = None) -> int:
+    """executemany dalam satu transaksi"""
+    with transaction() as tx:
+        return tx.executemany(sql, seq_params, batch_size)
+
+# -------------------------------------------------
+# 🔹 QUERY HELPERS (kompatibilitas lama)
+# -------------------------------------------------
+
+def _borrow():
+    try:
+        return pool.acquire()
+    except Exception as e:
+        print("❌ DATABASE CONNECTION ERROR:", e)
+        return None
+
 def query(sql, params=None):
-    """SELECT query"""
-    conn = get_db_connection()
-    if not conn:
+    """SELECT query; None kalau koneksi gagal"""
+    pooled = _borrow()
+    if not pooled:
         return None
+    broken = False
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(sql, params)
-            result = cursor.fetchall()
-        return result
+        return Session(pooled.conn).fetch_all(sql, params)
+    except pymysql.err.OperationalError:
+        broken = True
+        raise
     finally:
-        conn.close()
+        pool.release(pooled, broken)
 
 def execute(sql, params=None):
-    """INSERT/UPDATE/DELETE"""
-    conn = get_db_connection()
-    if not conn:
+    """INSERT/UPDATE/DELETE; None kalau koneksi gagal, False kalau statement gagal"""
+    pooled = _borrow()
+    if not pooled:
         return None
+    broken = False
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(sql, params)
-        conn.commit()
+        tx = Session(pooled.conn)
+        tx.execute(sql, params)
+        tx.commit()
         return True
     except Exception as e:
+        broken = isinstance(e, pymysql.err.OperationalError)
         print("DATABASE EXECUTION ERROR:", e)
         return False
     finally:
-        conn.close()
\ No newline at end of file
+        pool.release(pooled, broken)
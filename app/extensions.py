@@ -1,7 +1,5 @@
 # app/extensions.py
-from flask_mysqldb import MySQL
 from flask_cors import CORS
 
 # Initialize extensions
-mysql = MySQL()
 cors = CORS()
\ No newline at end of file
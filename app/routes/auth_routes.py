@@ -1,10 +1,10 @@
 # File: app/routes/auth_routes.py
 
 from flask import Blueprint, request, jsonify
-import MySQLdb.cursors
 import bcrypt
-from app.extensions import mysql
+from app.config.database import fetch_one, transaction
 from app.services.otp_service import create_user_with_phone  # ← Import fungsi baru
+from app.services import session_token
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -22,21 +22,17 @@ def register():
     if not all([nama, email, password]):
         return jsonify({'message': 'Data tidak lengkap'}), 400
     
-    cursor = mysql.connection.cursor()
-    cursor.execute('SELECT * FROM users WHERE email = %s', (email,))
-    existing_user = cursor.fetchone()
+    existing_user = fetch_one('SELECT id FROM users WHERE email = %s', (email,))
     
     if existing_user:
-        cursor.close()
         return jsonify({'message': 'Email sudah terdaftar'}), 409
     
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-    cursor.execute(
-        'INSERT INTO users (nama, email, password, no_hp, alamat, role) VALUES (%s, %s, %s, %s, %s, %s)',
-        (nama, email, hashed_password.decode('utf-8'), no_hp, alamat, role)
-    )
-    mysql.connection.commit()
-    cursor.close()
+    with transaction() as tx:
+        tx.execute(
+            'INSERT INTO users (nama, email, password, no_hp, alamat, role) VALUES (%s, %s, %s, %s, %s, %s)',
+            (nama, email, hashed_password.decode('utf-8'), no_hp, alamat, role)
+        )
     
     return jsonify({'message': 'Registrasi berhasil!'}), 201
 
@@ -92,17 +88,16 @@ def login():
     if not all([email, password]):
         return jsonify({'message': 'Data tidak lengkap'}), 400
     
-    cursor = mysql.connection.cursor()
-    cursor.execute('SELECT * FROM users WHERE email = %s', (email,))
-    user = cursor.fetchone()
-    cursor.close()
+    user = fetch_one('SELECT * FROM users WHERE email = %s', (email,))
     
     if not user:
         return jsonify({'message': 'Email tidak ditemukan!'}), 404
     
     if bcrypt.checkpw(password.encode('utf-8'), user['password'].encode('utf-8')):
         user.pop('password')  # Hapus password dari response
-        return jsonify({'message': 'Login sukses!', 'user': user}), 200
+        token, expires_at = session_token.issue(user)
+        return jsonify({'message': 'Login sukses!', 'user': user,
+                        'token': token, 'token_expires_at': expires_at}), 200
     else:
         return jsonify({'message': 'Password salah!'}), 401
 
@@ -137,11 +132,7 @@ def login_phone():
         
         print(f"🔍 Formatted phone: {formatted_phone}")
         
-        # ✅ PERBAIKAN: Gunakan DictCursor
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        cursor.execute('SELECT * FROM users WHERE no_hp = %s', (formatted_phone,))
-        user = cursor.fetchone()
-        cursor.close()
+        user = fetch_one('SELECT * FROM users WHERE no_hp = %s', (formatted_phone,))
         
         if not user:
             print(f"❌ User not found")
@@ -195,12 +186,15 @@ def login_phone():
             
             if bcrypt.checkpw(password.encode('utf-8'), stored_password_bytes):
                 user.pop('password', None)
+                token, expires_at = session_token.issue(user)
                 print(f"✅ Login successful")
                 print(f"{'='*70}\n")
                 return jsonify({
                     'success': True,
                     'message': 'Login sukses!',
-                    'user': user
+                    'user': user,
+                    'token': token,
+                    'token_expires_at': expires_at
                 }), 200
             else:
                 print(f"❌ Password mismatch")
@@ -243,9 +237,7 @@ def login_phone():
 @auth_bp.route('/test-db', methods=['GET'])
 def test_db():
     try:
-        cursor = mysql.connection.cursor()
-        cursor.execute('SELECT 1')
-        cursor.close()
+        fetch_one('SELECT 1')
         return jsonify({'message': 'Database connected!'}), 200
     except Exception as e:
         return jsonify({'message': f'Database error: {str(e)}'}), 500
\ No newline at end of file
@@ -4,7 +4,8 @@ Routes untuk endpoint harga pangan
 """
 
 from flask import Blueprint, jsonify, request
-from app.services import bi_service
+from app.services import bi_service, bi_async, bi_client, downsample, master_snapshot, price_store
+from config import Config
 
 harga_bp = Blueprint('harga', __name__, url_prefix='/harga')
 
@@ -24,6 +25,8 @@ def harga():
         - start_date (str): Tanggal mulai YYYY-MM-DD (optional)
         - end_date (str): Tanggal akhir YYYY-MM-DD (optional)
         - commodity_filter (str): Filter nama komoditas (optional)
+        - stats (str): "1" untuk menambahkan statistik rolling 7/30 hari per komoditas (optional)
+        - periode (str): daily | weekly | monthly | quarterly (default: daily)
     
     Returns:
         JSON response dengan data harga
@@ -36,6 +39,8 @@ def harga():
     start_date = request.args.get('start_date', '')
     end_date = request.args.get('end_date', '')
     commodity_filter = request.args.get('commodity_filter', '')
+    with_stats = request.args.get('stats', '').lower() in ('1', 'true', 'yes')
+    periode = request.args.get('periode', 'daily')
     
     # Call service
     result = bi_service.get_harga_data(
@@ -44,7 +49,9 @@ def harga():
         price_type_id=price_type_id,
         start_date=start_date if start_date else None,
         end_date=end_date if end_date else None,
-        commodity_filter=commodity_filter if commodity_filter else None
+        commodity_filter=commodity_filter if commodity_filter else None,
+        with_stats=with_stats,
+        periode=periode
     )
     
     return jsonify(result)
@@ -89,6 +96,102 @@ def cabai():
     return jsonify(result)
 
 
+# -------------------------------------------------
+# 🔹 RUTE HARGA NASIONAL
+# -------------------------------------------------
+
+@harga_bp.route('/nasional', methods=['GET'])
+def nasional():
+    """
+    Endpoint untuk membandingkan harga di semua provinsi sekaligus
+    
+    Query Parameters:
+        - price_type_id (str): Jenis harga 1-4 (default: '1')
+        - commodity_filter (str): Filter nama komoditas (optional)
+        - deadline (float): Batas waktu dalam detik (optional, maks 60)
+    
+    Returns:
+        JSON response dengan matrix provinsi × komoditas,
+        provinsi yang timeout/gagal dilaporkan terpisah (hasil parsial)
+    """
+    price_type_id = request.args.get('price_type_id', '1')
+    commodity_filter = request.args.get('commodity_filter', '')
+    deadline = request.args.get('deadline', type=float)
+    
+    result = bi_service.get_harga_nasional(
+        price_type_id=price_type_id,
+        commodity_filter=commodity_filter if commodity_filter else None,
+        deadline=min(deadline, 60) if deadline else None
+    )
+    
+    return jsonify(result)
+
+
+@harga_bp.route('/regional', methods=['GET'])
+def regional():
+    """
+    Endpoint untuk membandingkan harga di semua kabupaten/kota satu provinsi
+    
+    Query Parameters:
+        - province_id (str): ID provinsi (default: '14')
+        - price_type_id (str): Jenis harga 1-4 (default: '1')
+        - commodity_filter (str): Filter nama komoditas (optional)
+        - deadline (float): Batas waktu dalam detik (optional, maks 60)
+    
+    Returns:
+        JSON response dengan matrix kabupaten × komoditas,
+        kabupaten yang timeout/gagal dilaporkan terpisah (hasil parsial)
+    """
+    commodity_filter = request.args.get('commodity_filter', '')
+    deadline = request.args.get('deadline', type=float)
+    
+    result = bi_service.get_harga_regional(
+        province_id=request.args.get('province_id', '14'),
+        price_type_id=request.args.get('price_type_id', '1'),
+        commodity_filter=commodity_filter if commodity_filter else None,
+        deadline=min(deadline, 60) if deadline else None
+    )
+    
+    return jsonify(result)
+
+
+@harga_bp.route('/series', methods=['GET'])
+def harga_series():
+    """
+    Endpoint seri harga harian untuk chart (format kolom)
+    
+    Query Parameters:
+        - province_id (str): ID provinsi (default: '14')
+        - regency_id (str): ID kabupaten/kota (optional)
+        - price_type_id (str): Jenis harga 1-4 (default: '1')
+        - start_date (str): Tanggal mulai YYYY-MM-DD (default: 1 tahun sebelum end_date)
+        - end_date (str): Tanggal akhir YYYY-MM-DD (default: hari ini)
+        - commodities (str): Daftar komoditas / kategori, pisah koma (optional)
+        - points (int): Target jumlah tanggal, minimal 4 (optional, tanpa downsampling)
+        - method (str): lttb | minmax (default: lttb)
+        - periode (str): daily | weekly | monthly | quarterly (default: daily)
+    
+    Returns:
+        JSON response dengan "dates" dan "prices" (satu array per komoditas di "commodities")
+    """
+    commodities = [c.strip() for c in request.args.get('commodities', '').split(',') if c.strip()]
+    points = request.args.get('points', type=int)
+    
+    result = bi_service.get_harga_series(
+        province_id=request.args.get('province_id', '14'),
+        regency_id=request.args.get('regency_id', ''),
+        price_type_id=request.args.get('price_type_id', '1'),
+        start_date=request.args.get('start_date') or None,
+        end_date=request.args.get('end_date') or None,
+        commodities=commodities or None,
+        points=min(max(points, downsample.MIN_POINTS), Config.SERIES_MAX_POINTS) if points and points > 0 else None,
+        method=request.args.get('method', 'lttb'),
+        periode=request.args.get('periode', 'daily')
+    )
+    
+    return jsonify(result)
+
+
 # -------------------------------------------------
 # 🔹 DATA MASTER
 # -------------------------------------------------
@@ -152,15 +255,51 @@ def price_types():
 @harga_bp.route('/tanggal', methods=['GET'])
 def tanggal():
     """
-    Endpoint untuk mendapatkan tanggal-tanggal yang tersedia
+    Endpoint untuk mendapatkan tanggal-tanggal yang punya data harga
+    
+    Query Parameters:
+        - province_id (str): ID provinsi (default: '14')
+        - regency_id (str): ID kabupaten/kota (optional)
+        - price_type_id (str): Jenis harga 1-4 (default: '1')
+        - date (str): YYYY-MM-DD, cari tanggal berdata terdekat <= date (optional)
+        - limit (int): Jumlah tanggal terbaru yang dikembalikan (default: 30, maks 366)
     
     Returns:
-        JSON response dengan list tanggal
+        JSON response dengan list tanggal (terbaru dulu), "nearest_date" kalau date diisi
     """
-    result = bi_service.get_latest_date()
+    limit = request.args.get('limit', 30, type=int)
+    
+    result = bi_service.get_latest_date(
+        province_id=request.args.get('province_id', '14'),
+        regency_id=request.args.get('regency_id', ''),
+        price_type_id=request.args.get('price_type_id', '1'),
+        on_or_before=request.args.get('date') or None,
+        limit=min(max(limit, 1), 366)
+    )
     return jsonify(result)
 
 
+@harga_bp.route('/stats', methods=['GET'])
+def stats():
+    """
+    Endpoint untuk statistik internal service harga (per worker)
+    
+    Returns:
+        JSON response dengan statistik connection pool, circuit breaker, client async, cache, single-flight dan status sel sync
+    """
+    return jsonify({
+        "success": True,
+        "pool": bi_client.pool_stats(),
+        "breaker": bi_client.breaker_stats(),
+        "async": bi_async.stats(),
+        "cache": bi_service.cache_stats(),
+        "singleflight": bi_service.singleflight_stats(),
+        "lookback": bi_service.lookback_stats(),
+        "master_snapshot": master_snapshot.stats(),
+        "sync_cells": price_store.sync_summary() if Config.PRICE_STORE_ENABLED else None
+    })
+
+
 @harga_bp.route('/test', methods=['GET'])
 def test_harga():
     """
@@ -175,11 +314,15 @@ def test_harga():
         "available_endpoints": [
             "GET /harga/",
             "GET /harga/cabai",
+            "GET /harga/nasional",
+            "GET /harga/regional",
+            "GET /harga/series",
             "GET /harga/provinces",
             "GET /harga/regencies?province_id=14",
             "GET /harga/commodities",
             "GET /harga/price-types",
             "GET /harga/tanggal",
+            "GET /harga/stats",
             "GET /harga/test"
         ]
     })
@@ -193,8 +336,14 @@ def clear_cache():
     """
     Endpoint untuk clear cache dan force refresh data
     
+    Query Parameters / JSON body:
+        - pattern (str): Glob key cache, contoh "harga:14:*" atau "*:14:*" (optional,
+          kosong = hapus semua)
+    
     Returns:
         JSON response dengan status clear cache
     """
-    result = bi_service.clear_cache()
+    body = request.get_json(silent=True) or {}
+    pattern = request.args.get('pattern') or body.get('pattern')
+    result = bi_service.clear_cache(pattern)
     return jsonify(result)
\ No newline at end of file
@@ -1,23 +1,11 @@
 # File: app/routes/keranjang_routes.py
 
 from flask import Blueprint, request, jsonify
-import MySQLdb.cursors
-from app.extensions import mysql
+from app.config.database import fetch_all, transaction
+from app.services.identity import get_current_user
 
 keranjang_bp = Blueprint('keranjang', __name__)
 
-# Helper function
-def get_current_user():
-    user_id = request.headers.get('X-User-Id')
-    if not user_id:
-        return None
-    
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-    cursor.execute('SELECT * FROM users WHERE id = %s', (user_id,))
-    user = cursor.fetchone()
-    cursor.close()
-    return user
-
 # ========== TAMBAH KE KERANJANG ==========
 @keranjang_bp.route('/keranjang', methods=['POST'])
 def tambah_keranjang():
@@ -39,55 +27,47 @@ def tambah_keranjang():
                 'message': 'Data tidak lengkap'
             }), 400
         
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        
-        # Cek produk exists & get harga
-        cursor.execute(
-            'SELECT harga_per_kg, stok FROM produk WHERE id = %s',
-            (produk_id,)
-        )
-        produk = cursor.fetchone()
-        
-        if not produk:
-            cursor.close()
-            return jsonify({
-                'success': False,
-                'message': 'Produk tidak ditemukan'
-            }), 404
-        
-        # Cek stok
-        if float(jumlah) > float(produk['stok']):
-            cursor.close()
-            return jsonify({
-                'success': False,
-                'message': f'Stok tidak cukup. Tersedia: {produk["stok"]} Kg'
-            }), 400
-        
-        # Cek apakah sudah ada di keranjang
-        cursor.execute(
-            'SELECT * FROM keranjang WHERE user_id = %s AND produk_id = %s',
-            (current_user['id'], produk_id)
-        )
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update jumlah
-            new_jumlah = float(existing['jumlah']) + float(jumlah)
-            cursor.execute(
-                'UPDATE keranjang SET jumlah = %s WHERE id = %s',
-                (new_jumlah, existing['id'])
+        with transaction() as tx:
+            # Cek produk exists & get harga
+            produk = tx.fetch_one(
+                'SELECT harga_per_kg, stok FROM produk WHERE id = %s',
+                (produk_id,)
             )
-        else:
-            # Insert baru
-            cursor.execute(
-                '''INSERT INTO keranjang 
-                   (user_id, produk_id, jumlah, harga_satuan) 
-                   VALUES (%s, %s, %s, %s)''',
-                (current_user['id'], produk_id, jumlah, produk['harga_per_kg'])
+            
+            if not produk:
+                return jsonify({
+                    'success': False,
+                    'message': 'Produk tidak ditemukan'
+                }), 404
+            
+            # Cek stok
+            if float(jumlah) > float(produk['stok']):
+                return jsonify({
+                    'success': False,
+                    'message': f'Stok tidak cukup. Tersedia: {produk["stok"]} Kg'
+                }), 400
+            
+            # Cek apakah sudah ada di keranjang
+            existing = tx.fetch_one(
+                'SELECT id, jumlah FROM keranjang WHERE user_id = %s AND produk_id = %s',
+                (current_user['id'], produk_id)
             )
-        
-        mysql.connection.commit()
-        cursor.close()
+            
+            if existing:
+                # Update jumlah
+                new_jumlah = float(existing['jumlah']) + float(jumlah)
+                tx.execute(
+                    'UPDATE keranjang SET jumlah = %s WHERE id = %s',
+                    (new_jumlah, existing['id'])
+                )
+            else:
+                # Insert baru
+                tx.execute(
+                    '''INSERT INTO keranjang 
+                       (user_id, produk_id, jumlah, harga_satuan) 
+                       VALUES (%s, %s, %s, %s)''',
+                    (current_user['id'], produk_id, jumlah, produk['harga_per_kg'])
+                )
         
         return jsonify({
             'success': True,
@@ -112,8 +92,6 @@ def get_keranjang():
                 'message': 'User tidak terautentikasi'
             }), 401
         
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        
         query = '''
             SELECT 
                 k.id as keranjang_id,
@@ -131,9 +109,7 @@ def get_keranjang():
             ORDER BY k.tanggal_ditambahkan DESC
         '''
         
-        cursor.execute(query, (current_user['id'],))
-        items = cursor.fetchall()
-        cursor.close()
+        items = fetch_all(query, (current_user['id'],))
         
         # Format data
         total = 0
@@ -181,15 +157,11 @@ def update_keranjang(keranjang_id):
                 'message': 'Jumlah tidak valid'
             }), 400
         
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        
-        cursor.execute(
-            'UPDATE keranjang SET jumlah = %s WHERE id = %s AND user_id = %s',
-            (jumlah, keranjang_id, current_user['id'])
-        )
-        
-        mysql.connection.commit()
-        cursor.close()
+        with transaction() as tx:
+            tx.execute(
+                'UPDATE keranjang SET jumlah = %s WHERE id = %s AND user_id = %s',
+                (jumlah, keranjang_id, current_user['id'])
+            )
         
         return jsonify({
             'success': True,
@@ -213,15 +185,11 @@ def hapus_keranjang(keranjang_id):
                 'message': 'User tidak terautentikasi'
             }), 401
         
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        
-        cursor.execute(
-            'DELETE FROM keranjang WHERE id = %s AND user_id = %s',
-            (keranjang_id, current_user['id'])
-        )
-        
-        mysql.connection.commit()
-        cursor.close()
+        with transaction() as tx:
+            tx.execute(
+                'DELETE FROM keranjang WHERE id = %s AND user_id = %s',
+                (keranjang_id, current_user['id'])
+            )
         
         return jsonify({
             'success': True,
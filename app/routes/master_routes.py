@@ -1,18 +1,29 @@
 # app/routes/master_routes.py
 from flask import Blueprint, jsonify, request
-from app.services.bi_service import get_provinces, get_commodities, get_regencies
+from app.services.bi_service import (
+    get_provinces, get_commodities, get_regencies, get_price_types, search_commodities
+)
 
 master_bp = Blueprint('master', __name__)
 
 @master_bp.route('/provinces')
 def provinces():
-    return get_provinces()
+    return jsonify(get_provinces())
 
 @master_bp.route('/commodities')
 def commodities():
-    return get_commodities()
+    return jsonify(get_commodities())
+
+@master_bp.route('/commodities/search')
+def commodities_search():
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    return jsonify(search_commodities(request.args.get('q', ''), limit))
 
 @master_bp.route('/regencies')
 def regencies():
-    return get_regencies(request)
+    return jsonify(get_regencies(request.args.get('province_id', '')))
+
+@master_bp.route('/price-types')
+def price_types():
+    return jsonify(get_price_types())
     
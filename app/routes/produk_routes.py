@@ -2,57 +2,35 @@
 
 from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename
-import MySQLdb.cursors
 import os
 from datetime import datetime
-from app.extensions import mysql
+from app.config.database import fetch_one, fetch_all, transaction
+from app.services import keyset
+from app.services.cache import make_cache
+from app.services.identity import get_current_user
+from config import Config
 
 produk_bp = Blueprint('produk', __name__)
 
+# Halaman katalog publik (popular / all-products), dipakai bersama semua worker;
+# di-invalidate setiap ada produk ditambah / diubah / dihapus
+_katalog_cache = make_cache(
+    "katalog",
+    maxsize=256,
+    ttl=Config.KATALOG_CACHE_TTL,
+    stale_ttl=Config.KATALOG_CACHE_TTL * 2
+)
+
 UPLOAD_FOLDER = 'uploads/produk'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-# ✅ HELPER FUNCTION YANG DIPERBAIKI
-def get_current_user():
-    """
-    Helper function untuk mendapatkan user yang sedang login
-    dari header X-User-Id
-    """
-    user_id = request.headers.get('X-User-Id')
-    
-    print(f"\n{'='*60}")
-    print(f"GET CURRENT USER")
-    print(f"{'='*60}")
-    print(f"X-User-Id from header: {user_id}")
-    
-    if not user_id:
-        print(f"❌ No X-User-Id in headers")
-        print(f"Headers: {dict(request.headers)}")
-        print(f"{'='*60}\n")
-        return None
-    
-    try:
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        cursor.execute('SELECT * FROM users WHERE id = %s', (user_id,))
-        user = cursor.fetchone()
-        cursor.close()
-        
-        if user:
-            print(f"✅ User found: {user.get('id')} - {user.get('nama')}")
-            print(f"   Role: {user.get('role')}")
-        else:
-            print(f"❌ User not found in database")
-        
-        print(f"{'='*60}\n")
-        return user
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        print(f"{'='*60}\n")
-        return None
+def _page_limit():
+    """Parameter limit halaman, dibatasi 1..PRODUK_PAGE_MAX"""
+    limit = request.args.get('limit', default=Config.PRODUK_PAGE_SIZE, type=int)
+    return max(1, min(limit, Config.PRODUK_PAGE_MAX))
 
 # ==================== CREATE ====================
 @produk_bp.route('/produk', methods=['POST'])
@@ -65,15 +43,12 @@ def tambah_produk():
         print("📥 REQUEST TAMBAH PRODUK")
         print("=" * 50)
         
-        # ✅ Debug headers
-        print("📋 Headers:", dict(request.headers))
-        
         # Get current user
         current_user = get_current_user()
         if not current_user:
             return jsonify({
                 'success': False,
-                'message': 'User tidak terautentikasi. Pastikan header X-User-Id dikirim.'
+                'message': 'User tidak terautentikasi. Kirim header Authorization: Bearer <token> dari login.'
             }), 401
 
         # Validasi role petani
@@ -169,26 +144,24 @@ def tambah_produk():
         deskripsi_lengkap = f"{deskripsi}\n\nJenis: {jenis_cabai}\nTingkat Kepedasan: {tingkat_kepedasan}\nKondisi: {kondisi}"
 
         # Simpan ke database
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
         query = """
             INSERT INTO produk 
             (id_petani, nama_produk, deskripsi, harga_per_kg, stok, foto, status_produk)
             VALUES (%s, %s, %s, %s, %s, %s, 'aktif')
         """
         
-        cursor.execute(query, (
-            current_user['id'],
-            nama_produk,
-            deskripsi_lengkap,
-            harga,
-            stok_kg,
-            foto_string
-        ))
-
-        mysql.connection.commit()
-        produk_id = cursor.lastrowid
-        cursor.close()
+        with transaction() as tx:
+            tx.execute(query, (
+                current_user['id'],
+                nama_produk,
+                deskripsi_lengkap,
+                harga,
+                stok_kg,
+                foto_string
+            ))
+            produk_id = tx.lastrowid
+
+        _katalog_cache.invalidate()
 
         print(f"✅ Produk berhasil ditambahkan dengan ID: {produk_id}")
         print("=" * 50)
@@ -225,14 +198,24 @@ def get_all_produk():
     - jenis_cabai: filter berdasarkan jenis
     - status: filter status (default: aktif)
     - petani_id: filter berdasarkan petani
+    - limit: jumlah per halaman (default PRODUK_PAGE_SIZE, maks PRODUK_PAGE_MAX)
+    - cursor: next_cursor / prev_cursor dari response sebelumnya
     """
     try:
         # Ambil query parameters
         jenis_cabai = request.args.get('jenis_cabai')
         status = request.args.get('status', 'aktif')
         petani_id = request.args.get('petani_id')
+        cursor = request.args.get('cursor')
+        limit = _page_limit()
 
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        try:
+            condition, seek_params, order_by, direction = keyset.seek('terbaru', cursor)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
 
         # Build query
         query = """
@@ -258,11 +241,16 @@ def get_all_produk():
             query += " AND p.id_petani = %s"
             params.append(petani_id)
 
-        query += " ORDER BY p.tanggal_upload DESC"
+        # Keyset: mulai setelah baris batas cursor, ambil satu ekstra untuk cek halaman berikutnya
+        if condition:
+            query += f" AND {condition}"
+            params.extend(seek_params)
+        query += f" ORDER BY {order_by} LIMIT %s"
+        params.append(limit + 1)
 
-        cursor.execute(query, params)
-        produk_list = cursor.fetchall()
-        cursor.close()
+        produk_list, next_cursor, prev_cursor = keyset.page(
+            'terbaru', cursor, direction, fetch_all(query, params), limit
+        )
 
         # Format data
         for produk in produk_list:
@@ -279,7 +267,10 @@ def get_all_produk():
         return jsonify({
             'success': True,
             'data': produk_list,
-            'total': len(produk_list)
+            'total': len(produk_list),
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor
         }), 200
 
     except Exception as e:
@@ -297,8 +288,6 @@ def get_produk_detail(produk_id):
     Endpoint untuk mendapatkan detail produk cabai
     """
     try:
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
         query = """
             SELECT p.*, 
                    u.nama as nama_petani,
@@ -313,9 +302,7 @@ def get_produk_detail(produk_id):
             WHERE p.id = %s
         """
 
-        cursor.execute(query, (produk_id,))
-        produk = cursor.fetchone()
-        cursor.close()
+        produk = fetch_one(query, (produk_id,))
 
         if not produk:
             return jsonify({
@@ -366,21 +353,16 @@ def update_produk(produk_id):
                 'message': 'User tidak terautentikasi'
             }), 401
 
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
         # Cek kepemilikan produk
-        cursor.execute("SELECT * FROM produk WHERE id = %s", (produk_id,))
-        produk = cursor.fetchone()
+        produk = fetch_one("SELECT * FROM produk WHERE id = %s", (produk_id,))
 
         if not produk:
-            cursor.close()
             return jsonify({
                 'success': False,
                 'message': 'Produk tidak ditemukan'
             }), 404
 
         if produk['id_petani'] != current_user['id'] and current_user['role'] != 'admin':
-            cursor.close()
             return jsonify({
                 'success': False,
                 'message': 'Anda tidak memiliki akses untuk mengubah produk ini'
@@ -505,7 +487,6 @@ def update_produk(produk_id):
             params.append(foto_string)
 
         if not update_fields:
-            cursor.close()
             return jsonify({
                 'success': False,
                 'message': 'Tidak ada data yang diupdate'
@@ -518,13 +499,13 @@ def update_produk(produk_id):
         print(f"🔄 Executing query: {query}")
         print(f"📊 Params: {params}")
         
-        cursor.execute(query, params)
-        mysql.connection.commit()
-        
-        # Get updated produk
-        cursor.execute("SELECT * FROM produk WHERE id = %s", (produk_id,))
-        updated_produk = cursor.fetchone()
-        cursor.close()
+        with transaction() as tx:
+            tx.execute(query, params)
+            
+            # Get updated produk
+            updated_produk = tx.fetch_one("SELECT * FROM produk WHERE id = %s", (produk_id,))
+
+        _katalog_cache.invalidate()
 
         print(f"✅ Produk berhasil diupdate!")
         print("=" * 50)
@@ -559,21 +540,16 @@ def delete_produk(produk_id):
                 'message': 'User tidak terautentikasi'
             }), 401
 
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
         # Cek kepemilikan produk
-        cursor.execute("SELECT * FROM produk WHERE id = %s", (produk_id,))
-        produk = cursor.fetchone()
+        produk = fetch_one("SELECT * FROM produk WHERE id = %s", (produk_id,))
 
         if not produk:
-            cursor.close()
             return jsonify({
                 'success': False,
                 'message': 'Produk tidak ditemukan'
             }), 404
 
         if produk['id_petani'] != current_user['id'] and current_user['role'] != 'admin':
-            cursor.close()
             return jsonify({
                 'success': False,
                 'message': 'Anda tidak memiliki akses untuk menghapus produk ini'
@@ -591,9 +567,9 @@ def delete_produk(produk_id):
                         print(f"⚠️ Gagal hapus foto: {e}")
 
         # Hapus dari database
-        cursor.execute("DELETE FROM produk WHERE id = %s", (produk_id,))
-        mysql.connection.commit()
-        cursor.close()
+        with transaction() as tx:
+            tx.execute("DELETE FROM produk WHERE id = %s", (produk_id,))
+        _katalog_cache.invalidate()
 
         print(f"✅ Produk ID {produk_id} berhasil dihapus")
 
@@ -634,15 +610,6 @@ def get_my_produk():
         #         'message': 'Endpoint ini hanya untuk petani'
         #     }), 403
         
-        print(f"\n{'='*60}")
-        print(f"GET MY PRODUK")
-        print(f"{'='*60}")
-        print(f"User ID: {current_user['id']}")
-        print(f"User role: {current_user.get('role')}")
-        print(f"User nama: {current_user.get('nama')}")
-        
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        
         # Query produk berdasarkan id_petani
         query = """
             SELECT * FROM produk 
@@ -650,14 +617,9 @@ def get_my_produk():
             ORDER BY tanggal_upload DESC
         """
         
-        print(f"Query: {query}")
-        print(f"Params: {current_user['id']}")
+        produk_list = fetch_all(query, (current_user['id'],))
         
-        cursor.execute(query, (current_user['id'],))
-        produk_list = cursor.fetchall()
-        cursor.close()
-        
-        print(f"✅ Found {len(produk_list)} products")
+        print(f"[Produk] get_my_produk user_id={current_user['id']}: {len(produk_list)} produk")
         
         # Format data
         for produk in produk_list:
@@ -669,8 +631,6 @@ def get_my_produk():
             produk['harga_per_kg'] = float(produk['harga_per_kg'])
             produk['stok'] = float(produk['stok'])
         
-        print(f"{'='*60}\n")
-        
         return jsonify({
             'success': True,
             'data': produk_list,
@@ -694,46 +654,13 @@ def get_popular_products():
     Untuk ditampilkan di homepage
     """
     try:
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        result, _ = _katalog_cache.get_or_load(
+            "popular", _load_popular_products, cacheable=lambda r: r['success']
+        )
 
-        query = """
-            SELECT p.*, 
-                   u.nama as nama_petani,
-                   u.no_hp as kontak_petani,
-                   t.nama_toko,
-                   t.alamat_toko,
-                   t.jasa_pengiriman
-            FROM produk p
-            LEFT JOIN users u ON p.id_petani = u.id
-            LEFT JOIN toko t ON u.id = t.id_user
-            WHERE p.status_produk = 'aktif'
-            ORDER BY p.tanggal_upload DESC
-            LIMIT 8
-        """
-
-        cursor.execute(query)
-        produk_list = cursor.fetchall()
-        cursor.close()
-
-        # Format data
-        for produk in produk_list:
-            # Split foto paths
-            if produk['foto']:
-                produk['foto'] = produk['foto'].split(',')
-            else:
-                produk['foto'] = []
+        print(f"✅ Popular products loaded: {result['total']} items")
 
-            # Format harga dan stok
-            produk['harga_per_kg'] = float(produk['harga_per_kg'])
-            produk['stok'] = float(produk['stok'])
-
-        print(f"✅ Popular products loaded: {len(produk_list)} items")
-
-        return jsonify({
-            'success': True,
-            'data': produk_list,
-            'total': len(produk_list)
-        }), 200
+        return jsonify(result), 200
 
     except Exception as e:
         print(f"❌ Error in get_popular_products: {str(e)}")
@@ -745,12 +672,51 @@ def get_popular_products():
         }), 500
 
 
+def _load_popular_products():
+    """Query produk populer (dipanggil kalau cache katalog miss)"""
+    query = """
+        SELECT p.*, 
+               u.nama as nama_petani,
+               u.no_hp as kontak_petani,
+               t.nama_toko,
+               t.alamat_toko,
+               t.jasa_pengiriman
+        FROM produk p
+        LEFT JOIN users u ON p.id_petani = u.id
+        LEFT JOIN toko t ON u.id = t.id_user
+        WHERE p.status_produk = 'aktif'
+        ORDER BY p.tanggal_upload DESC
+        LIMIT 8
+    """
+
+    produk_list = fetch_all(query)
+
+    # Format data
+    for produk in produk_list:
+        # Split foto paths
+        if produk['foto']:
+            produk['foto'] = produk['foto'].split(',')
+        else:
+            produk['foto'] = []
+
+        # Format harga dan stok
+        produk['harga_per_kg'] = float(produk['harga_per_kg'])
+        produk['stok'] = float(produk['stok'])
+
+    return {
+        'success': True,
+        'data': produk_list,
+        'total': len(produk_list)
+    }
+
+
 # ==================== ALL PRODUCTS (PUBLIC) ====================
 @produk_bp.route('/all-products', methods=['GET'])
 def get_all_products_public():
     """
     Endpoint untuk mendapatkan semua produk aktif dari semua petani
-    Untuk catalog/browse products
+    Untuk catalog/browse products, per halaman dengan cursor
+    (next_cursor / prev_cursor dari response sebelumnya)
     """
     try:
         # Ambil query parameters untuk filtering
@@ -758,72 +724,31 @@ def get_all_products_public():
         min_price = request.args.get('min_price')
         max_price = request.args.get('max_price')
         sort_by = request.args.get('sort_by', 'terbaru')  # terbaru, termurah, termahal
-        limit = int(request.args.get('limit', 20))
-
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-        # Build query
-        query = """
-            SELECT p.*, 
-                   u.nama as nama_petani,
-                   u.no_hp as kontak_petani,
-                   t.nama_toko,
-                   t.alamat_toko,
-                   t.jasa_pengiriman
-            FROM produk p
-            LEFT JOIN users u ON p.id_petani = u.id
-            LEFT JOIN toko t ON u.id = t.id_user
-            WHERE p.status_produk = 'aktif'
-        """
-        params = []
-
-        # Filter jenis cabai
-        if jenis_cabai:
-            query += " AND p.nama_produk LIKE %s"
-            params.append(f"%{jenis_cabai}%")
-
-        # Filter harga minimum
-        if min_price:
-            query += " AND p.harga_per_kg >= %s"
-            params.append(float(min_price))
-
-        # Filter harga maksimum
-        if max_price:
-            query += " AND p.harga_per_kg <= %s"
-            params.append(float(max_price))
-
-        # Sorting
-        if sort_by == 'termurah':
-            query += " ORDER BY p.harga_per_kg ASC"
-        elif sort_by == 'termahal':
-            query += " ORDER BY p.harga_per_kg DESC"
-        else:  # terbaru (default)
-            query += " ORDER BY p.tanggal_upload DESC"
-
-        # Limit
-        query += f" LIMIT {limit}"
+        if sort_by not in keyset.SORTS:
+            sort_by = 'terbaru'
+        cursor = request.args.get('cursor')
+        limit = _page_limit()
+        min_price = float(min_price) if min_price else None
+        max_price = float(max_price) if max_price else None
 
-        cursor.execute(query, params)
-        produk_list = cursor.fetchall()
-        cursor.close()
-
-        # Format data
-        for produk in produk_list:
-            if produk['foto']:
-                produk['foto'] = produk['foto'].split(',')
-            else:
-                produk['foto'] = []
+        try:
+            seek = keyset.seek(sort_by, cursor)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
 
-            produk['harga_per_kg'] = float(produk['harga_per_kg'])
-            produk['stok'] = float(produk['stok'])
+        key = f"all:{jenis_cabai or ''}:{min_price}:{max_price}:{sort_by}:{limit}:{cursor or ''}"
+        result, _ = _katalog_cache.get_or_load(
+            key,
+            lambda: _load_all_products(jenis_cabai, min_price, max_price, sort_by, limit, cursor, seek),
+            cacheable=lambda r: r['success']
+        )
 
-        print(f"✅ All products loaded: {len(produk_list)} items")
+        print(f"✅ All products loaded: {result['total']} items")
 
-        return jsonify({
-            'success': True,
-            'data': produk_list,
-            'total': len(produk_list)
-        }), 200
+        return jsonify(result), 200
 
     except Exception as e:
         print(f"❌ Error in get_all_products_public: {str(e)}")
@@ -832,4 +757,68 @@ def get_all_products_public():
         return jsonify({
             'success': False,
             'message': f'Error: {str(e)}'
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+def _load_all_products(jenis_cabai, min_price, max_price, sort_by, limit, cursor, seek):
+    """Query satu halaman katalog produk aktif (dipanggil kalau cache katalog miss)"""
+    condition, seek_params, order_by, direction = seek
+    # Build query
+    query = """
+        SELECT p.*, 
+               u.nama as nama_petani,
+               u.no_hp as kontak_petani,
+               t.nama_toko,
+               t.alamat_toko,
+               t.jasa_pengiriman
+        FROM produk p
+        LEFT JOIN users u ON p.id_petani = u.id
+        LEFT JOIN toko t ON u.id = t.id_user
+        WHERE p.status_produk = 'aktif'
+    """
+    params = []
+
+    # Filter jenis cabai
+    if jenis_cabai:
+        query += " AND p.nama_produk LIKE %s"
+        params.append(f"%{jenis_cabai}%")
+
+    # Filter harga minimum
+    if min_price is not None:
+        query += " AND p.harga_per_kg >= %s"
+        params.append(min_price)
+
+    # Filter harga maksimum
+    if max_price is not None:
+        query += " AND p.harga_per_kg <= %s"
+        params.append(max_price)
+
+    # Keyset + sorting: (tanggal_upload, id) untuk terbaru, (harga_per_kg, id) untuk termurah / termahal
+    if condition:
+        query += f" AND {condition}"
+        params.extend(seek_params)
+    query += f" ORDER BY {order_by} LIMIT %s"
+    params.append(limit + 1)
+
+    produk_list, next_cursor, prev_cursor = keyset.page(
+        sort_by, cursor, direction, fetch_all(query, params), limit
+    )
+
+    # Format data
+    for produk in produk_list:
+        if produk['foto']:
+            produk['foto'] = produk['foto'].split(',')
+        else:
+            produk['foto'] = []
+
+        produk['harga_per_kg'] = float(produk['harga_per_kg'])
+        produk['stok'] = float(produk['stok'])
+
+    return {
+        'success': True,
+        'data': produk_list,
+        'total': len(produk_list),
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor
+    }
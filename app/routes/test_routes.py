@@ -1,5 +1,5 @@
 # app/routes/test_routes.py
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 
 test_bp = Blueprint('test', __name__, url_prefix='/test')
 
@@ -10,3 +10,17 @@ def test():
         "message": "Flask backend modular berjalan!",
         "version": "1.0"
     })
+
+
+@test_bp.route('/db-pool')
+def db_pool():
+    """Statistik pool koneksi dan waktu per statement MySQL worker ini"""
+    from app.config.database import pool_stats, statement_stats
+    from app.services import identity
+    top = request.args.get('top', default=20, type=int)
+    return jsonify({
+        "success": True,
+        "pool": pool_stats(),
+        "statements": statement_stats(max(1, min(top, 100))),
+        "identity_cache": identity.stats()
+    })
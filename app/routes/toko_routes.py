@@ -7,8 +7,8 @@ from flask import Blueprint, jsonify, request
 from datetime import datetime
 import os
 from werkzeug.utils import secure_filename
-from app.extensions import mysql
-import MySQLdb.cursors
+from app.config.database import fetch_one, transaction
+from app.services import identity, session_token
 
 toko_bp = Blueprint('toko', __name__, url_prefix='/toko')
 
@@ -42,6 +42,13 @@ def daftar_toko():
         if len(nik) != 16 or not nik.isdigit():
             return jsonify({"success": False, "error": "NIK harus 16 digit angka"}), 400
 
+        # Hanya user itu sendiri yang boleh mendaftarkan tokonya (response berisi token baru)
+        current_user = identity.get_current_user()
+        if not current_user:
+            return jsonify({"success": False, "error": "User tidak terautentikasi"}), 401
+        if str(current_user['id']) != str(id_user):
+            return jsonify({"success": False, "error": "Tidak boleh mendaftarkan toko untuk user lain"}), 403
+
         # Upload KTP
         foto_ktp_path = None
         if 'foto_ktp' in request.files:
@@ -54,41 +61,41 @@ def daftar_toko():
                 file.save(filepath)
                 foto_ktp_path = filepath
 
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-        # Cek apakah user sudah punya toko
-        cursor.execute("SELECT id FROM toko WHERE id_user = %s", (id_user,))
-        if cursor.fetchone():
-            cursor.close()
-            return jsonify({"success": False, "error": "User sudah memiliki toko"}), 400
-
-        # Insert toko tanpa kolom status_verifikasi
-        cursor.execute("""
-            INSERT INTO toko (
+        with transaction() as tx:
+            # Cek apakah user sudah punya toko
+            if tx.fetch_one("SELECT id FROM toko WHERE id_user = %s", (id_user,)):
+                return jsonify({"success": False, "error": "User sudah memiliki toko"}), 400
+
+            # Insert toko tanpa kolom status_verifikasi
+            tx.execute("""
+                INSERT INTO toko (
+                    id_user, nama_toko, email_toko, alamat_toko,
+                    jasa_pengiriman, jenis_usaha, foto_ktp,
+                    nama_pemilik, nik
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
                 id_user, nama_toko, email_toko, alamat_toko,
-                jasa_pengiriman, jenis_usaha, foto_ktp,
+                jasa_pengiriman, jenis_usaha, foto_ktp_path,
                 nama_pemilik, nik
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            id_user, nama_toko, email_toko, alamat_toko,
-            jasa_pengiriman, jenis_usaha, foto_ktp_path,
-            nama_pemilik, nik
-        ))
-
-        toko_id = cursor.lastrowid
-
-        # Langsung ubah user jadi petani (tanpa verifikasi admin)
-        cursor.execute("""
-            UPDATE users
-            SET role = 'petani',
-                is_verified_seller = TRUE,
-                tanggal_jadi_petani = NOW()
-            WHERE id = %s
-        """, (id_user,))
-
-        mysql.connection.commit()
-        cursor.close()
+            ))
+
+            toko_id = tx.lastrowid
+
+            # Langsung ubah user jadi petani (tanpa verifikasi admin)
+            tx.execute("""
+                UPDATE users
+                SET role = 'petani',
+                    is_verified_seller = TRUE,
+                    tanggal_jadi_petani = NOW()
+                WHERE id = %s
+            """, (id_user,))
+
+        # Role berubah: identitas lama (pembeli) di cache dan token lama tidak boleh dipakai lagi
+        identity.invalidate(id_user)
+        token, expires_at = session_token.issue(
+            {"id": id_user, "role": "petani", "is_verified_seller": True}
+        )
 
         return jsonify({
             "success": True,
@@ -96,7 +103,9 @@ def daftar_toko():
             "data": {
                 "toko_id": toko_id,
                 "nama_toko": nama_toko
-            }
+            },
+            "token": token,
+            "token_expires_at": expires_at
         }), 201
 
     except Exception as e:
@@ -110,17 +119,13 @@ def daftar_toko():
 @toko_bp.route('/user/<int:user_id>', methods=['GET'])
 def get_toko_by_user(user_id):
     try:
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        cursor.execute("""
+        toko = fetch_one("""
             SELECT t.*, u.nama AS nama_user, u.no_hp
             FROM toko t
             JOIN users u ON t.id_user = u.id
             WHERE t.id_user = %s
         """, (user_id,))
 
-        toko = cursor.fetchone()
-        cursor.close()
-
         if not toko:
             return jsonify({"success": False, "error": "Toko tidak ditemukan"}), 404
 
@@ -136,16 +141,12 @@ def get_toko_by_user(user_id):
 @toko_bp.route('/check/<int:user_id>', methods=['GET'])
 def check_toko(user_id):
     try:
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        cursor.execute("""
+        toko = fetch_one("""
             SELECT id, nama_toko
             FROM toko
             WHERE id_user = %s
         """, (user_id,))
 
-        toko = cursor.fetchone()
-        cursor.close()
-
         return jsonify({
             "success": True,
             "has_toko": toko is not None,
@@ -0,0 +1,229 @@
+"""
+app/services/bi_async.py
+Client asyncio (httpx) untuk fan-out banyak request ke API BI dari satu worker
+
+Satu event loop per worker process berjalan di thread background. View Flask
+yang sync menjalankan coroutine di sana lewat run() dan menunggu hasilnya, jadi
+30+ request kabupaten cukup memakai satu thread worker dan kira-kira satu
+round trip. Concurrency dibatasi per host upstream (BI_ASYNC_MAX_PER_HOST),
+request yang belum selesai saat deadline dibatalkan, dan semua request lewat
+circuit breaker yang sama dengan bi_client.
+
+Parsing memakai lapisan yang sama dengan jalur sync (grid_stream +
+grid_transform). httpx opsional: kalau tidak terpasang, available() False dan
+caller kembali ke jalur thread pool.
+"""
+
+import asyncio
+import codecs
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from config import Config
+from app.services import bi_client, grid_stream, grid_transform
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_loop_lock = threading.Lock()
+
+# Hanya diakses dari thread event loop
+_client = None
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_in_flight = 0
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "errors": 0, "cancelled": 0, "max_in_flight": 0, "batches": 0}
+
+
+def available() -> bool:
+    """True kalau httpx terpasang dan client async tidak dimatikan lewat config"""
+    return httpx is not None and Config.BI_ASYNC_ENABLED
+
+
+def _count(field: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[field] += n
+
+# -------------------------------------------------
+# 🔧 EVENT LOOP & CLIENT
+# -------------------------------------------------
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop bersama untuk worker ini, dibuat ulang kalau PID berubah
+    (fork gunicorn): thread loop tidak ikut ter-fork.
+    """
+    global _loop, _loop_pid, _client
+
+    pid = os.getpid()
+    if _loop is None or _loop_pid != pid:
+        with _loop_lock:
+            if _loop is None or _loop_pid != pid:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="bi-async-loop", daemon=True).start()
+                _client = None
+                _semaphores.clear()
+                _loop, _loop_pid = loop, pid
+                print(f"[BI Async] Event loop dibuat (pid {pid}, "
+                      f"max_per_host={Config.BI_ASYNC_MAX_PER_HOST})")
+    return _loop
+
+
+def _get_client():
+    """AsyncClient bersama (keep-alive); dibuat di dalam event loop"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(Config.BI_READ_TIMEOUT, connect=Config.BI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=Config.BI_ASYNC_MAX_PER_HOST * Config.BI_POOL_CONNECTIONS,
+                                max_keepalive_connections=Config.BI_ASYNC_MAX_PER_HOST),
+            # Hanya retry gagal connect; retry status 5xx tidak muat dalam deadline fan-out
+            transport=httpx.AsyncHTTPTransport(retries=1)
+        )
+    return _client
+
+
+def _semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    sem = _semaphores.get(host)
+    if sem is None:
+        sem = _semaphores[host] = asyncio.Semaphore(Config.BI_ASYNC_MAX_PER_HOST)
+    return sem
+
+
+def run(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """
+    Jalankan coroutine di event loop bersama dan tunggu hasilnya (dipanggil
+    dari thread sync). Kalau timeout lewat, coroutine dibatalkan.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+# -------------------------------------------------
+# 🔹 REQUEST
+# -------------------------------------------------
+
+async def _request(url: str, params: Optional[Dict], consume: Callable[[Any], Awaitable[Any]]) -> Any:
+    """
+    GET dengan batas concurrency per host; consume membaca body selagi koneksi
+    dipegang. Semaphore diambil di luar circuit breaker, jadi antrean
+    concurrency tidak ikut dihitung sebagai latency upstream.
+    """
+    async def call():
+        global _in_flight
+        _in_flight += 1
+        with _stats_lock:
+            _stats["requests"] += 1
+            _stats["max_in_flight"] = max(_stats["max_in_flight"], _in_flight)
+        try:
+            async with _get_client().stream("GET", url, params=params) as r:
+                r.raise_for_status()
+                return await consume(r)
+        finally:
+            _in_flight -= 1
+
+    try:
+        async with _semaphore(url):
+            return await bi_client.guard_async(call)
+    except asyncio.CancelledError:
+        _count("cancelled")
+        raise
+    except Exception:
+        _count("errors")
+        raise
+
+
+async def fetch_matrix(province_id: str, regency_id: str, price_type_id: str,
+                       start_date: str, end_date: str,
+                       match=None) -> grid_transform.GridMatrix:
+    """
+    GetGridDataDaerah sebagai matrix komoditas × tanggal, sama seperti
+    bi_service._fetch_matrix: dengan BI_STREAM_GRID dibaca per chunk dan hanya
+    baris yang lolos match yang dijadikan dict.
+    """
+    params = bi_client.grid_params(province_id, regency_id, price_type_id, start_date, end_date)
+
+    async def consume(r):
+        if not Config.BI_STREAM_GRID:
+            await r.aread()
+            raw_data = r.json()
+            if isinstance(raw_data, dict) and 'data' in raw_data:
+                raw_data = raw_data['data']
+            if not isinstance(raw_data, list):
+                raise ValueError("Format data tidak sesuai")
+            return grid_transform.build_matrix(raw_data, match)
+
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        parser = grid_stream.GridStreamParser(match)
+        rows = []
+        async for chunk in r.aiter_bytes(Config.BI_STREAM_CHUNK_SIZE):
+            rows.extend(parser.feed(decoder.decode(chunk)))
+        rows.extend(parser.feed(decoder.decode(b"", final=True)))
+        parser.close()
+        return grid_transform.build_matrix(rows)
+
+    return await _request(f"{bi_client.BASE_URL}{bi_client.GRID_PATH}", params, consume)
+
+# -------------------------------------------------
+# 🔹 FAN-OUT DENGAN DEADLINE
+# -------------------------------------------------
+
+async def gather(jobs: Dict[str, Callable[[], Awaitable[Any]]],
+                 deadline: float) -> Tuple[Dict[str, Any], Dict[str, str], list]:
+    """
+    Jalankan semua job bersamaan sampai deadline (detik).
+    Job yang belum selesai saat deadline dibatalkan.
+    Return: (hasil per key, error per key, key yang timeout)
+    """
+    _count("batches")
+    tasks = {asyncio.ensure_future(factory()): key for key, factory in jobs.items()}
+    if not tasks:
+        return {}, {}, []
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+
+    results, errors = {}, {}
+    for task in done:
+        key = tasks[task]
+        if task.exception() is not None:
+            errors[key] = str(task.exception()) or type(task.exception()).__name__
+        else:
+            results[key] = task.result()
+    return results, errors, [tasks[t] for t in pending]
+
+
+def fan_out(jobs: Dict[str, Callable[[], Awaitable[Any]]],
+            deadline: float) -> Tuple[Dict[str, Any], Dict[str, str], list]:
+    """gather() dari thread sync (view Flask)"""
+    started = time.monotonic()
+    results, errors, timed_out = run(gather(jobs, deadline), timeout=deadline + 5)
+    print(f"[BI Async] Fan-out {len(results)}/{len(jobs)} dalam "
+          f"{(time.monotonic() - started) * 1000:.0f} ms (timeout: {len(timed_out)}, gagal: {len(errors)})")
+    return results, errors, timed_out
+
+
+def stats() -> Dict:
+    with _stats_lock:
+        return {
+            "available": available(),
+            "max_per_host": Config.BI_ASYNC_MAX_PER_HOST,
+            "in_flight": _in_flight,
+            **_stats
+        }
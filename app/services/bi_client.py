@@ -0,0 +1,177 @@
+"""
+app/services/bi_client.py
+HTTP client bersama (pooled) untuk API Bank Indonesia (PIHPS)
+
+Satu requests.Session per worker process, supaya koneksi keep-alive ke
+bi.go.id dipakai ulang antar request (tanpa DNS + TCP + TLS handshake baru).
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+__all__ = ["CircuitOpenError", "GRID_PATH", "grid_params", "get", "guard_async",
+           "get_session", "pool_stats", "breaker_stats"]
+
+BASE_URL = Config.BI_BASE_URL
+GRID_PATH = "/TabelHarga/GetGridDataDaerah"
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+# -------------------------------------------------
+# 🔧 CIRCUIT BREAKER
+# -------------------------------------------------
+
+def _probe() -> None:
+    """Cek ringan untuk half-open: endpoint jenis harga lewat session bersama, timeout pendek"""
+    r = get_session().get(f"{BASE_URL}/Home/GetType", timeout=Config.BI_PROBE_TIMEOUT)
+    r.raise_for_status()
+
+
+_breaker = CircuitBreaker(
+    "bi-upstream",
+    probe=_probe,
+    threshold=Config.BI_BREAKER_THRESHOLD,
+    latency_slo=Config.BI_BREAKER_LATENCY_SLO,
+    reset_timeout=Config.BI_BREAKER_RESET
+)
+
+# -------------------------------------------------
+# 🔧 SESSION
+# -------------------------------------------------
+
+def _build_session() -> requests.Session:
+    """
+    Buat session dengan retry mechanism dan connection pool per host.
+    Retry sengaja kecil (BI_RETRIES) dan read timeout tidak di-retry: satu
+    panggilan lewat circuit breaker paling lama ~connect + read timeout,
+    kegagalan berulang dihitung breaker, bukan ditahan di dalam urllib3.
+    """
+    session = requests.Session()
+
+    retry_strategy = Retry(
+        total=Config.BI_RETRIES,
+        read=False,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["HEAD", "GET", "OPTIONS"],
+        respect_retry_after_header=False
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=Config.BI_POOL_CONNECTIONS,
+        pool_maxsize=Config.BI_POOL_MAXSIZE,
+        max_retries=retry_strategy
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Ambil session bersama untuk worker ini.
+    Dibuat ulang kalau PID berubah (fork gunicorn), karena socket tidak
+    boleh dipakai bersama antar process.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+                print(f"[BI Client] Pooled session dibuat (pid {pid}, "
+                      f"pool_maxsize={Config.BI_POOL_MAXSIZE})")
+    return _session
+
+
+def get(path: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+    """
+    GET ke endpoint BI, path relatif terhadap BASE_URL.
+    Lewat circuit breaker: saat BI bermasalah langsung raise CircuitOpenError.
+    """
+    kwargs.setdefault("timeout", (Config.BI_CONNECT_TIMEOUT, Config.BI_READ_TIMEOUT))
+    session = get_session()
+    return _breaker.call(lambda: session.get(f"{BASE_URL}{path}", params=params, **kwargs))
+
+
+async def guard_async(fn):
+    """Jalankan coroutine upstream (client asyncio) lewat circuit breaker yang sama dengan get()"""
+    return await _breaker.call_async(fn)
+
+
+def grid_params(province_id: str, regency_id: str, price_type_id: str,
+                start_date: str, end_date: str) -> Dict:
+    """Parameter query GetGridDataDaerah"""
+    return {
+        "price_type_id": price_type_id,
+        "comcat_id": "",
+        "province_id": province_id,
+        "regency_id": regency_id,
+        "market_id": "",
+        "tipe_laporan": "1",
+        "start_date": start_date,
+        "end_date": end_date
+    }
+
+
+def breaker_stats() -> Dict:
+    return _breaker.stats()
+
+# -------------------------------------------------
+# 📊 STATISTIK POOL
+# -------------------------------------------------
+
+def pool_stats() -> Dict:
+    """
+    Statistik connection pool: berapa koneksi dibuka vs dipakai ulang.
+    connections_reused = requests - connections_opened
+    """
+    session = get_session()
+    manager = session.get_adapter(BASE_URL).poolmanager
+
+    pools = []
+    with manager.pools.lock:
+        keys = list(manager.pools.keys())
+
+    for key in keys:
+        pool = manager.pools.get(key)
+        if pool is None:
+            continue
+        opened = pool.num_connections
+        total_requests = pool.num_requests
+        pools.append({
+            "host": pool.host,
+            "port": pool.port,
+            "connections_opened": opened,
+            "connections_reused": max(total_requests - opened, 0),
+            "requests": total_requests,
+            # Queue pool diisi placeholder None, hanya hitung koneksi nyata
+            "idle_connections": sum(1 for c in list(pool.pool.queue) if c) if pool.pool else 0,
+            "pool_maxsize": Config.BI_POOL_MAXSIZE
+        })
+
+    total_opened = sum(p["connections_opened"] for p in pools)
+    total_requests = sum(p["requests"] for p in pools)
+
+    return {
+        "pid": os.getpid(),
+        "connections_opened": total_opened,
+        "connections_reused": max(total_requests - total_opened, 0),
+        "requests": total_requests,
+        "connect_timeout": Config.BI_CONNECT_TIMEOUT,
+        "read_timeout": Config.BI_READ_TIMEOUT,
+        "pools": pools
+    }
@@ -4,35 +4,55 @@ Service untuk mengakses API Bank Indonesia (PIHPS)
 FIXED: Date sorting untuk selalu ambil tanggal terbaru
 """
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, List, Tuple
 
-BASE_URL = "https://www.bi.go.id/hargapangan/WebSite"
+from config import Config
+from app.services import (
+    bi_async, bi_client, downsample, grid_stream, grid_transform, master_snapshot, price_rollups,
+    price_store
+)
+from app.services.cache import make_cache
+from app.services.commodity_index import CommodityIndex, normalize
+from app.services.singleflight import SingleFlight
+
+# Cache response /harga dan /harga/cabai (BI publish sekali sehari)
+_harga_cache = make_cache(
+    "harga",
+    maxsize=Config.HARGA_CACHE_MAXSIZE,
+    ttl=Config.HARGA_CACHE_TTL,
+    stale_ttl=Config.HARGA_CACHE_STALE_TTL
+)
+
+# Hasil sukses terakhir per key; disajikan (stale) kalau BI gagal / circuit open
+_last_good = make_cache(
+    "harga-last-good",
+    maxsize=Config.HARGA_CACHE_MAXSIZE,
+    ttl=Config.LAST_GOOD_TTL,
+    stale_ttl=Config.LAST_GOOD_TTL
+)
+
+# Fetch upstream identik yang berjalan bersamaan digabung jadi satu
+_upstream_flight = SingleFlight("bi-upstream")
+
+# Periode agregasi: "daily" = harga harian apa adanya, sisanya dari price_rollups
+PERIODE_DAILY = "daily"
+PERIODES = (PERIODE_DAILY,) + price_rollups.PERIODS
+
+# Jendela look-back (hari) yang terakhir cukup, per (province, regency, price_type)
+_lookback_memory: Dict[Tuple[str, str, str], int] = {}
+
+# Index tree komoditas, dibangun ulang hanya kalau snapshot komoditas berganti
+_commodity_index: Optional[CommodityIndex] = None
+_commodity_source = None
 
 # -------------------------------------------------
 # 🔧 HELPER FUNCTIONS
 # -------------------------------------------------
 
-def create_session():
-    """Buat session dengan retry mechanism"""
-    session = requests.Session()
-    
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["HEAD", "GET", "OPTIONS"]
-    )
-    
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    
-    return session
-
 def _date_sort_key(date_str: str) -> str:
     """
     ✅ FUNGSI BARU: Convert DD/MM/YYYY atau D/M/YYYY ke YYYY-MM-DD untuk sorting
@@ -85,6 +105,367 @@ def _calculate_trend(current_price: float, prev_price: float) -> tuple:
     
     return trend, round(price_change, 2)
 
+def _iso_to_display(iso_date: Optional[str]) -> Optional[str]:
+    """Convert YYYY-MM-DD ke DD/MM/YYYY; semua tanggal ke client lewat sini supaya formatnya seragam"""
+    if not iso_date:
+        return None
+    year, month, day = iso_date.split('-')
+    return f"{day}/{month}/{year}"
+
+def _build_item(commodity_name: str, latest_price: float,
+                latest_date: str, prev_price: Optional[float]) -> Dict:
+    """Susun satu item response harga (format sama untuk /harga dan /harga/cabai)"""
+    trend, price_change = _calculate_trend(latest_price, prev_price or latest_price)
+    return {
+        "commodity": commodity_name.strip(),
+        "price": latest_price,
+        "trend": trend,
+        "price_change": price_change,
+        "latest_date": latest_date
+    }
+
+# -------------------------------------------------
+# 🔧 FETCH GRID & PRICE STORE
+# -------------------------------------------------
+
+def _fetch_json(path: str, params: Optional[Dict] = None):
+    """
+    GET ke BI lalu parse JSON, digabung (single-flight) dengan caller lain
+    yang meminta path + params yang sama pada saat bersamaan.
+    Hasil dipakai bersama, jangan diubah oleh caller.
+    """
+    key = path + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+
+    def fetch():
+        r = bi_client.get(path, params=params)
+        r.raise_for_status()
+        return r.json()
+
+    return _upstream_flight.do(key, fetch)
+
+def _fetch_matrix(province_id: str, regency_id: str, price_type_id: str,
+                  start_date: str, end_date: str,
+                  match=None, match_key: Optional[str] = None) -> grid_transform.GridMatrix:
+    """
+    Ambil GetGridDataDaerah dari BI sebagai matrix komoditas × tanggal.
+    Dengan BI_STREAM_GRID, response dibaca per chunk dan hanya baris yang
+    lolos match yang pernah dijadikan dict (satu baris per waktu).
+    match_key: identitas filter match, bagian dari key single-flight.
+    """
+    params = bi_client.grid_params(province_id, regency_id, price_type_id, start_date, end_date)
+    path = bi_client.GRID_PATH
+
+    def fetch():
+        print(f"[BI Service] Fetching grid from BI API...")
+        print(f"[BI Service] Province: {province_id}, Regency: {regency_id}, Price Type: {price_type_id}")
+        print(f"[BI Service] Date range: {start_date} to {end_date}")
+
+        if Config.BI_STREAM_GRID:
+            r = bi_client.get(path, params=params, stream=True)
+            try:
+                r.raise_for_status()
+                rows = grid_stream.iter_rows(r.iter_content(Config.BI_STREAM_CHUNK_SIZE), keep=match)
+                return grid_transform.build_matrix(rows)
+            finally:
+                r.close()
+
+        r = bi_client.get(path, params=params)
+        r.raise_for_status()
+        raw_data = r.json()
+        if isinstance(raw_data, dict) and 'data' in raw_data:
+            raw_data = raw_data['data']
+        if not isinstance(raw_data, list):
+            raise ValueError("Format data tidak sesuai")
+        return grid_transform.build_matrix(raw_data, match)
+
+    flight_key = f"grid:{province_id}:{regency_id}:{price_type_id}:{start_date}:{end_date}:{match_key or '*'}"
+    return _upstream_flight.do(flight_key, fetch)
+
+def _grid_to_points(matrix: grid_transform.GridMatrix) -> Tuple[List[Tuple[str, str, float]], List[str], Optional[str]]:
+    """
+    Ubah matrix grid jadi titik (commodity, tanggal ISO, harga) untuk price store.
+    Return: (points, urutan komoditas, tanggal terakhir yang punya harga)
+    """
+    points = list(grid_transform.iter_points(matrix))
+    order = [name.strip() for name in matrix.names]
+    last_iso = max((tanggal for _, tanggal, _ in points), default=None)
+    return points, order, last_iso
+
+def _lookback_windows(key: Tuple[str, str, str]):
+    """Ukuran jendela (hari) yang dicoba: mulai dari yang diingat, lalu membesar geometris"""
+    days = _lookback_memory.get(key, Config.LOOKBACK_MIN_DAYS)
+    while True:
+        yield days
+        if days >= Config.LOOKBACK_MAX_DAYS:
+            return
+        days = min(days * Config.LOOKBACK_FACTOR, Config.LOOKBACK_MAX_DAYS)
+
+def _fetch_latest(key: Tuple[str, str, str], match=None,
+                  match_key: Optional[str] = None) -> Tuple[List[Dict], List[Tuple[str, str, grid_transform.GridMatrix]]]:
+    """
+    Cari harga terbaru + sebelumnya dengan jendela look-back adaptif.
+    Jendela pendek dulu (LOOKBACK_MIN_DAYS); kalau masih ada komoditas tanpa
+    harga terbaru / sebelumnya, hanya segmen yang lebih lama yang diambil
+    berikutnya, dan hanya komoditas yang belum lengkap yang diisi dari situ.
+    Jendela terkecil yang cukup diingat per (province, regency, price_type).
+    Return: (baris latest per komoditas sesuai urutan grid (latest_date YYYY-MM-DD), (start, end, matrix) setiap segmen)
+    """
+    today = datetime.now()
+    latest: Dict[str, Dict] = {}
+    order: List[str] = []
+    seen = set()
+    segments = []
+    complete_at = []        # (days, jumlah komoditas lengkap) per jendela
+    fetched_days = -1       # hari ke belakang yang sudah diambil (-1 = belum ada)
+
+    for days in _lookback_windows(key):
+        start = (today - timedelta(days=days)).strftime('%Y-%m-%d')
+        end = (today - timedelta(days=fetched_days + 1)).strftime('%Y-%m-%d')
+        matrix = _fetch_matrix(*key, start, end, match=match, match_key=match_key)
+        segments.append((start, end, matrix))
+        fetched_days = days
+
+        found = {}
+        for row_idx, latest_col, latest_price, prev_price in grid_transform.latest_and_previous(matrix):
+            found[matrix.names[row_idx].strip()] = (matrix.dates[latest_col], latest_price, prev_price)
+
+        for raw_name in matrix.names:
+            name = raw_name.strip()
+            if name not in seen:
+                seen.add(name)
+                order.append(name)
+            current = latest.get(name)
+            older = found.get(name)
+            if older is None:
+                continue
+            if current is None:
+                latest[name] = {"commodity": name, "latest_date": older[0],
+                                "price": older[1], "prev_price": older[2]}
+            elif current["prev_price"] is None:
+                # Harga terbaru di segmen lama = harga sebelumnya
+                current["prev_price"] = older[1]
+
+        complete = sum(1 for item in latest.values() if item["prev_price"] is not None)
+        complete_at.append((days, complete))
+        if complete == len(order):
+            break
+
+    # Ingat jendela terkecil yang sudah menghasilkan semua komoditas yang bisa dilengkapi
+    final_complete = complete_at[-1][1]
+    _lookback_memory[key] = next(d for d, c in complete_at if c == final_complete)
+
+    windows = ", ".join(f"{d}h" for d, _ in complete_at)
+    print(f"[BI Service] Look-back {key}: jendela {windows}, "
+          f"lengkap {final_complete}/{len(order)}, diingat {_lookback_memory[key]}h")
+
+    return [latest[name] for name in order if name in latest], segments
+
+def lookback_stats() -> Dict:
+    """Jendela look-back yang diingat per province:regency:price_type"""
+    return {":".join(key): days for key, days in _lookback_memory.items()}
+
+def _ingest_ranges(key: Tuple[str, str, str],
+                   segments: List[Tuple[str, str, grid_transform.GridMatrix]]) -> Tuple[int, Optional[str]]:
+    """Ingest matrix per rentang yang diminta (status sel ikut dicatat). Return: (titik, tanggal terakhir)"""
+    written = 0
+    last_iso = None
+    for start, end, matrix in segments:
+        points, order, segment_last = _grid_to_points(matrix)
+        written += price_store.ingest(key, points, order, fetched=(start, end))
+        if segment_last and (last_iso is None or segment_last > last_iso):
+            last_iso = segment_last
+    return written, last_iso
+
+def _fetch_planned(key: Tuple[str, str, str], start_date: str, end_date: str) -> Tuple[int, Optional[str], List[Tuple[str, str]]]:
+    """Ambil hanya rentang yang direncanakan sync_plan untuk [start_date, end_date]"""
+    ranges = price_store.plan_sync(key, start_date, end_date)
+    segments = [(start, end, _fetch_matrix(*key, start, end)) for start, end in ranges]
+    written, last_iso = _ingest_ranges(key, segments)
+    return written, last_iso, ranges
+
+def _sync_price_store(key: Tuple[str, str, str]) -> Optional[str]:
+    """
+    Sinkronisasi harga terbaru satu seri (province, regency, price_type).
+    Seri baru: jendela look-back adaptif. Berikutnya: hanya sel yang perlu
+    diambil sejak tanggal terakhir tersimpan / SYNC_SETTLE_DAYS terakhir
+    (hari yang masih bisa direvisi BI, tombstone kosong yang jatuh tempo).
+    Return: pesan error kalau sinkronisasi gagal, None kalau sukses / masih fresh
+    """
+    state = price_store.get_sync_state(key)
+    if price_store.is_fresh(state):
+        return None
+
+    try:
+        if state and state.get("last_date"):
+            now = datetime.now()
+            settle_start = (now - timedelta(days=Config.SYNC_SETTLE_DAYS)).strftime('%Y-%m-%d')
+            written, last_iso, ranges = _fetch_planned(key, min(state["last_date"], settle_start),
+                                                       now.strftime('%Y-%m-%d'))
+        else:
+            # Backfill pertama: jendela look-back adaptif, bukan langsung 90 hari
+            _, segments = _fetch_latest(key)
+            written, last_iso = _ingest_ranges(key, segments)
+            ranges = [(start, end) for start, end, _ in segments]
+        price_store.mark_synced(key, last_iso)
+        print(f"[BI Service] Price store sync {key}: {len(ranges)} request, {written} titik baru / berubah, "
+              f"sampai {last_iso}")
+        return None
+    except Exception as e:
+        print(f"[BI Service] Price store sync gagal {key}: {e}")
+        return str(e)
+
+def _cache_key(prefix: str, *parts: Optional[str]) -> str:
+    """Key cache: prefix:province:regency:price_type:start:end[:filter]"""
+    return ":".join([prefix] + [str(p) if p else "-" for p in parts])
+
+def _cached(key: str, loader) -> Dict:
+    """
+    Ambil hasil dari cache harga; hanya hasil sukses yang tidak stale yang
+    disimpan. Kalau loader gagal, hasil sukses terakhir untuk key ini
+    disajikan dengan stale=True.
+    """
+    def load() -> Dict:
+        result = loader()
+        if result.get("success") and not result.get("stale"):
+            _last_good.set(key, result)
+        return result
+
+    result, status = _harga_cache.get_or_load(
+        key, load, cacheable=lambda r: bool(r.get("success")) and not r.get("stale")
+    )
+    if not result.get("success"):
+        last_good = _last_good.get(key)
+        if last_good is not None:
+            print(f"[BI Service] {key}: upstream gagal, pakai hasil terakhir ({result.get('error')})")
+            return {**last_good[0], "cache": "last-good", "stale": True,
+                    "upstream_error": result.get("error")}
+    return {**result, "cache": status}
+
+def _harga_from_store(key: Tuple[str, str, str], match) -> Tuple[List[Dict], Optional[str]]:
+    """Susun data harga terbaru dari price store lokal"""
+    transformed_data = []
+    actual_date = None
+
+    for row in price_store.latest_prices(key):
+        if not match(row["commodity"]):
+            continue
+        latest_date = _iso_to_display(row["latest_date"])
+        if actual_date is None:
+            actual_date = latest_date
+        transformed_data.append(
+            _build_item(row["commodity"], row["price"], latest_date, row["prev_price"])
+        )
+
+    return transformed_data, actual_date
+
+def _harga_from_matrix(matrix: grid_transform.GridMatrix, match,
+                       debug: bool = False) -> Tuple[List[Dict], Optional[str]]:
+    """Susun data harga terbaru dari matrix komoditas × tanggal"""
+    transformed_data = []
+    actual_date = None
+
+    for row_idx, latest_col, latest_price, prev_price in grid_transform.latest_and_previous(matrix):
+        commodity_name = matrix.names[row_idx]
+        if not match(commodity_name):
+            continue
+        latest_date = _iso_to_display(matrix.dates[latest_col])
+        
+        if debug:
+            print(f"[DEBUG] {commodity_name}: latest = {latest_date}")
+        
+        if actual_date is None:
+            actual_date = latest_date
+        
+        transformed_data.append(_build_item(commodity_name, latest_price, latest_date, prev_price))
+
+    return transformed_data, actual_date
+
+def _load_harga(province_id: str, regency_id: str, price_type_id: str,
+                start_date: Optional[str], end_date: Optional[str],
+                match, match_key: str, debug: bool = False) -> Tuple[List[Dict], Optional[str], str, bool]:
+    """
+    Ambil harga terbaru per komoditas.
+    Tanpa rentang tanggal: dijawab dari price store lokal (sync incremental).
+    Dengan rentang tanggal: ambil grid dari BI (dan tetap di-ingest ke store).
+    Kalau sync gagal (mis. circuit BI open) data store terakhir tetap
+    disajikan dengan stale=True.
+    Return: (data, data_date, source, stale)
+    """
+    key = (province_id, regency_id, price_type_id)
+
+    if Config.PRICE_STORE_ENABLED and not (start_date and end_date):
+        sync_error = _upstream_flight.do("sync:" + ":".join(key), lambda: _sync_price_store(key))
+        transformed_data, actual_date = _harga_from_store(key, match)
+        if sync_error and not transformed_data:
+            raise RuntimeError(sync_error)
+        return transformed_data, actual_date, "lokal", bool(sync_error)
+
+    if not start_date or not end_date:
+        # Jendela look-back adaptif: mulai pendek, melebar hanya kalau perlu
+        latest_rows, _ = _fetch_latest(key, match=match, match_key=match_key)
+        transformed_data = [
+            _build_item(row["commodity"], row["price"], _iso_to_display(row["latest_date"]), row["prev_price"])
+            for row in latest_rows if match(row["commodity"])
+        ]
+        actual_date = transformed_data[0]["latest_date"] if transformed_data else None
+        return transformed_data, actual_date, "bi", False
+
+    if Config.PRICE_STORE_ENABLED:
+        # Semua baris dibutuhkan untuk ingest; satu matrix untuk store sekaligus response
+        matrix = _fetch_matrix(province_id, regency_id, price_type_id, start_date, end_date)
+        points, order, _ = _grid_to_points(matrix)
+        price_store.ingest(key, points, order, fetched=(start_date, end_date))
+    else:
+        matrix = _fetch_matrix(province_id, regency_id, price_type_id, start_date, end_date,
+                               match=match, match_key=match_key)
+
+    transformed_data, actual_date = _harga_from_matrix(matrix, match, debug)
+    return transformed_data, actual_date, "bi", False
+
+def _load_harga_periode(province_id: str, regency_id: str, price_type_id: str,
+                        start_date: Optional[str], end_date: Optional[str],
+                        match, periode: str) -> Tuple[List[Dict], Optional[str], str, bool]:
+    """
+    Harga per periode (weekly / monthly / quarterly) dari price_rollups:
+    rata-rata periode terbaru (awal periode <= end_date) dibandingkan periode
+    sebelumnya. Store cukup dilengkapi sejak awal periode sebelumnya, tidak
+    ada request BI dengan tipe_laporan lain.
+    Return: (data, data_date, source, stale)
+    """
+    key = (province_id, regency_id, price_type_id)
+    until = end_date or datetime.now().strftime('%Y-%m-%d')
+    view_start = price_rollups.previous_start(periode, date.fromisoformat(until)).isoformat()
+    if start_date:
+        view_start = min(view_start, start_date)
+
+    error = _sync_store_view(key, view_start, until)
+
+    transformed_data = []
+    actual_date = None
+    for row in price_store.latest_rollups(key, periode, until):
+        if not match(row["commodity"]):
+            continue
+        current, previous = row["current"], row["previous"]
+        latest_date = _iso_to_display(current["last_date"])
+        if actual_date is None:
+            actual_date = latest_date
+        item = _build_item(row["commodity"], current["mean"], latest_date,
+                           previous["mean"] if previous else None)
+        item["aggregation"] = {
+            "periode": periode,
+            "period_start": _iso_to_display(current["period_start"]),
+            "period_end": _iso_to_display(current["period_end"]),
+            "days": current["n_days"],
+            "min": current["min"],
+            "max": current["max"],
+            "previous_period_start": _iso_to_display(previous["period_start"]) if previous else None
+        }
+        transformed_data.append(item)
+
+    if error and not transformed_data:
+        raise RuntimeError(error)
+    return transformed_data, actual_date, "lokal", bool(error)
+
 # -------------------------------------------------
 # 🔹 FUNGSI UTAMA UNTUK HARGA PANGAN
 # -------------------------------------------------
@@ -94,121 +475,65 @@ def get_harga_data(province_id: str = '14',
                    price_type_id: str = '1',
                    start_date: Optional[str] = None,
                    end_date: Optional[str] = None,
-                   commodity_filter: Optional[str] = None) -> Dict:
+                   commodity_filter: Optional[str] = None,
+                   with_stats: bool = False,
+                   periode: str = PERIODE_DAILY) -> Dict:
     """
     Ambil data harga pangan dengan auto-fallback ke tanggal sebelumnya
+    (lewat cache TTL + stale-while-revalidate)
+    with_stats: tambahkan statistik rolling 7/30 hari per komoditas ("stats")
+    periode: weekly / monthly / quarterly = rata-rata periode terbaru vs
+             periode sebelumnya, dihitung lokal dari price store
     """
+    periode_error = _check_periode(periode)
+    if periode_error:
+        return periode_error
+
+    key = _cache_key("harga", province_id, regency_id, price_type_id,
+                     start_date, end_date, commodity_filter.lower() if commodity_filter else None)
+    if with_stats:
+        key += ":stats"
+    if periode != PERIODE_DAILY:
+        key += f":{periode}"
+    return _cached(key, lambda: _get_harga_data(
+        province_id, regency_id, price_type_id, start_date, end_date, commodity_filter, with_stats,
+        periode
+    ))
+
+def _get_harga_data(province_id: str, regency_id: str, price_type_id: str,
+                    start_date: Optional[str], end_date: Optional[str],
+                    commodity_filter: Optional[str], with_stats: bool = False,
+                    periode: str = PERIODE_DAILY) -> Dict:
+    """Implementasi get_harga_data tanpa cache"""
     
     try:
-        # Auto-detect tanggal
-        if not start_date or not end_date:
-            today = datetime.now()
-            # Coba 90 hari terakhir untuk memastikan ada data
-            start_date_obj = today - timedelta(days=90)
-            start_date = start_date_obj.strftime('%Y-%m-%d')
-            end_date = today.strftime('%Y-%m-%d')
-        
-        url = f"{BASE_URL}/TabelHarga/GetGridDataDaerah"
-        params = {
-            "price_type_id": price_type_id,
-            "comcat_id": "",
-            "province_id": province_id,
-            "regency_id": regency_id,
-            "market_id": "",
-            "tipe_laporan": "1",
-            "start_date": start_date,
-            "end_date": end_date
-        }
-        
-        print(f"[BI Service] Fetching data from BI API...")
-        print(f"[BI Service] Province: {province_id}, Regency: {regency_id}, Price Type: {price_type_id}")
-        print(f"[BI Service] Date range: {start_date} to {end_date}")
         if commodity_filter:
             print(f"[BI Service] Filter: {commodity_filter}")
         
-        session = create_session()
-        r = session.get(url, params=params, timeout=15)
-        r.raise_for_status()
-        raw_data = r.json()
+        # Filter komoditas: di-resolve sekali ke set id lewat index tree
+        match = _commodity_matcher(commodity_filter)
         
-        # Parse response
-        if isinstance(raw_data, dict) and 'data' in raw_data:
-            data_list = raw_data['data']
-        elif isinstance(raw_data, list):
-            data_list = raw_data
+        if periode != PERIODE_DAILY:
+            transformed_data, actual_date, source, stale = _load_harga_periode(
+                province_id, regency_id, price_type_id, start_date, end_date, match, periode
+            )
         else:
-            return {
-                "success": False,
-                "error": "Format data tidak sesuai"
-            }
+            transformed_data, actual_date, source, stale = _load_harga(
+                province_id, regency_id, price_type_id, start_date, end_date, match,
+                match_key=f"filter={commodity_filter.lower()}" if commodity_filter else "*",
+                debug=bool(commodity_filter and 'cabai' in commodity_filter.lower())
+            )
         
-        # Transform data
-        transformed_data = []
-        actual_date = None
-        
-        for item in data_list:
-            commodity_name = item.get('name', 'Unknown')
-            level = item.get('level', 0)
-            
-            # Skip header/kategori (level 1)
-            if level == 1:
-                continue
-            
-            # Filter komoditas (case-insensitive)
-            if commodity_filter:
-                if commodity_filter.lower() not in commodity_name.lower():
-                    continue
-            
-            # Ambil date keys
-            date_keys = [k for k in item.keys() if '/' in str(k)]
-            if not date_keys:
-                continue
-            
-            # ✅ FIXED: Sort tanggal dengan benar menggunakan _date_sort_key
-            sorted_dates = sorted(date_keys, key=_date_sort_key, reverse=True)
-            
-            # Debug: Print untuk cabai
-            if commodity_filter and 'cabai' in commodity_filter.lower():
-                print(f"[DEBUG] {commodity_name}: Top 3 dates = {sorted_dates[:3]}")
-            
-            # Ambil harga terbaru yang ada (bukan hanya hari ini)
-            latest_price = None
-            latest_date = None
-            
-            for date in sorted_dates:
-                price_str = item.get(date, '0')
-                parsed_price = _parse_price(price_str)
-                if parsed_price and parsed_price > 0:
-                    latest_price = parsed_price
-                    latest_date = date
-                    break
-            
-            if latest_price is None:
-                continue
-            
-            if actual_date is None:
-                actual_date = latest_date
-            
-            # Ambil harga sebelumnya untuk hitung trend
-            prev_price = latest_price
-            for i, date in enumerate(sorted_dates):
-                if i > 0 and date != latest_date:
-                    price_str = item.get(date, '0')
-                    parsed = _parse_price(price_str)
-                    if parsed and parsed > 0:
-                        prev_price = parsed
-                        break
-            
-            # Hitung trend
-            trend, price_change = _calculate_trend(latest_price, prev_price)
-            
-            transformed_data.append({
-                "commodity": commodity_name.strip(),
-                "price": latest_price,
-                "trend": trend,
-                "price_change": price_change,
-                "latest_date": latest_date
-            })
+        if with_stats:
+            # Statistik sudah dihitung saat ingest; jendela 30 hari dilengkapi dulu
+            # (ingest backfill ikut menghitung ulang statistiknya), lalu cukup dibaca
+            stats = {}
+            if Config.PRICE_STORE_ENABLED:
+                key = (province_id, regency_id, price_type_id)
+                _backfill_stats_window(key, actual_date)
+                stats = price_store.rolling_stats(key, [item["commodity"] for item in transformed_data])
+            for item in transformed_data:
+                item["stats"] = stats.get(item["commodity"])
         
         print(f"[BI Service] Total data berhasil: {len(transformed_data)}")
         print(f"[BI Service] Data date: {actual_date}")
@@ -219,9 +544,19 @@ def get_harga_data(province_id: str = '14',
             "total": len(transformed_data),
             "data_date": actual_date,
             "info": f"Data terbaru per {actual_date}",
-            "filter_applied": commodity_filter if commodity_filter else None
+            "filter_applied": commodity_filter if commodity_filter else None,
+            "periode": periode,
+            "aggregation": _aggregation_info(periode),
+            "source": source,
+            "stale": stale
         }
         
+    except bi_client.CircuitOpenError as e:
+        print(f"[BI Service] Error: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
     except Exception as e:
         print(f"[BI Service] Error: {e}")
         import traceback
@@ -232,10 +567,240 @@ def get_harga_data(province_id: str = '14',
         }
 
 
+# -------------------------------------------------
+# 🔹 SERI HARGA HARIAN (UNTUK CHART)
+# -------------------------------------------------
+
+def _backfill_series(key: Tuple[str, str, str], start_date: str, end_date: str) -> Optional[str]:
+    """
+    Pastikan price store lengkap untuk [start_date, end_date]: hanya rentang
+    yang direncanakan sync_plan yang diambil (sel lengkap dan tombstone kosong
+    yang belum jatuh tempo dilewati).
+    Return: pesan error kalau gagal, None kalau sukses / sudah lengkap
+    """
+    try:
+        written, _, ranges = _fetch_planned(key, start_date, end_date)
+        if ranges:
+            print(f"[BI Service] Backfill seri {key}: {written} titik baru / berubah dari {len(ranges)} request "
+                  f"({', '.join(f'{s}..{e}' for s, e in ranges)})")
+        return None
+    except Exception as e:
+        print(f"[BI Service] Backfill seri gagal {key}: {e}")
+        return str(e)
+
+def _backfill_stats_window(key: Tuple[str, str, str], data_date: Optional[str]) -> Optional[str]:
+    """Lengkapi store untuk jendela statistik 30 hari yang berakhir di data_date (DD/MM/YYYY)"""
+    if not data_date:
+        return None
+    end = datetime.strptime(data_date, "%d/%m/%Y").date()
+    start = (end - timedelta(days=29)).isoformat()
+    return _upstream_flight.do(
+        f"backfill:{':'.join(key)}:{start}:{end.isoformat()}",
+        lambda: _backfill_series(key, start, end.isoformat())
+    )
+
+def _sync_store_view(key: Tuple[str, str, str], start_date: str, end_date: str) -> Optional[str]:
+    """Sync harga terbaru + backfill [start_date, end_date] ke price store. Return: error terakhir"""
+    sync_error = _upstream_flight.do("sync:" + ":".join(key), lambda: _sync_price_store(key))
+    backfill_error = _upstream_flight.do(
+        f"backfill:{':'.join(key)}:{start_date}:{end_date}",
+        lambda: _backfill_series(key, start_date, end_date)
+    )
+    return backfill_error or sync_error
+
+def _check_periode(periode: str) -> Optional[Dict]:
+    """Validasi parameter periode; None kalau valid"""
+    if periode not in PERIODES:
+        return {
+            "success": False,
+            "error": f"periode harus salah satu dari: {', '.join(PERIODES)}"
+        }
+    if periode != PERIODE_DAILY and not Config.PRICE_STORE_ENABLED:
+        return {
+            "success": False,
+            "error": "periode agregat membutuhkan price store (PRICE_STORE_ENABLED)"
+        }
+    return None
+
+def _aggregation_info(periode: str) -> Dict:
+    """Keterangan agregasi yang menghasilkan nilai harga di response"""
+    if periode == PERIODE_DAILY:
+        return {"periode": periode, "stat": "harga harian"}
+    return {"periode": periode, "stat": "rata-rata harga harian dalam periode",
+            "period_start": {"weekly": "Senin", "monthly": "tanggal 1",
+                             "quarterly": "tanggal 1 Jan/Apr/Jul/Okt"}[periode]}
+
+def _downsample_columns(dates: List[str], prices: List[List[Optional[float]]],
+                        points: int, method: str) -> List[int]:
+    """
+    Downsample vektor tanggal bersama sekali ke paling banyak `points` kolom.
+    Sinyal yang di-downsample adalah rata-rata harga ternormalisasi
+    (harga / rata-rata seri) semua komoditas yang punya harga di tanggal itu,
+    jadi komoditas murah dan mahal berbobot sama dan hasil tidak melebihi
+    `points` walau puncak tiap komoditas jatuh di hari berbeda.
+    Return: indeks kolom (tanggal) yang dipertahankan, terurut
+    """
+    scales = []
+    for series in prices:
+        values = [v for v in series if v is not None]
+        scales.append(sum(values) / len(values) if values else None)
+
+    idx, ys = [], []
+    for col in range(len(dates)):
+        normalized = [series[col] / scale for series, scale in zip(prices, scales)
+                      if scale and series[col] is not None]
+        if normalized:
+            idx.append(col)
+            ys.append(sum(normalized) / len(normalized))
+
+    if method == "lttb":
+        ordinals = [datetime.strptime(dates[i], '%Y-%m-%d').toordinal() for i in idx]
+        chosen = downsample.lttb(ordinals, ys, points)
+    else:
+        chosen = downsample.minmax(ys, points)
+    return [idx[c] for c in chosen]
+
+def get_harga_series(province_id: str = '14',
+                     regency_id: str = '',
+                     price_type_id: str = '1',
+                     start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     commodities: Optional[List[str]] = None,
+                     points: Optional[int] = None,
+                     method: str = "lttb",
+                     periode: str = PERIODE_DAILY) -> Dict:
+    """
+    Seri harga harian dalam bentuk kolom: satu vektor tanggal bersama dan
+    satu array harga per komoditas (null = tidak ada harga hari itu).
+    points: target jumlah tanggal (downsampling LTTB / minmax, minimal downsample.MIN_POINTS)
+    periode: weekly / monthly / quarterly = rata-rata per periode dari price
+             store ("dates" berisi awal periode, "days" jumlah hari berharga)
+    """
+    if method not in downsample.METHODS:
+        return {
+            "success": False,
+            "error": f"method harus salah satu dari: {', '.join(downsample.METHODS)}"
+        }
+    periode_error = _check_periode(periode)
+    if periode_error:
+        return periode_error
+
+    end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+    try:
+        end_obj = datetime.strptime(end_date, '%Y-%m-%d')
+        start_obj = (datetime.strptime(start_date, '%Y-%m-%d') if start_date
+                     else end_obj - timedelta(days=Config.SERIES_DEFAULT_DAYS))
+    except ValueError:
+        return {
+            "success": False,
+            "error": "Format tanggal harus YYYY-MM-DD"
+        }
+    if start_obj > end_obj:
+        return {
+            "success": False,
+            "error": "start_date harus sebelum end_date"
+        }
+    start_obj = max(start_obj, end_obj - timedelta(days=Config.SERIES_MAX_DAYS))
+    start_date = start_obj.strftime('%Y-%m-%d')
+
+    key = _cache_key("series", province_id, regency_id, price_type_id, start_date, end_date,
+                     ",".join(sorted(c.lower() for c in commodities or [])), points, method)
+    if periode != PERIODE_DAILY:
+        key += f":{periode}"
+    return _cached(key, lambda: _get_harga_series(
+        province_id, regency_id, price_type_id, start_date, end_date, commodities, points, method,
+        periode
+    ))
+
+def _get_harga_series(province_id: str, regency_id: str, price_type_id: str,
+                      start_date: str, end_date: str, commodities: Optional[List[str]],
+                      points: Optional[int], method: str, periode: str = PERIODE_DAILY) -> Dict:
+    """Implementasi get_harga_series tanpa cache"""
+    try:
+        key = (province_id, regency_id, price_type_id)
+        matchers = [_commodity_matcher(c) for c in commodities or []]
+        match = (lambda name: any(m(name) for m in matchers)) if matchers else None
+        days = None
+
+        if Config.PRICE_STORE_ENABLED:
+            # Periode agregat: periode pertama diambil utuh, walau mulai sebelum start_date
+            fetch_start = (price_rollups.period_start(periode, date.fromisoformat(start_date)).isoformat()
+                           if periode != PERIODE_DAILY else start_date)
+            error = _sync_store_view(key, fetch_start, end_date)
+            if periode != PERIODE_DAILY:
+                dates, names, prices, days = price_store.get_rollup_series(
+                    key, periode, start_date, end_date, match)
+            else:
+                dates, names, prices = price_store.get_series(key, start_date, end_date, match)
+            if error and not dates:
+                raise RuntimeError(error)
+            source, stale = "lokal", bool(error)
+        else:
+            matrix = _fetch_matrix(province_id, regency_id, price_type_id, start_date, end_date,
+                                   match=match, match_key="series:" + ",".join(commodities or []))
+            cols = [j for j in range(len(matrix.dates))
+                    if any(row[j] == row[j] for row in matrix.values)]
+            dates = [matrix.dates[j] for j in cols]
+            names = [name.strip() for name in matrix.names]
+            prices = [[row[j] if row[j] == row[j] else None for j in cols] for row in matrix.values]
+            source, stale = "bi", False
+
+        points_raw = len(dates)
+        downsampled = bool(points) and points_raw > points
+        if downsampled:
+            cols = _downsample_columns(dates, prices, points, method)
+            dates = [dates[i] for i in cols]
+            prices = [[series[i] for i in cols] for series in prices]
+            if days is not None:
+                days = [[series[i] for i in cols] for series in days]
+
+        print(f"[BI Service] Seri {key}: {len(names)} komoditas, {points_raw} → {len(dates)} tanggal")
+
+        response = {
+            "success": True,
+            "start_date": start_date,
+            "end_date": end_date,
+            "periode": periode,
+            "aggregation": _aggregation_info(periode),
+            "dates": dates,
+            "commodities": names,
+            "prices": prices,
+            "points": len(dates),
+            "points_raw": points_raw,
+            "downsample": method if downsampled else None,
+            "source": source,
+            "stale": stale
+        }
+        if days is not None:
+            response["days"] = days
+        return response
+
+    except bi_client.CircuitOpenError as e:
+        print(f"[BI Service] Error: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    except Exception as e:
+        print(f"[BI Service] Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 # -------------------------------------------------
 # 🔹 KHUSUS KOMODITAS CABAI
 # -------------------------------------------------
 
+CABAI_LIST = [
+    "Cabai Merah Besar",
+    "Cabai Merah Keriting ",
+    "Cabai Rawit Hijau",
+    "Cabai Rawit Merah"
+]
+
 def get_cabai_data(province_id: str = '14',
                    regency_id: str = '',
                    price_type_id: str = '1',
@@ -243,125 +808,36 @@ def get_cabai_data(province_id: str = '14',
                    end_date: Optional[str] = None) -> Dict:
     """
     Ambil data khusus 4 jenis cabai dengan auto-fallback
+    (lewat cache TTL + stale-while-revalidate)
     """
+    key = _cache_key("cabai", province_id, regency_id, price_type_id, start_date, end_date)
+    return _cached(key, lambda: _get_cabai_data(
+        province_id, regency_id, price_type_id, start_date, end_date
+    ))
+
+def _get_cabai_data(province_id: str, regency_id: str, price_type_id: str,
+                    start_date: Optional[str], end_date: Optional[str]) -> Dict:
+    """Implementasi get_cabai_data tanpa cache"""
     
-    cabai_list = [
-        "Cabai Merah Besar",
-        "Cabai Merah Keriting ",
-        "Cabai Rawit Hijau",
-        "Cabai Rawit Merah"
-    ]
+    cabai_names = {name.strip() for name in CABAI_LIST}
     
     try:
-        # Auto-detect tanggal dengan range lebih panjang
-        if not start_date or not end_date:
-            today = datetime.now()
-            start_date_obj = today - timedelta(days=90)
-            start_date = start_date_obj.strftime('%Y-%m-%d')
-            end_date = today.strftime('%Y-%m-%d')
+        print(f"[BI Service] Fetching CABAI data...")
         
-        url = f"{BASE_URL}/TabelHarga/GetGridDataDaerah"
-        params = {
-            "price_type_id": price_type_id,
-            "comcat_id": "",
-            "province_id": province_id,
-            "regency_id": regency_id,
-            "market_id": "",
-            "tipe_laporan": "1",
-            "start_date": start_date,
-            "end_date": end_date
-        }
+        # Filter: Hanya ambil 4 jenis cabai
+        def match(name: str) -> bool:
+            return name.strip() in cabai_names
         
-        print(f"[BI Service] Fetching CABAI data from BI API...")
-        print(f"[BI Service] Province: {province_id}, Regency: {regency_id}")
-        print(f"[BI Service] Date range: {start_date} to {end_date}")
+        transformed_data, actual_date, source, stale = _load_harga(
+            province_id, regency_id, price_type_id, start_date, end_date, match,
+            match_key="cabai", debug=True
+        )
         
-        session = create_session()
-        r = session.get(url, params=params, timeout=15)
-        r.raise_for_status()
-        raw_data = r.json()
+        for item in transformed_data:
+            print(f"[BI Service]   ✓ {item['commodity']}: Rp {item['price']:,.0f} "
+                  f"({item['trend']} {item['price_change']:+.2f}%) - {item['latest_date']}")
         
-        if isinstance(raw_data, dict) and 'data' in raw_data:
-            data_list = raw_data['data']
-        elif isinstance(raw_data, list):
-            data_list = raw_data
-        else:
-            return {
-                "success": False,
-                "error": "Format data tidak sesuai"
-            }
-        
-        transformed_data = []
-        actual_date = None
-        found_names = []
-        
-        for item in data_list:
-            commodity_name = item.get('name', 'Unknown')
-            level = item.get('level', 0)
-            
-            if level == 1:
-                continue
-            
-            # Filter: Hanya ambil 4 jenis cabai
-            if commodity_name not in cabai_list:
-                continue
-            
-            found_names.append(commodity_name)
-            
-            # Ambil date keys
-            date_keys = [k for k in item.keys() if '/' in str(k)]
-            if not date_keys:
-                continue
-            
-            # ✅ FIXED: Sort tanggal dengan benar menggunakan _date_sort_key
-            sorted_dates = sorted(date_keys, key=_date_sort_key, reverse=True)
-            
-            # Debug: Print 5 tanggal teratas untuk setiap cabai
-            print(f"[DEBUG] {commodity_name}: {sorted_dates[:5]}")
-            
-            # Cari harga terbaru yang tersedia
-            latest_price = None
-            latest_date = None
-            
-            for date in sorted_dates:
-                price_str = item.get(date, '0')
-                parsed_price = _parse_price(price_str)
-                if parsed_price and parsed_price > 0:
-                    latest_price = parsed_price
-                    latest_date = date
-                    break
-            
-            if latest_price is None:
-                print(f"[WARNING] {commodity_name}: No valid price found in {len(sorted_dates)} dates")
-                continue
-            
-            if actual_date is None:
-                actual_date = latest_date
-            
-            # Ambil harga sebelumnya
-            prev_price = latest_price
-            for i, date in enumerate(sorted_dates):
-                if i > 0 and date != latest_date:
-                    price_str = item.get(date, '0')
-                    parsed = _parse_price(price_str)
-                    if parsed and parsed > 0:
-                        prev_price = parsed
-                        break
-            
-            # Hitung trend
-            trend, price_change = _calculate_trend(latest_price, prev_price)
-            
-            transformed_data.append({
-                "commodity": commodity_name.strip(),
-                "price": latest_price,
-                "trend": trend,
-                "price_change": price_change,
-                "latest_date": latest_date
-            })
-            
-            print(f"[BI Service]   ✓ {commodity_name}: Rp {latest_price:,.0f} ({trend} {price_change:+.2f}%) - {latest_date}")
-        
-        missing = set(cabai_list) - set(found_names)
+        missing = cabai_names - {item["commodity"] for item in transformed_data}
         
         print(f"[BI Service] Total cabai: {len(transformed_data)}/4")
         if missing:
@@ -374,9 +850,17 @@ def get_cabai_data(province_id: str = '14',
             "requested": 4,
             "data_date": actual_date,
             "info": f"Data terbaru: {actual_date}",
-            "missing": list(missing) if missing else None
+            "missing": list(missing) if missing else None,
+            "source": source,
+            "stale": stale
         }
         
+    except bi_client.CircuitOpenError as e:
+        print(f"[BI Service] Error: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
     except Exception as e:
         print(f"[BI Service] Error: {e}")
         import traceback
@@ -386,19 +870,253 @@ def get_cabai_data(province_id: str = '14',
             "error": str(e)
         }
 
+# -------------------------------------------------
+# 🔹 HARGA NASIONAL (FAN-OUT SEMUA PROVINSI)
+# -------------------------------------------------
+
+_fanout_executor: Optional[ThreadPoolExecutor] = None
+_fanout_lock = threading.Lock()
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    """Worker pool terbatas untuk fan-out per provinsi (dibuat sekali per process)"""
+    global _fanout_executor
+    if _fanout_executor is None:
+        with _fanout_lock:
+            if _fanout_executor is None:
+                _fanout_executor = ThreadPoolExecutor(
+                    max_workers=Config.BI_FANOUT_WORKERS,
+                    thread_name_prefix="bi-fanout"
+                )
+    return _fanout_executor
+
+def _province_ref(item: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """Ambil (id, nama) provinsi dari item GetProvinceAll"""
+    province_id = item.get('province_id') or item.get('id') or item.get('ProvinceID')
+    name = item.get('province_name') or item.get('name') or item.get('ProvinceName')
+    return (str(province_id) if province_id is not None else None), name
+
+def _area_matrix(area_ids: List[str], results: Dict[str, Dict]) -> Tuple[List[str], List[List[Optional[float]]], Dict]:
+    """
+    Matrix wilayah × komoditas dari hasil per wilayah (data + data_date),
+    urutan komoditas mengikuti kemunculan pertama.
+    Return: (komoditas, matrix, data_date per wilayah)
+    """
+    commodities = []
+    seen = set()
+    for area_id in area_ids:
+        for item in (results.get(area_id) or {}).get("data", []):
+            if item["commodity"] not in seen:
+                seen.add(item["commodity"])
+                commodities.append(item["commodity"])
+    col = {name: idx for idx, name in enumerate(commodities)}
+
+    matrix = []
+    data_dates = {}
+    for area_id in area_ids:
+        row = [None] * len(commodities)
+        result = results.get(area_id)
+        if result:
+            for item in result["data"]:
+                row[col[item["commodity"]]] = item["price"]
+            data_dates[area_id] = result.get("data_date")
+        matrix.append(row)
+    return commodities, matrix, data_dates
+
+def get_harga_nasional(price_type_id: str = '1',
+                       commodity_filter: Optional[str] = None,
+                       deadline: Optional[float] = None) -> Dict:
+    """
+    Ambil harga terbaru untuk semua provinsi secara paralel.
+    Provinsi yang belum selesai saat deadline dilaporkan di "timed_out"
+    (hasil parsial), sehingga waktu total mengikuti provinsi paling lambat
+    atau deadline, bukan jumlah semua provinsi.
+    """
+    started = time.time()
+    deadline = deadline or Config.NASIONAL_DEADLINE
+
+    provinces_result = get_provinces()
+    if not provinces_result.get("success"):
+        return provinces_result
+
+    provinces = []
+    for item in provinces_result.get("data") or []:
+        province_id, name = _province_ref(item) if isinstance(item, dict) else (None, None)
+        if province_id:
+            provinces.append({"id": province_id, "name": name})
+
+    executor = _get_fanout_executor()
+    futures = {
+        executor.submit(get_harga_data, province_id=p["id"], price_type_id=price_type_id,
+                        commodity_filter=commodity_filter): p["id"]
+        for p in provinces
+    }
+    remaining = max(deadline - (time.time() - started), 0)
+    done, not_done = wait(futures, timeout=remaining)
+
+    results = {}
+    failed = []
+    for future in done:
+        province_id = futures[future]
+        result = future.result()
+        if result.get("success"):
+            results[province_id] = result
+        else:
+            failed.append({"province_id": province_id, "error": result.get("error")})
+
+    # Future yang belum jalan dibatalkan; yang sedang jalan dibiarkan selesai
+    # (hasilnya tetap masuk cache untuk request berikutnya)
+    for future in not_done:
+        future.cancel()
+    pending_ids = {futures[f] for f in not_done}
+    timed_out = [p["id"] for p in provinces if p["id"] in pending_ids]
+
+    commodities, matrix, data_dates = _area_matrix([p["id"] for p in provinces], results)
+
+    elapsed_ms = round((time.time() - started) * 1000, 1)
+    print(f"[BI Service] Nasional: {len(results)}/{len(provinces)} provinsi dalam {elapsed_ms} ms "
+          f"(timeout: {len(timed_out)}, gagal: {len(failed)})")
+
+    return {
+        "success": True,
+        "provinces": provinces,
+        "commodities": commodities,
+        "matrix": matrix,
+        "data_dates": data_dates,
+        "partial": bool(timed_out or failed),
+        "timed_out": timed_out,
+        "failed": failed,
+        "filter_applied": commodity_filter if commodity_filter else None,
+        "elapsed_ms": elapsed_ms
+    }
+
+# -------------------------------------------------
+# 🔹 HARGA REGIONAL (FAN-OUT KABUPATEN/KOTA, ASYNC)
+# -------------------------------------------------
+
+def _regency_ref(item: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """Ambil (id, nama) kabupaten/kota dari item GetRegencyAll"""
+    regency_id = item.get('regency_id') or item.get('id') or item.get('RegencyID')
+    name = item.get('regency_name') or item.get('name') or item.get('RegencyName')
+    return (str(regency_id) if regency_id is not None else None), name
+
+def _regional_async(province_id: str, price_type_id: str, regency_ids: List[str],
+                    match, deadline: float) -> Tuple[Dict[str, Dict], Dict[str, str], List[str]]:
+    """Semua grid kabupaten diambil bersamaan di event loop bi_async (satu thread)"""
+    end = datetime.now()
+    start_date = (end - timedelta(days=Config.REGIONAL_WINDOW_DAYS)).strftime('%Y-%m-%d')
+    end_date = end.strftime('%Y-%m-%d')
+
+    def job(regency_id: str):
+        async def run():
+            matrix = await bi_async.fetch_matrix(province_id, regency_id, price_type_id,
+                                                 start_date, end_date, match=match)
+            data, data_date = _harga_from_matrix(matrix, match)
+            return {"data": data, "data_date": data_date}
+        return run
+
+    return bi_async.fan_out({r: job(r) for r in regency_ids}, deadline)
+
+def _regional_threads(province_id: str, price_type_id: str, regency_ids: List[str],
+                      commodity_filter: Optional[str], deadline: float) -> Tuple[Dict[str, Dict], Dict[str, str], List[str]]:
+    """Fallback tanpa httpx: fan-out get_harga_data lewat thread pool, seperti nasional"""
+    executor = _get_fanout_executor()
+    futures = {
+        executor.submit(get_harga_data, province_id=province_id, regency_id=r,
+                        price_type_id=price_type_id, commodity_filter=commodity_filter): r
+        for r in regency_ids
+    }
+    done, not_done = wait(futures, timeout=deadline)
+
+    results, errors = {}, {}
+    for future in done:
+        result = future.result()
+        if result.get("success"):
+            results[futures[future]] = result
+        else:
+            errors[futures[future]] = result.get("error")
+    for future in not_done:
+        future.cancel()
+    return results, errors, [futures[f] for f in not_done]
+
+def get_harga_regional(province_id: str = '14',
+                       price_type_id: str = '1',
+                       commodity_filter: Optional[str] = None,
+                       deadline: Optional[float] = None) -> Dict:
+    """
+    Ambil harga terbaru semua kabupaten/kota dalam satu provinsi.
+    Dengan client async (httpx), 30+ grid kabupaten diambil bersamaan dari satu
+    thread (kira-kira satu round trip, dibatasi BI_ASYNC_MAX_PER_HOST); tanpa
+    httpx fallback ke thread pool. Kabupaten yang belum selesai saat deadline
+    dibatalkan dan dilaporkan di "timed_out" (hasil parsial).
+    """
+    started = time.time()
+    deadline = deadline or Config.REGIONAL_DEADLINE
+
+    regencies_result = get_regencies(province_id)
+    if not regencies_result.get("success"):
+        return regencies_result
+
+    data = regencies_result.get("data")
+    if isinstance(data, dict) and 'data' in data:
+        data = data['data']
+    regencies = []
+    for item in data or []:
+        regency_id, name = _regency_ref(item) if isinstance(item, dict) else (None, None)
+        if regency_id:
+            regencies.append({"id": regency_id, "name": name})
+    regency_ids = [r["id"] for r in regencies]
+
+    remaining = max(deadline - (time.time() - started), 0)
+    try:
+        if bi_async.available():
+            mode = "async"
+            match = _commodity_matcher(commodity_filter)
+            results, errors, timed_out = _regional_async(province_id, price_type_id, regency_ids,
+                                                         match, remaining)
+        else:
+            mode = "threads"
+            results, errors, timed_out = _regional_threads(province_id, price_type_id, regency_ids,
+                                                           commodity_filter, remaining)
+    except Exception as e:
+        print(f"[BI Service] Regional {province_id} gagal: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+    commodities, matrix, data_dates = _area_matrix(regency_ids, results)
+
+    elapsed_ms = round((time.time() - started) * 1000, 1)
+    print(f"[BI Service] Regional {province_id} ({mode}): {len(results)}/{len(regencies)} kabupaten "
+          f"dalam {elapsed_ms} ms (timeout: {len(timed_out)}, gagal: {len(errors)})")
+
+    return {
+        "success": True,
+        "province_id": province_id,
+        "regencies": regencies,
+        "commodities": commodities,
+        "matrix": matrix,
+        "data_dates": data_dates,
+        "partial": bool(timed_out or errors),
+        "timed_out": timed_out,
+        "failed": [{"regency_id": r, "error": e} for r, e in errors.items()],
+        "filter_applied": commodity_filter if commodity_filter else None,
+        "mode": mode,
+        "elapsed_ms": elapsed_ms
+    }
+
 # -------------------------------------------------
 # 🔹 DATA MASTER
 # -------------------------------------------------
 
 def get_provinces() -> Dict:
-    """Ambil daftar provinsi"""
+    """Ambil daftar provinsi (dari snapshot data master)"""
+    return master_snapshot.get("provinces", _fetch_provinces)
+
+def _fetch_provinces() -> Dict:
+    """Ambil daftar provinsi dari BI"""
     try:
-        url = f"{BASE_URL}/Home/GetProvinceAll"
-        
-        session = create_session()
-        r = session.get(url, timeout=15)
-        r.raise_for_status()
-        raw_data = r.json()
+        raw_data = _fetch_json("/Home/GetProvinceAll")
         
         # Parse response
         if isinstance(raw_data, dict) and 'data' in raw_data:
@@ -418,21 +1136,21 @@ def get_provinces() -> Dict:
         }
 
 def get_regencies(province_id: str) -> Dict:
-    """Ambil daftar kabupaten/kota berdasarkan provinsi"""
+    """Ambil daftar kabupaten/kota berdasarkan provinsi (dari snapshot data master)"""
     if not province_id:
         return {
             "success": False,
             "message": "Parameter province_id diperlukan"
         }
     
+    return master_snapshot.get(f"regencies:{province_id}", lambda: _fetch_regencies(province_id))
+
+def _fetch_regencies(province_id: str) -> Dict:
+    """Ambil daftar kabupaten/kota dari BI"""
     try:
-        url = f"{BASE_URL}/Home/GetRegencyAll"
         params = {"ref_prov_id": province_id}
         
-        session = create_session()
-        r = session.get(url, params=params, timeout=15)
-        r.raise_for_status()
-        data = r.json()
+        data = _fetch_json("/Home/GetRegencyAll", params)
         
         return {
             "success": True,
@@ -445,14 +1163,13 @@ def get_regencies(province_id: str) -> Dict:
         }
 
 def get_commodities() -> Dict:
-    """Ambil daftar kategori komoditas"""
+    """Ambil daftar kategori komoditas (dari snapshot data master)"""
+    return master_snapshot.get("commodities", _fetch_commodities)
+
+def _fetch_commodities() -> Dict:
+    """Ambil tree komoditas dari BI"""
     try:
-        url = f"{BASE_URL}/Home/GetCommoditiesTree"
-        
-        session = create_session()
-        r = session.get(url, timeout=15)
-        r.raise_for_status()
-        raw_data = r.json()
+        raw_data = _fetch_json("/Home/GetCommoditiesTree")
         
         print(f"[BI Service] Raw commodities response type: {type(raw_data)}")
         
@@ -511,15 +1228,64 @@ def get_commodities() -> Dict:
             "error": str(e)
         }
 
+def get_commodity_index() -> Optional[CommodityIndex]:
+    """Index tree komoditas (None kalau data komoditas tidak tersedia)"""
+    global _commodity_index, _commodity_source
+    result = get_commodities()
+    if not result.get("success"):
+        return None
+    commodities = result.get("commodities") or []
+    if _commodity_index is None or _commodity_source is not commodities:
+        _commodity_index = CommodityIndex(commodities)
+        _commodity_source = commodities
+    return _commodity_index
+
+def _commodity_matcher(commodity_filter: Optional[str]):
+    """
+    Fungsi filter nama baris grid untuk commodity_filter.
+    Baris dicocokkan lewat id (set membership); baris yang namanya tidak ada
+    di tree, atau kalau index tidak tersedia, pakai substring seperti dulu.
+    """
+    if not commodity_filter:
+        return lambda name: True
+
+    needle = normalize(commodity_filter)
+    index = get_commodity_index()
+    ids = index.resolve_filter(commodity_filter) if index else None
+    if not ids:
+        return lambda name: needle in normalize(name)
+
+    id_of = index.id_of
+    def match(name: str) -> bool:
+        node_id = id_of(name)
+        if node_id is None:
+            return needle in normalize(name)
+        return node_id in ids
+    return match
+
+def search_commodities(query: str, limit: int = 10) -> Dict:
+    """Autocomplete komoditas berdasarkan awalan kata"""
+    index = get_commodity_index()
+    if index is None:
+        return {
+            "success": False,
+            "error": "Data komoditas tidak tersedia"
+        }
+    data = index.search(query, limit)
+    return {
+        "success": True,
+        "data": data,
+        "total": len(data)
+    }
+
 def get_price_types() -> Dict:
-    """Ambil daftar jenis pasar (Pasar Tradisional / Modern)"""
+    """Ambil daftar jenis pasar (dari snapshot data master)"""
+    return master_snapshot.get("price_types", _fetch_price_types)
+
+def _fetch_price_types() -> Dict:
+    """Ambil daftar jenis pasar (Pasar Tradisional / Modern) dari BI"""
     try:
-        url = f"{BASE_URL}/Home/GetType"
-        
-        session = create_session()
-        r = session.get(url, timeout=15)
-        r.raise_for_status()
-        data = r.json()
+        data = _fetch_json("/Home/GetType")
         
         clean_data = [
             {
@@ -539,33 +1305,101 @@ def get_price_types() -> Dict:
             "error": str(e)
         }
 
-def get_latest_date() -> Dict:
-    """Ambil tanggal dengan fallback mechanism"""
+def _date_entry(date: datetime) -> Dict:
+    return {
+        "date": date.strftime("%d/%m/%Y"),
+        "day": date.strftime("%A"),
+        "display": date.strftime("%d %B %Y")
+    }
+
+def _generated_dates(limit: int) -> Dict:
+    """Fallback: `limit` hari kalender terakhir, tanpa tahu tanggal mana yang ada datanya"""
+    today = datetime.now()
+    available_dates = [_date_entry(today - timedelta(days=i)) for i in range(limit)]
+    return {
+        "success": True,
+        "latest_date": available_dates[0]["date"],
+        "available_dates": available_dates,
+        "source": "generated"
+    }
+
+def get_latest_date(province_id: str = '14',
+                    regency_id: str = '',
+                    price_type_id: str = '1',
+                    on_or_before: Optional[str] = None,
+                    limit: int = 30) -> Dict:
+    """
+    Tanggal yang benar-benar punya data untuk satu seri, dari price store lokal
+    (tanggal terbaru dulu). on_or_before (YYYY-MM-DD): tanggal berdata terdekat
+    <= tanggal itu dikembalikan di "nearest_date".
+    Kalau price store nonaktif / belum ada data, fallback ke 30 hari kalender.
+    """
     try:
-        today = datetime.now()
-        
-        # Generate 30 hari terakhir
-        available_dates = []
-        for i in range(30):
-            date = today - timedelta(days=i)
-            available_dates.append({
-                "date": date.strftime("%d/%m/%Y"),
-                "day": date.strftime("%A"),
-                "display": date.strftime("%d %B %Y")
-            })
-        
-        # Default response (fallback)
+        if on_or_before:
+            datetime.strptime(on_or_before, '%Y-%m-%d')
+    except ValueError:
+        return {
+            "success": False,
+            "error": "Format tanggal harus YYYY-MM-DD"
+        }
+
+    try:
+        key = (province_id, regency_id, price_type_id)
+        dates: List[str] = []
+        sync_error = None
+        if Config.PRICE_STORE_ENABLED:
+            sync_error = _upstream_flight.do("sync:" + ":".join(key), lambda: _sync_price_store(key))
+            dates = price_store.available_dates(key)
+
+        if not dates:
+            return _generated_dates(limit)
+
+        available_dates = [_date_entry(datetime.strptime(d, '%Y-%m-%d'))
+                           for d in reversed(dates[-limit:])]
         response_data = {
             "success": True,
-            "latest_date": available_dates[0]["date"],
+            "latest_date": _iso_to_display(price_store.latest_available(dates)),
             "available_dates": available_dates,
-            "source": "generated"
+            "first_date": _iso_to_display(dates[0]),
+            "total_dates": len(dates),
+            "source": "lokal",
+            "stale": bool(sync_error)
         }
-        
+        if on_or_before:
+            response_data["nearest_date"] = _iso_to_display(
+                price_store.nearest_available(dates, on_or_before))
         return response_data
-        
+
     except Exception as e:
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+# -------------------------------------------------
+# 🔹 CACHE MANAGEMENT
+# -------------------------------------------------
+
+def clear_cache(pattern: Optional[str] = None) -> Dict:
+    """
+    Hapus cache harga.
+    pattern: glob atas key "harga:province:regency:price_type:start:end:filter",
+             "cabai:province:regency:price_type:start:end" atau
+             "series:province:regency:price_type:start:end:...", contoh "*:14:*".
+             Kosong = hapus semua.
+    """
+    cleared = _harga_cache.invalidate(pattern)
+    print(f"[BI Service] Cache cleared: {cleared} entry (pattern: {pattern or '*'})")
+    return {
+        "success": True,
+        "cleared": cleared,
+        "pattern": pattern or "*"
+    }
+
+def cache_stats() -> Dict:
+    """Statistik cache harga (termasuk cadangan hasil sukses terakhir)"""
+    return {**_harga_cache.stats(), "last_good": _last_good.stats()}
+
+def singleflight_stats() -> Dict:
+    """Statistik penggabungan fetch upstream (berapa caller digabung per fetch)"""
+    return _upstream_flight.stats()
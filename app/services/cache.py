@@ -0,0 +1,165 @@
+"""
+app/services/cache.py
+Cache in-process dengan TTL, LRU eviction dan stale-while-revalidate
+"""
+
+import contextlib
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from config import Config
+
+HIT = "hit"
+STALE = "stale"
+MISS = "miss"
+
+
+class TTLCache:
+    """
+    Cache key → value dengan dua batas umur:
+      - ttl       : selama ini entry dianggap fresh
+      - stale_ttl : setelah ttl, entry masih boleh disajikan (stale) sampai umur ini,
+                    sambil satu refresh berjalan di background
+    Entry paling lama tidak dipakai dibuang kalau jumlah entry > maxsize.
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: float = 3600,
+                 stale_ttl: float = 86400):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0,
+                       "refreshes": 0, "refresh_errors": 0, "evictions": 0}
+
+    # -------------------------------------------------
+    # 🔹 OPERASI DASAR
+    # -------------------------------------------------
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Return (value, is_stale) atau None kalau tidak ada / sudah kadaluarsa"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if age > self.stale_ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value, age > self.ttl
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, pattern: Optional[str] = None) -> int:
+        """Hapus entry yang key-nya cocok dengan pattern glob (None = semua)"""
+        with self._lock:
+            if not pattern or pattern == "*":
+                count = len(self._data)
+                self._data.clear()
+                return count
+            keys = [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "backend": "memory",
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                **self._stats
+            }
+
+    # -------------------------------------------------
+    # 🔹 STALE-WHILE-REVALIDATE
+    # -------------------------------------------------
+
+    def get_or_load(self, key: str, loader: Callable[[], Any],
+                    cacheable: Callable[[Any], bool] = lambda v: True) -> Tuple[Any, str]:
+        """
+        Ambil dari cache, atau panggil loader kalau belum ada.
+        Entry stale langsung dikembalikan, dan satu refresh dijalankan di background.
+        Return: (value, status) dengan status HIT / STALE / MISS
+        """
+        cached = self.get(key)
+        if cached is not None:
+            value, is_stale = cached
+            if not is_stale:
+                self._count("hits")
+                return value, HIT
+            self._count("stale_hits")
+            self._refresh_in_background(key, loader, cacheable)
+            return value, STALE
+
+        self._count("misses")
+        value = loader()
+        if cacheable(value):
+            self.set(key, value)
+        return value, MISS
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Any],
+                               cacheable: Callable[[Any], bool]) -> bool:
+        """Mulai satu refresh background untuk key; False kalau sudah ada yang berjalan"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        # Loader yang butuh app context (config / extension Flask) tetap jalan di thread background
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def run():
+            try:
+                with app.app_context() if app is not None else contextlib.nullcontext():
+                    value = loader()
+                if cacheable(value):
+                    self.set(key, value)
+                    self._count("refreshes")
+                else:
+                    self._count("refresh_errors")
+            except Exception as e:
+                print(f"[Cache {self.name}] Refresh gagal untuk {key}: {e}")
+                self._count("refresh_errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"cache-refresh-{self.name}", daemon=True).start()
+        return True
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[field] += n
+
+
+def make_cache(name: str, maxsize: int = 256, ttl: float = 3600,
+               stale_ttl: float = 86400) -> TTLCache:
+    """
+    Buat cache sesuai Config.CACHE_BACKEND:
+      - sqlite : SharedCache, dipakai bersama semua worker di host ini
+      - memory : TTLCache per worker
+    """
+    if Config.CACHE_BACKEND == "sqlite":
+        from app.services.shared_cache import SharedCache
+        return SharedCache(name, maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
+    return TTLCache(name, maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
@@ -0,0 +1,152 @@
+"""
+app/services/circuit_breaker.py
+Circuit breaker untuk panggilan ke upstream (API BI)
+
+  - closed    : panggilan diteruskan; kegagalan atau panggilan yang melewati
+                latency SLO berturut-turut dihitung
+  - open      : setelah `threshold` panggilan buruk berturut-turut, semua
+                panggilan langsung ditolak (CircuitOpenError) tanpa menunggu
+                timeout, sehingga worker tidak tertahan
+  - half-open : thread background menjalankan probe setelah `reset_timeout`;
+                probe sukses → closed, gagal → open lagi (jeda diperpanjang)
+Pemulihan tidak butuh traffic karena probe berjalan sendiri.
+"""
+
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Panggilan ditolak karena circuit sedang open"""
+
+
+class CircuitBreaker:
+
+    def __init__(self, name: str, probe: Callable[[], Any], threshold: int = 5,
+                 latency_slo: float = 8.0, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 300.0):
+        self.name = name
+        self.probe = probe
+        self.threshold = threshold
+        self.latency_slo = latency_slo
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._bad_streak = 0
+        self._opened_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0,
+                       "times_opened": 0, "probes": 0, "probe_failures": 0}
+
+    # -------------------------------------------------
+    # 🔹 PANGGILAN
+    # -------------------------------------------------
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        self._admit()
+        started = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            self._record(ok=False, slow=False, error=str(e))
+            raise
+        self._record_latency(started)
+        return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Versi asyncio dari call(); pembatalan (CancelledError) tidak dihitung gagal"""
+        self._admit()
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except Exception as e:
+            self._record(ok=False, slow=False, error=str(e))
+            raise
+        self._record_latency(started)
+        return result
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(
+                    f"{self.name} sedang tidak tersedia (circuit {self.state}), coba lagi nanti"
+                )
+            self._stats["calls"] += 1
+
+    def _record_latency(self, started: float) -> None:
+        elapsed = time.monotonic() - started
+        slow = elapsed > self.latency_slo
+        self._record(ok=not slow, slow=slow,
+                     error=f"latency {elapsed:.1f}s > SLO {self.latency_slo}s" if slow else None)
+
+    def _record(self, ok: bool, slow: bool, error: Optional[str]) -> None:
+        with self._lock:
+            if ok:
+                self._bad_streak = 0
+                return
+            self._stats["slow_calls" if slow else "failures"] += 1
+            self._last_error = error
+            if self.state != CLOSED:
+                return
+            self._bad_streak += 1
+            if self._bad_streak < self.threshold:
+                return
+            self.state = OPEN
+            self._opened_at = time.time()
+            self._stats["times_opened"] += 1
+
+        print(f"[Circuit {self.name}] OPEN setelah {self.threshold} panggilan buruk: {error}")
+        threading.Thread(target=self._probe_loop, name=f"circuit-probe-{self.name}",
+                         daemon=True).start()
+
+    # -------------------------------------------------
+    # 🔹 PROBE HALF-OPEN
+    # -------------------------------------------------
+
+    def _probe_loop(self) -> None:
+        delay = self.reset_timeout
+        while True:
+            time.sleep(delay)
+            with self._lock:
+                self.state = HALF_OPEN
+                self._stats["probes"] += 1
+            try:
+                started = time.monotonic()
+                self.probe()
+                if time.monotonic() - started > self.latency_slo:
+                    raise RuntimeError("probe melewati latency SLO")
+            except Exception as e:
+                with self._lock:
+                    self.state = OPEN
+                    self._stats["probe_failures"] += 1
+                    self._last_error = f"probe: {e}"
+                delay = min(delay * 2, self.max_reset_timeout)
+                print(f"[Circuit {self.name}] Probe gagal ({e}), coba lagi dalam {delay:.0f}s")
+                continue
+
+            with self._lock:
+                self.state = CLOSED
+                self._bad_streak = 0
+                self._opened_at = None
+            print(f"[Circuit {self.name}] Probe sukses, circuit CLOSED")
+            return
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state,
+                "bad_streak": self._bad_streak,
+                "threshold": self.threshold,
+                "latency_slo": self.latency_slo,
+                "open_seconds": round(time.time() - self._opened_at) if self._opened_at else 0,
+                "last_error": self._last_error,
+                **self._stats
+            }
@@ -0,0 +1,122 @@
+"""
+app/services/commodity_index.py
+Index tree komoditas BI untuk lookup id O(1), filter dan autocomplete
+
+Dibangun sekali dari hasil get_commodities():
+  - id → node
+  - nama ternormalisasi → id
+  - parent → children (adjacency)
+  - daftar (prefix kata, id) terurut untuk pencarian prefix dengan bisect
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(name: Optional[str]) -> str:
+    """Nama komoditas → bentuk pembanding: huruf kecil, spasi dirapikan"""
+    return _SPACES.sub(" ", (name or "").strip().lower())
+
+
+FILTER_CACHE_SIZE = 256                 # filter commodity_filter yang hasilnya diingat
+
+
+class CommodityIndex:
+
+    def __init__(self, commodities: List[Dict]):
+        self.by_id: Dict[str, Dict] = {}
+        self.id_by_name: Dict[str, str] = {}
+        self.children: Dict[str, List[str]] = {}
+        self._prefixes = []                 # (potongan nama mulai dari awal kata, id), terurut
+        self._raw_ids: Dict[str, Optional[str]] = {}
+        # LRU kecil: filter berasal dari input request, jadi jumlahnya tidak boleh tumbuh bebas
+        self._filters: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._filters_lock = threading.Lock()
+
+        for node in commodities:
+            node_id = str(node["id"])
+            self.by_id[node_id] = node
+            self.id_by_name.setdefault(normalize(node["name"]), node_id)
+            parent_id = node.get("parent_id")
+            if parent_id is not None:
+                self.children.setdefault(str(parent_id), []).append(node_id)
+
+        for name, node_id in self.id_by_name.items():
+            # "cabai rawit merah" bisa ditemukan dengan "cab", "rawit", "merah"
+            starts = [0] + [m.end() for m in _SPACES.finditer(name)]
+            for start in starts:
+                self._prefixes.append((name[start:], node_id))
+        self._prefixes.sort()
+
+    # -------------------------------------------------
+    # 🔹 LOOKUP
+    # -------------------------------------------------
+
+    def id_of(self, name: str) -> Optional[str]:
+        """Id komoditas untuk nama baris grid (hasil dimemo per string mentah)"""
+        try:
+            return self._raw_ids[name]
+        except KeyError:
+            node_id = self._raw_ids[name] = self.id_by_name.get(normalize(name))
+            return node_id
+
+    def descendants(self, node_id: str) -> List[str]:
+        """node_id beserta semua turunannya"""
+        result = []
+        stack = [node_id]
+        while stack:
+            current = stack.pop()
+            result.append(current)
+            stack.extend(self.children.get(current, []))
+        return result
+
+    def resolve_filter(self, text: str) -> FrozenSet[str]:
+        """
+        commodity_filter → set id komoditas (dihitung sekali per filter).
+        Cocok kalau filter adalah id, atau substring nama (seperti filter lama);
+        kategori yang cocok ikut membawa semua turunannya.
+        """
+        key = normalize(text)
+        with self._filters_lock:
+            cached = self._filters.get(key)
+            if cached is not None:
+                self._filters.move_to_end(key)
+                return cached
+
+        if text.strip() in self.by_id:
+            roots = [text.strip()]
+        else:
+            roots = [node_id for name, node_id in self.id_by_name.items() if key in name]
+
+        ids = set()
+        for node_id in roots:
+            ids.update(self.descendants(node_id))
+        result = frozenset(ids)
+        with self._filters_lock:
+            self._filters[key] = result
+            while len(self._filters) > FILTER_CACHE_SIZE:
+                self._filters.popitem(last=False)
+        return result
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Autocomplete: komoditas yang salah satu katanya diawali prefix"""
+        key = normalize(prefix)
+        if not key:
+            return []
+        result = []
+        seen = set()
+        idx = bisect_left(self._prefixes, (key, ""))
+        while idx < len(self._prefixes) and len(result) < limit:
+            text, node_id = self._prefixes[idx]
+            if not text.startswith(key):
+                break
+            if node_id not in seen:
+                seen.add(node_id)
+                result.append(self.by_id[node_id])
+            idx += 1
+        return result
@@ -0,0 +1,70 @@
+"""
+app/services/downsample.py
+Downsampling seri harga untuk chart
+
+Kedua metode mengembalikan indeks titik asli yang dipertahankan (terurut),
+jadi hasilnya tetap harga yang benar-benar tercatat BI, bukan rata-rata.
+  - lttb   : Largest-Triangle-Three-Buckets, menjaga bentuk visual garis
+  - minmax : titik minimum dan maksimum per bucket, menjaga puncak/lembah
+"""
+
+from typing import List, Sequence
+
+METHODS = ("lttb", "minmax")
+MIN_POINTS = 4                          # lttb butuh >= 3, minmax >= 4 titik target
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Pilih `threshold` indeks dari (xs, ys) dengan algoritma LTTB"""
+    n = len(xs)
+    threshold = max(threshold, 3)
+    if threshold >= n:
+        return list(range(n))
+
+    selected = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
+
+
+def minmax(ys: Sequence[float], threshold: int) -> List[int]:
+    """Pilih indeks min & max per bucket (threshold / 2 bucket), plus titik pertama dan terakhir"""
+    n = len(ys)
+    threshold = max(threshold, 4)
+    if threshold >= n:
+        return list(range(n))
+
+    buckets = (threshold - 2) // 2
+    bucket_size = (n - 2) / buckets
+    selected = {0, n - 1}
+    for i in range(buckets):
+        start = int(i * bucket_size) + 1
+        end = min(int((i + 1) * bucket_size) + 1, n - 1)
+        if start >= end:
+            continue
+        window = range(start, end)
+        selected.add(min(window, key=ys.__getitem__))
+        selected.add(max(window, key=ys.__getitem__))
+    return sorted(selected)
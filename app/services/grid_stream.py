@@ -0,0 +1,168 @@
+"""
+app/services/grid_stream.py
+Parser JSON incremental untuk response GetGridDataDaerah
+
+Response dibaca per chunk (requests stream=True). Hanya satu baris grid yang
+ditahan sebagai dict pada satu waktu; baris kategori (level 1) dan komoditas
+yang tidak cocok dilewati tanpa pernah dijadikan dict.
+Format yang didukung: {"data": [ {...}, ... ], ...} atau [ {...}, ... ]
+dengan baris berupa objek datar (tanpa objek/array bersarang), seperti grid BI.
+"""
+
+import codecs
+import json
+import re
+from typing import Callable, Dict, Iterable, Iterator, Optional, Union
+
+# Tokenizer header: cukup string dan kurung untuk menemukan array "data"
+_SPECIAL = re.compile(r'[{}\[\]"]')
+_STRING_END = re.compile(r'["\\]')
+
+# Satu objek baris datar; quantifier possessive supaya gagal cepat (linear)
+# kalau objek belum lengkap di buffer
+_ROW = re.compile(r'\{(?:[^{}"\\]++|"(?:[^"\\]++|\\.)*+")*+\}')
+_SEPARATOR = re.compile(r'[\s,]*+')
+_LEVEL = re.compile(r'"level"\s*:\s*"?(\d+)')
+_NAME = re.compile(r'"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+class GridStreamParser:
+    """
+    Dua fase:
+      1. header: tokenizer minimal (string + kedalaman kurung) sampai
+         menemukan array baris ("data" di objek teratas, atau array teratas)
+      2. baris : setiap objek baris dicocokkan utuh dengan regex, lalu
+         diputuskan dari teks (level / name) sebelum di-json.loads
+    """
+
+    def __init__(self, keep: Optional[Callable[[str], bool]] = None):
+        self.keep = keep
+        self.buf = ""
+        self.pos = 0
+        # fase header
+        self.depth = 0
+        self.top = None
+        self.in_string = False
+        self.string_start = None
+        self.last_string = None
+        # fase baris
+        self.in_rows = False
+        self.rows_done = False
+        self.rows = 0
+        self.skipped = 0
+
+    def feed(self, text: str) -> Iterator[Dict]:
+        """Proses potongan teks, yield baris yang lengkap dan lolos filter"""
+        self.buf += text
+        if not self.in_rows:
+            self._scan_header()
+        if self.in_rows and not self.rows_done:
+            yield from self._scan_rows()
+
+        # Buang teks yang sudah diproses
+        keep_from = self.pos if self.string_start is None else self.string_start
+        self.buf = self.buf[keep_from:]
+        self.pos -= keep_from
+        if self.string_start is not None:
+            self.string_start -= keep_from
+
+    def _scan_header(self) -> None:
+        buf = self.buf
+        i = self.pos
+        while i < len(buf):
+            if self.in_string:
+                m = _STRING_END.search(buf, i)
+                if m is None:
+                    i = len(buf)
+                    break
+                if m.group() == '\\':
+                    if m.end() >= len(buf):
+                        # Escape terpotong di akhir chunk, tunggu chunk berikutnya
+                        i = m.start()
+                        break
+                    i = m.end() + 1
+                    continue
+                self.in_string = False
+                if self.string_start is not None:
+                    self.last_string = buf[self.string_start:m.start()]
+                    self.string_start = None
+                i = m.end()
+                continue
+
+            m = _SPECIAL.search(buf, i)
+            if m is None:
+                i = len(buf)
+                break
+            c = m.group()
+            i = m.end()
+            if c == '"':
+                self.in_string = True
+                if self.depth == 1 and self.top == '{':
+                    self.string_start = i
+            elif c == '{' or c == '[':
+                if self.depth == 0:
+                    self.top = c
+                if c == '[' and (self.depth == 0 or
+                                 (self.depth == 1 and self.top == '{' and self.last_string == 'data')):
+                    self.in_rows = True
+                    break
+                self.depth += 1
+            else:
+                self.depth -= 1
+        self.pos = i
+
+    def _scan_rows(self) -> Iterator[Dict]:
+        buf = self.buf
+        while True:
+            i = _SEPARATOR.match(buf, self.pos).end()
+            if i >= len(buf):
+                self.pos = i
+                return
+            if buf[i] == ']':
+                self.pos = i + 1
+                self.rows_done = True
+                return
+            if buf[i] != '{':
+                raise ValueError("Format data tidak sesuai")
+            m = _ROW.match(buf, i)
+            if m is None:
+                # Baris belum lengkap, tunggu chunk berikutnya
+                self.pos = i
+                return
+            self.pos = m.end()
+            row = self._finish_row(m.group())
+            if row is not None:
+                yield row
+
+    def _finish_row(self, text: str) -> Optional[Dict]:
+        self.rows += 1
+        level = _LEVEL.search(text)
+        if level and int(level.group(1)) == 1:
+            self.skipped += 1
+            return None
+        if self.keep is not None:
+            name = _NAME.search(text)
+            name = json.loads(f'"{name.group(1)}"') if name else 'Unknown'
+            if not self.keep(name):
+                self.skipped += 1
+                return None
+        return json.loads(text)
+
+    def close(self) -> None:
+        if not self.rows_done:
+            raise ValueError("Format data tidak sesuai")
+
+
+def iter_rows(chunks: Iterable[Union[bytes, str]],
+              keep: Optional[Callable[[str], bool]] = None) -> Iterator[Dict]:
+    """
+    Yield baris grid (level != 1) dari potongan response.
+    keep: filter nama komoditas; baris yang tidak lolos tidak di-parse ke dict.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parser = GridStreamParser(keep)
+    for chunk in chunks:
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        yield from parser.feed(text)
+    yield from parser.feed(decoder.decode(b"", final=True))
+    parser.close()
@@ -0,0 +1,159 @@
+"""
+app/services/grid_transform.py
+Transformasi grid GetGridDataDaerah ke matrix komoditas × tanggal
+
+Header tanggal di-parse sekali per grid, harga di-parse sekali per string unik,
+lalu harga terbaru/sebelumnya semua komoditas dihitung dari matrix.
+"""
+
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+NAN = float("nan")
+
+
+def _iso_date(date_key: str) -> Optional[str]:
+    """D/M/YYYY → YYYY-MM-DD, None kalau bukan tanggal"""
+    parts = date_key.split('/')
+    if len(parts) != 3:
+        return None
+    day, month, year = parts
+    if not (day.isdigit() and month.isdigit() and year.isdigit()):
+        return None
+    return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+
+def _price(value) -> float:
+    """String harga BI ("13,950" / "13.950" / "-") → float, NaN kalau kosong"""
+    if not value or value == "-":
+        return NAN
+    try:
+        price = float(str(value).replace(',', '').replace('.', ''))
+    except ValueError:
+        return NAN
+    return price if price > 0 else NAN
+
+
+class GridMatrix:
+    """
+    Grid BI dalam bentuk kolom:
+      dates  : tanggal ISO terurut naik (satu per kolom)
+      keys   : key tanggal asli dari BI per kolom (untuk output latest_date)
+      names  : nama komoditas per baris
+      values : array('d') per baris, NaN = tidak ada harga
+    """
+
+    __slots__ = ("dates", "keys", "names", "values")
+
+    def __init__(self, dates: List[str], keys: List[str],
+                 names: List[str], values: List[array]):
+        self.dates = dates
+        self.keys = keys
+        self.names = names
+        self.values = values
+
+
+def build_matrix(data_list: Iterable[Dict],
+                 match: Optional[Callable[[str], bool]] = None) -> GridMatrix:
+    """
+    Bangun matrix dari baris grid (baris level 1 / kategori dilewati).
+    Satu pass atas data_list, jadi bisa diberi generator baris (streaming):
+    tiap baris dict boleh dibuang begitu sudah dipindah ke matrix.
+    """
+    # Key tanggal → kolom sementara (urutan kemunculan), -1 kalau bukan tanggal.
+    # Header tanggal di-parse sekali per key unik.
+    key_col: Dict[str, int] = {}
+    col_iso: List[str] = []
+    col_key: List[str] = []
+
+    # Harga: parse setiap string unik sekali saja
+    price_memo: Dict[str, float] = {}
+    names = []
+    sparse_rows = []
+
+    for item in data_list:
+        if item.get('level', 0) == 1:
+            continue
+        name = item.get('name', 'Unknown')
+        if match is not None and not match(name):
+            continue
+
+        cols = array('i')
+        prices = array('d')
+        for key, raw in item.items():
+            col = key_col.get(key)
+            if col is None:
+                iso = _iso_date(key) if isinstance(key, str) and '/' in key else None
+                if iso:
+                    col = len(col_iso)
+                    col_iso.append(iso)
+                    col_key.append(key)
+                else:
+                    col = -1
+                key_col[key] = col
+            if col < 0:
+                continue
+            price = price_memo.get(raw)
+            if price is None:
+                price = price_memo[raw] = _price(raw)
+            if price == price:          # bukan NaN
+                cols.append(col)
+                prices.append(price)
+
+        names.append(name)
+        sparse_rows.append((cols, prices))
+
+    # Urutkan kolom berdasarkan tanggal, lalu isi matrix padat
+    order = sorted(range(len(col_iso)), key=col_iso.__getitem__)
+    remap = array('i', [0]) * len(order)
+    for new_col, old_col in enumerate(order):
+        remap[old_col] = new_col
+
+    n_cols = len(order)
+    values = []
+    for cols, prices in sparse_rows:
+        row = array('d', [NAN]) * n_cols
+        for col, price in zip(cols, prices):
+            row[remap[col]] = price
+        values.append(row)
+
+    return GridMatrix(
+        dates=[col_iso[c] for c in order],
+        keys=[col_key[c] for c in order],
+        names=names,
+        values=values
+    )
+
+
+def latest_and_previous(matrix: GridMatrix) -> List[Tuple[int, int, float, Optional[float]]]:
+    """
+    Untuk setiap baris: (row, kolom harga terbaru, harga terbaru, harga sebelumnya).
+    Baris tanpa harga sama sekali tidak dikembalikan.
+    """
+    result = []
+    for row_idx, row in enumerate(matrix.values):
+        latest_col = -1
+        prev_price = None
+        col = len(row) - 1
+        while col >= 0:
+            price = row[col]
+            if price == price:          # bukan NaN
+                if latest_col < 0:
+                    latest_col = col
+                else:
+                    prev_price = price
+                    break
+            col -= 1
+        if latest_col >= 0:
+            result.append((row_idx, latest_col, row[latest_col], prev_price))
+    return result
+
+
+def iter_points(matrix: GridMatrix):
+    """Yield (commodity, tanggal ISO, harga) untuk semua sel yang berisi harga"""
+    dates = matrix.dates
+    for name, row in zip(matrix.names, matrix.values):
+        name = name.strip()
+        for col, price in enumerate(row):
+            if price == price:
+                yield name, dates[col], price
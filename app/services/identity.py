@@ -0,0 +1,99 @@
+"""
+app/services/identity.py
+Identitas user yang sedang login untuk route produk, keranjang & toko
+
+Sumber identitas:
+  - header "Authorization: Bearer <token>" (session_token, diterbitkan saat
+    login): diverifikasi tanpa query ke MySQL
+  - header X-User-Id (cara lama, bisa dipalsukan): hanya kalau
+    AUTH_ALLOW_USER_ID_HEADER aktif (default true), selama client lama belum kirim token
+
+Lookup users untuk X-User-Id di-memo dua lapis:
+  - per request di flask.g, jadi beberapa pemanggilan dalam satu request
+    hanya sekali lookup
+  - antar request di cache "identity" (IDENTITY_CACHE_TTL detik, tanpa
+    stale), dipakai bersama semua worker kalau CACHE_BACKEND=sqlite
+Yang disimpan hanya kolom untuk otorisasi: id, role, nama. invalidate() saat
+role user berubah (mis. daftar toko → petani) membuang entry cache dan
+mencabut token user itu.
+"""
+
+from typing import Dict, Optional
+
+from flask import g, has_app_context, request
+
+from config import Config
+from app.config.database import fetch_one
+from app.services import session_token
+from app.services.cache import make_cache
+
+_identity_cache = make_cache(
+    "identity",
+    maxsize=Config.IDENTITY_CACHE_MAXSIZE,
+    ttl=Config.IDENTITY_CACHE_TTL,
+    stale_ttl=Config.IDENTITY_CACHE_TTL
+)
+
+_MISSING = object()
+
+
+def _key(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def _load_user(user_id: str) -> Optional[Dict]:
+    return fetch_one('SELECT id, role, nama FROM users WHERE id = %s', (user_id,))
+
+
+def _user_from_token(token: str) -> Optional[Dict]:
+    claims = session_token.verify(token)
+    if claims is None:
+        return None
+    return {'id': claims['uid'], 'role': claims['role'], 'is_verified_seller': claims['seller']}
+
+
+def _user_from_header() -> Optional[Dict]:
+    user_id = (request.headers.get('X-User-Id') or '').strip()
+    if not user_id.isdigit():
+        if user_id:
+            print(f"[Identity] X-User-Id tidak valid: {user_id[:20]!r}")
+        return None
+    user, _ = _identity_cache.get_or_load(
+        _key(user_id), lambda: _load_user(user_id), cacheable=lambda u: u is not None
+    )
+    return user
+
+
+def get_current_user() -> Optional[Dict]:
+    """
+    User yang sedang login: dari token Bearer, atau X-User-Id kalau diizinkan.
+    Return dict (id, role, ...) atau None kalau tidak terautentikasi.
+    Token yang dikirim tapi tidak valid tidak jatuh ke X-User-Id.
+    """
+    user = g.get("_current_user", _MISSING)
+    if user is not _MISSING:
+        return user
+
+    auth = request.headers.get('Authorization') or ''
+    if auth[:7].lower() == 'bearer ':
+        user = _user_from_token(auth[7:].strip())
+    elif Config.AUTH_ALLOW_USER_ID_HEADER:
+        user = _user_from_header()
+    else:
+        user = None
+
+    g._current_user = user
+    return user
+
+
+def invalidate(user_id) -> None:
+    """Buang identitas user dari cache dan cabut tokennya (panggil setelah role / status user berubah)"""
+    _identity_cache.invalidate(_key(user_id))
+    session_token.revoke_user(user_id)
+    current = g.get("_current_user") if has_app_context() else None
+    if current and str(current.get('id')) == str(user_id):
+        g.pop("_current_user", None)
+
+
+def stats() -> Dict:
+    return {**_identity_cache.stats(), "tokens": session_token.stats()}
@@ -0,0 +1,131 @@
+"""
+app/services/keyset.py
+Pagination keyset (seek) dengan cursor opaque untuk daftar produk
+
+Halaman berikutnya dicari dengan WHERE (kolom, id) setelah baris terakhir
+halaman sebelumnya, bukan OFFSET, jadi halaman ke-100 sama murahnya dengan
+halaman pertama selama ada index yang cocok, mis.
+    (status_produk, tanggal_upload, id) dan (status_produk, harga_per_kg, id)
+id menjadi tie-breaker supaya urutan total dan tidak ada baris yang
+terlewat / terulang walau nilainya sama.
+Kolom sort boleh NULL (mis. produk lama tanpa tanggal_upload): MySQL
+mengurutkan NULL sebagai nilai terkecil, jadi predikat seek ikut
+memperlakukan NULL begitu, dan cursor menyimpan nilai null apa adanya.
+
+Cursor = base64url(JSON {sort, arah, nilai kolom, id}). Isinya hanya batas
+halaman dan selalu dipakai sebagai parameter query, jadi tidak perlu
+ditandatangani; cursor yang rusak / beda sort ditolak dengan ValueError.
+"""
+
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+
+NEXT = "next"
+PREV = "prev"
+
+# sort → (kolom, tipe nilai, urutan)
+SORTS = {
+    "terbaru": ("p.tanggal_upload", "datetime", "DESC"),
+    "termurah": ("p.harga_per_kg", "decimal", "ASC"),
+    "termahal": ("p.harga_per_kg", "decimal", "DESC"),
+}
+
+
+def _field(column: str) -> str:
+    """Nama key di row dict untuk kolom ber-alias (p.harga_per_kg → harga_per_kg)"""
+    return column.split(".")[-1]
+
+
+def _dump_value(value, kind: str) -> Optional[str]:
+    if value is None:
+        return None
+    if kind == "datetime":
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def _load_value(text: Optional[str], kind: str):
+    if text is None:
+        return None
+    if kind == "datetime":
+        return datetime.fromisoformat(text)
+    return Decimal(text)
+
+
+def _after(column: str, op: str, value) -> Tuple[str, List]:
+    """
+    Predikat "setelah (value, id)" dengan NULL sebagai nilai terkecil:
+    arah ">" tidak pernah memuat NULL kecuali dari cursor NULL, arah "<" selalu memuatnya.
+    """
+    if value is None:
+        if op == ">":
+            return f"(({column} IS NULL AND p.id > %s) OR {column} IS NOT NULL)", []
+        return f"({column} IS NULL AND p.id < %s)", []
+    condition = f"({column} {op} %s OR ({column} = %s AND p.id {op} %s)"
+    if op == "<":
+        condition += f" OR {column} IS NULL"
+    return condition + ")", [value, value]
+
+
+def encode(sort: str, direction: str, row: Dict) -> str:
+    column, kind, _ = SORTS[sort]
+    payload = {"s": sort, "d": direction, "v": _dump_value(row[_field(column)], kind), "i": int(row["id"])}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode(cursor: str, sort: str) -> Tuple[str, object, int]:
+    """Return (arah, nilai kolom, id); ValueError kalau cursor tidak valid untuk sort ini"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        direction, value, row_id = payload["d"], payload["v"], int(payload["i"])
+        if payload["s"] != sort or direction not in (NEXT, PREV):
+            raise ValueError("cursor tidak cocok dengan sort")
+        return direction, _load_value(value, SORTS[sort][1]), row_id
+    except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+        raise ValueError(f"Cursor tidak valid: {e}") from None
+
+
+def seek(sort: str, cursor: Optional[str]) -> Tuple[str, List, str, str]:
+    """
+    Potongan SQL untuk satu halaman.
+    Return: (kondisi WHERE tambahan atau "", params, ORDER BY, arah)
+    Arah PREV membalik urutan; baris hasilnya dibalik lagi oleh page().
+    """
+    column, _, order = SORTS[sort]
+    direction, condition, params = NEXT, "", []
+    if cursor:
+        direction, value, row_id = decode(cursor, sort)
+        forward = (order == "DESC") == (direction == NEXT)
+        op = "<" if forward else ">"
+        condition, params = _after(column, op, value)
+        params.append(row_id)
+    if direction == PREV:
+        order = "ASC" if order == "DESC" else "DESC"
+    return condition, params, f"{column} {order}, p.id {order}", direction
+
+
+def page(sort: str, cursor: Optional[str], direction: str, rows: List[Dict],
+         limit: int) -> Tuple[List[Dict], Optional[str], Optional[str]]:
+    """
+    rows: hasil query dengan LIMIT limit + 1.
+    Return: (baris halaman urut tampilan, next_cursor, prev_cursor)
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == PREV:
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+
+    if direction == NEXT:
+        has_next, has_prev = has_more, bool(cursor)
+    else:
+        has_next, has_prev = True, has_more
+    next_cursor = encode(sort, NEXT, rows[-1]) if has_next else None
+    prev_cursor = encode(sort, PREV, rows[0]) if has_prev else None
+    return rows, next_cursor, prev_cursor
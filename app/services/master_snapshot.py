@@ -0,0 +1,167 @@
+"""
+app/services/master_snapshot.py
+Snapshot data master BI (provinsi, kabupaten/kota, komoditas, jenis harga)
+
+Data master hampir tidak pernah berubah, jadi disimpan di file JSON,
+dimuat ke memori saat worker start, dan di-refresh di background kalau
+sudah lebih tua dari MASTER_SNAPSHOT_TTL. Kalau BI sedang down, snapshot
+lama tetap disajikan. File snapshot dipakai bersama semua worker: entry
+basi dicek dulu ke file sebelum worker ini me-refresh sendiri.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config import Config
+
+_entries: Dict[str, Dict] = {}      # name → {"result": ..., "fetched_at": epoch}
+_loaded = False
+_lock = threading.Lock()
+_refreshing = set()
+
+# -------------------------------------------------
+# 🔧 FILE SNAPSHOT
+# -------------------------------------------------
+
+def _read_file() -> Dict[str, Dict]:
+    try:
+        with open(Config.MASTER_SNAPSHOT_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"[Master Snapshot] Gagal membaca snapshot: {e}")
+        return {}
+
+
+def _write_file() -> None:
+    """
+    Tulis snapshot secara atomik. Entry dari worker lain yang lebih baru
+    (sudah ada di file) tidak ditimpa.
+    """
+    path = Config.MASTER_SNAPSHOT_PATH
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    with _lock:
+        merged = _read_file()
+        for name, entry in _entries.items():
+            if entry["fetched_at"] >= merged.get(name, {}).get("fetched_at", 0):
+                merged[name] = entry
+
+    # Nama temp unik per penulis: refresh background beberapa entry bisa menulis
+    # bersamaan dari thread berbeda di worker yang sama
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                    dir=folder or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(merged, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load() -> int:
+    """Muat snapshot dari disk ke memori (dipanggil saat worker start)"""
+    global _loaded
+    data = _read_file()
+    with _lock:
+        for name, entry in data.items():
+            if entry["fetched_at"] >= _entries.get(name, {}).get("fetched_at", 0):
+                _entries[name] = entry
+        _loaded = True
+    print(f"[Master Snapshot] {len(data)} entry dimuat dari {Config.MASTER_SNAPSHOT_PATH}")
+    return len(data)
+
+# -------------------------------------------------
+# 🔹 AKSES
+# -------------------------------------------------
+
+def get(name: str, loader: Callable[[], Dict]) -> Dict:
+    """
+    Ambil data master dari snapshot.
+    - belum ada   : panggil loader (sinkron), simpan kalau sukses
+    - sudah basi  : sajikan snapshot, refresh di background
+    loader harus mengembalikan dict dengan key "success".
+    """
+    if not _loaded:
+        load()
+
+    entry = _entries.get(name)
+    if entry is None:
+        result = loader()
+        if result.get("success"):
+            _store(name, result)
+        return result
+
+    if time.time() - entry["fetched_at"] > Config.MASTER_SNAPSHOT_TTL:
+        # Worker lain mungkin sudah me-refresh dan menulis file snapshot
+        entry = _adopt_from_file(name) or entry
+        if time.time() - entry["fetched_at"] > Config.MASTER_SNAPSHOT_TTL:
+            _refresh_in_background(name, loader)
+    return entry["result"]
+
+
+def _adopt_from_file(name: str) -> Optional[Dict]:
+    """Pakai entry dari file kalau lebih baru dari yang ada di memori"""
+    disk_entry = _read_file().get(name)
+    if not disk_entry:
+        return None
+    with _lock:
+        if disk_entry["fetched_at"] > _entries.get(name, {}).get("fetched_at", 0):
+            _entries[name] = disk_entry
+            return disk_entry
+    return None
+
+
+def _store(name: str, result: Dict) -> None:
+    with _lock:
+        _entries[name] = {"result": result, "fetched_at": time.time()}
+    try:
+        _write_file()
+    except Exception as e:
+        print(f"[Master Snapshot] Gagal menulis snapshot: {e}")
+
+
+def _refresh_in_background(name: str, loader: Callable[[], Dict]) -> None:
+    with _lock:
+        if name in _refreshing:
+            return
+        _refreshing.add(name)
+
+    def run():
+        try:
+            result = loader()
+            if result.get("success"):
+                _store(name, result)
+                print(f"[Master Snapshot] {name} diperbarui")
+            else:
+                print(f"[Master Snapshot] Refresh {name} gagal, snapshot lama tetap dipakai")
+        finally:
+            with _lock:
+                _refreshing.discard(name)
+
+    threading.Thread(target=run, name=f"master-refresh-{name}", daemon=True).start()
+
+
+def stats() -> Dict:
+    now = time.time()
+    with _lock:
+        return {
+            name: {
+                "age_seconds": round(now - entry["fetched_at"]),
+                "stale": now - entry["fetched_at"] > Config.MASTER_SNAPSHOT_TTL
+            }
+            for name, entry in _entries.items()
+        }
+
@@ -2,8 +2,7 @@
 import random
 import requests
 import logging
-import MySQLdb.cursors
-from app.extensions import mysql
+from app.config.database import transaction
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -120,45 +119,37 @@ def create_user_with_phone(phone, password_hash):
         elif not phone.startswith('62'):
             formatted_phone = '62' + phone
         
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        
-        # Cek apakah nomor HP sudah terdaftar
-        cursor.execute('SELECT * FROM users WHERE no_hp = %s', (formatted_phone,))
-        existing_user = cursor.fetchone()
-        
-        if existing_user:
-            cursor.close()
-            logger.warning(f"Phone {formatted_phone} already registered")
-            return {
-                'success': False,
-                'message': 'Nomor HP sudah terdaftar'
-            }
-        
-        # ✅ Insert user dengan nama dan email NULL
-        cursor.execute(
-            '''INSERT INTO users (no_hp, password, nama, email, role, status_akun) 
-               VALUES (%s, %s, %s, %s, %s, %s)''',
-            (
-                formatted_phone,
-                password_hash,
-                None,                   # nama = NULL
-                None,                   # email = NULL
-                'pembeli_rumah_tangga',
-                'aktif'
+        with transaction() as tx:
+            # Cek apakah nomor HP sudah terdaftar
+            existing_user = tx.fetch_one('SELECT id FROM users WHERE no_hp = %s', (formatted_phone,))
+            
+            if existing_user:
+                logger.warning(f"Phone {formatted_phone} already registered")
+                return {
+                    'success': False,
+                    'message': 'Nomor HP sudah terdaftar'
+                }
+            
+            # ✅ Insert user dengan nama dan email NULL
+            tx.execute(
+                '''INSERT INTO users (no_hp, password, nama, email, role, status_akun) 
+                   VALUES (%s, %s, %s, %s, %s, %s)''',
+                (
+                    formatted_phone,
+                    password_hash,
+                    None,                   # nama = NULL
+                    None,                   # email = NULL
+                    'pembeli_rumah_tangga',
+                    'aktif'
+                )
+            )
+            user_id = tx.lastrowid
+            
+            # Get user data yang baru dibuat (termasuk nama dan email)
+            new_user = tx.fetch_one(
+                'SELECT id, no_hp, nama, email, role, status_akun FROM users WHERE id = %s', 
+                (user_id,)
             )
-        )
-        mysql.connection.commit()
-        
-        user_id = cursor.lastrowid
-        
-        # Get user data yang baru dibuat (termasuk nama dan email)
-        cursor.execute(
-            'SELECT id, no_hp, nama, email, role, status_akun FROM users WHERE id = %s', 
-            (user_id,)
-        )
-        new_user = cursor.fetchone()
-        
-        cursor.close()
         
         logger.info(f"User created successfully: {formatted_phone}")
         
@@ -0,0 +1,210 @@
+"""
+app/services/price_rollups.py
+Agregasi mingguan / bulanan / kuartalan dari harga harian di price store
+
+Tabel price_rollups menyimpan per (seri, komoditas, periode, awal periode):
+rata-rata, min, max, harga pertama / terakhir dan jumlah hari berharga.
+Periode mingguan dimulai Senin, bulanan tanggal 1, kuartalan Jan/Apr/Jul/Okt.
+Dihitung saat ingest hanya untuk periode yang tersentuh titik baru, jadi
+tampilan agregat tidak butuh request BI dengan tipe_laporan lain.
+
+Seperti price_stats, modul ini tidak membuka koneksi sendiri; dipanggil oleh
+price_store dengan koneksi SQLite yang sama (dalam transaksi ingest).
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_rollups (
+    province_id   TEXT NOT NULL,
+    regency_id    TEXT NOT NULL,
+    price_type_id TEXT NOT NULL,
+    periode       TEXT NOT NULL,          -- weekly / monthly / quarterly
+    commodity     TEXT NOT NULL,
+    period_start  TEXT NOT NULL,          -- YYYY-MM-DD
+    period_end    TEXT NOT NULL,
+    mean          REAL NOT NULL,          -- rata-rata harga harian dalam periode
+    min           REAL NOT NULL,
+    max           REAL NOT NULL,
+    first         REAL NOT NULL,          -- harga hari berharga pertama
+    last          REAL NOT NULL,          -- harga hari berharga terakhir
+    n_days        INTEGER NOT NULL,       -- jumlah hari berharga
+    last_date     TEXT NOT NULL,          -- tanggal harga terakhir dalam periode
+    PRIMARY KEY (province_id, regency_id, price_type_id, periode, commodity, period_start)
+) WITHOUT ROWID;
+"""
+
+PERIODS = ("weekly", "monthly", "quarterly")
+
+SeriesKey = Tuple[str, str, str]
+
+
+def period_start(periode: str, d: date) -> date:
+    if periode == "weekly":
+        return d - timedelta(days=d.weekday())
+    if periode == "monthly":
+        return d.replace(day=1)
+    return date(d.year, 3 * ((d.month - 1) // 3) + 1, 1)
+
+
+def period_end(periode: str, start: date) -> date:
+    if periode == "weekly":
+        return start + timedelta(days=6)
+    months = 1 if periode == "monthly" else 3
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+
+
+def previous_start(periode: str, d: date) -> date:
+    """Awal periode sebelum periode yang memuat d"""
+    return period_start(periode, period_start(periode, d) - timedelta(days=1))
+
+
+def _bucket(points: List[Tuple[str, float]]) -> Dict:
+    prices = [harga for _, harga in points]
+    return {
+        "mean": round(sum(prices) / len(prices), 2),
+        "min": min(prices),
+        "max": max(prices),
+        "first": prices[0],
+        "last": prices[-1],
+        "n_days": len(prices),
+        "last_date": points[-1][0]
+    }
+
+# -------------------------------------------------
+# 🔹 UPDATE SAAT INGEST
+# -------------------------------------------------
+
+def update(conn: sqlite3.Connection, key: SeriesKey,
+           spans: Dict[str, Tuple[str, str]]) -> int:
+    """
+    Hitung ulang periode yang tersentuh ingest.
+    spans: commodity → (tanggal terlama, tanggal terbaru) yang baru ditulis.
+    Return: jumlah baris periode yang ditulis
+    """
+    rows = []
+    for commodity, (oldest, newest) in spans.items():
+        oldest_d, newest_d = date.fromisoformat(oldest), date.fromisoformat(newest)
+        # Satu query harian per komoditas yang mencakup semua periode tersentuh
+        since = min(period_start(p, oldest_d) for p in PERIODS)
+        until = max(period_end(p, period_start(p, newest_d)) for p in PERIODS)
+        points = conn.execute(
+            "SELECT tanggal, harga FROM harga_harian "
+            "WHERE province_id = ? AND regency_id = ? AND price_type_id = ? "
+            "AND commodity = ? AND tanggal BETWEEN ? AND ? ORDER BY tanggal",
+            (*key, commodity, since.isoformat(), until.isoformat())
+        ).fetchall()
+
+        for periode in PERIODS:
+            first_start = period_start(periode, oldest_d).isoformat()
+            last_start = period_start(periode, newest_d).isoformat()
+            buckets: Dict[str, List[Tuple[str, float]]] = {}
+            for tanggal, harga in points:
+                start = period_start(periode, date.fromisoformat(tanggal)).isoformat()
+                if first_start <= start <= last_start:
+                    buckets.setdefault(start, []).append((tanggal, harga))
+            for start, bucket_points in buckets.items():
+                agg = _bucket(bucket_points)
+                end = period_end(periode, date.fromisoformat(start)).isoformat()
+                rows.append((*key, periode, commodity, start, end, agg["mean"], agg["min"], agg["max"],
+                             agg["first"], agg["last"], agg["n_days"], agg["last_date"]))
+
+    conn.executemany(
+        "INSERT OR REPLACE INTO price_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    return len(rows)
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    """Isi price_rollups dari seluruh harga_harian (store lama, sebelum tabel ini ada)"""
+    if conn.execute("SELECT 1 FROM price_rollups LIMIT 1").fetchone():
+        return
+    spans = conn.execute(
+        "SELECT province_id, regency_id, price_type_id, commodity, MIN(tanggal), MAX(tanggal) "
+        "FROM harga_harian GROUP BY province_id, regency_id, price_type_id, commodity"
+    ).fetchall()
+    by_key: Dict[SeriesKey, Dict[str, Tuple[str, str]]] = {}
+    for province_id, regency_id, price_type_id, commodity, oldest, newest in spans:
+        by_key.setdefault((province_id, regency_id, price_type_id), {})[commodity] = (oldest, newest)
+    with conn:
+        for key, commodity_spans in by_key.items():
+            update(conn, key, commodity_spans)
+
+# -------------------------------------------------
+# 🔹 QUERY
+# -------------------------------------------------
+
+def latest(conn: sqlite3.Connection, key: SeriesKey, periode: str,
+           until: Optional[str] = None) -> List[Dict]:
+    """
+    Periode terbaru + periode sebelumnya per komoditas (awal periode <= until).
+    Return list dict: commodity, current, previous (dict periode atau None)
+    """
+    rows = conn.execute(
+        """
+        SELECT r.*
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY commodity ORDER BY period_start DESC) AS rn
+            FROM price_rollups
+            WHERE province_id = ? AND regency_id = ? AND price_type_id = ?
+              AND periode = ? AND period_start <= ?
+        ) r
+        LEFT JOIN komoditas k ON k.commodity = r.commodity
+        WHERE r.rn <= 2
+        ORDER BY COALESCE(k.urutan, 1000000), r.commodity, r.rn
+        """,
+        (*key, periode, until or "9999-12-31")
+    ).fetchall()
+
+    result = []
+    for row in rows:
+        row = dict(row)
+        if row.pop("rn") == 1:
+            result.append({"commodity": row["commodity"], "current": row, "previous": None})
+        elif result and result[-1]["commodity"] == row["commodity"]:
+            result[-1]["previous"] = row
+    return result
+
+
+def series(conn: sqlite3.Connection, key: SeriesKey, periode: str, start: str, end: str,
+           match: Optional[Callable[[str], bool]] = None
+           ) -> Tuple[List[str], List[str], List[List[Optional[float]]], List[List[Optional[int]]]]:
+    """
+    Seri agregat bentuk kolom untuk periode yang beririsan dengan [start, end].
+    Return: (awal periode terurut, komoditas, rata-rata per komoditas,
+             jumlah hari berharga per komoditas; None = tidak ada data)
+    """
+    first_start = period_start(periode, date.fromisoformat(start)).isoformat()
+    rows = conn.execute(
+        """
+        SELECT r.commodity, r.period_start, r.mean, r.n_days
+        FROM price_rollups r
+        LEFT JOIN komoditas k ON k.commodity = r.commodity
+        WHERE r.province_id = ? AND r.regency_id = ? AND r.price_type_id = ?
+          AND r.periode = ? AND r.period_start BETWEEN ? AND ?
+        ORDER BY COALESCE(k.urutan, 1000000), r.commodity
+        """,
+        (*key, periode, first_start, end)
+    ).fetchall()
+
+    by_commodity: Dict[str, Dict[str, Tuple[float, int]]] = {}
+    keep: Dict[str, bool] = {}
+    starts = set()
+    for commodity, start_iso, mean, n_days in rows:
+        ok = keep.get(commodity)
+        if ok is None:
+            ok = keep[commodity] = match is None or match(commodity)
+        if not ok:
+            continue
+        by_commodity.setdefault(commodity, {})[start_iso] = (mean, n_days)
+        starts.add(start_iso)
+
+    starts = sorted(starts)
+    names = list(by_commodity)
+    means = [[by_commodity[n].get(s, (None, None))[0] for s in starts] for n in names]
+    days = [[by_commodity[n].get(s, (None, None))[1] for s in starts] for n in names]
+    return starts, names, means, days
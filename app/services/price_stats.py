@@ -0,0 +1,190 @@
+"""
+app/services/price_stats.py
+Statistik rolling per seri harga (province, regency, price_type, commodity)
+
+Tabel price_stats menyimpan rata-rata, min/max dan perubahan (%) 7 & 30 hari
+terakhir serta volatilitas 30 hari, dihitung relatif ke tanggal harga terbaru
+tiap komoditas. Diperbarui saat ingest, hanya untuk komoditas yang titiknya
+baru / berubah dan jatuh di dalam jendela 30 hari terakhir (backfill data
+lama dan ingest ulang harga yang sama tidak memicu perhitungan ulang).
+Request /harga cukup membaca satu baris per komoditas.
+Yang dihitung ulang adalah jendela komoditas itu saja (paling banyak 30
+baris lewat primary key), bukan running sum: min/max dan volatilitas tidak
+bisa dijaga dengan delta saat titik keluar jendela atau direvisi BI.
+Kalau jendela 30 hari baru terisi sedikit (< STATS_MIN_DAYS_30 hari berharga),
+nilai *_30 dikembalikan None supaya tidak menyamar sebagai statistik 30 hari.
+
+Modul ini tidak membuka koneksi sendiri; dipanggil oleh price_store dengan
+koneksi SQLite yang sama (dalam transaksi ingest).
+"""
+
+import math
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_stats (
+    province_id   TEXT NOT NULL,
+    regency_id    TEXT NOT NULL,
+    price_type_id TEXT NOT NULL,
+    commodity     TEXT NOT NULL,
+    as_of         TEXT NOT NULL,          -- tanggal harga terbaru (YYYY-MM-DD)
+    mean_7        REAL,
+    min_7         REAL,
+    max_7         REAL,
+    change_7      REAL,                   -- % terhadap harga pertama di jendela 7 hari
+    mean_30       REAL,
+    min_30        REAL,
+    max_30        REAL,
+    change_30     REAL,
+    volatility_30 REAL,                   -- std dev perubahan harian (%) 30 hari
+    n_30          INTEGER NOT NULL,       -- jumlah hari berharga dalam 30 hari
+    PRIMARY KEY (province_id, regency_id, price_type_id, commodity)
+) WITHOUT ROWID;
+"""
+
+WINDOWS = (7, 30)
+
+SeriesKey = Tuple[str, str, str]
+
+
+def _shift(iso: str, days: int) -> str:
+    return (date.fromisoformat(iso) - timedelta(days=days)).isoformat()
+
+
+def _window_stats(points: List[Tuple[str, float]], since: str) -> Tuple[float, float, float, Optional[float]]:
+    """(mean, min, max, % perubahan) untuk titik dengan tanggal >= since"""
+    prices = [harga for tanggal, harga in points if tanggal >= since]
+    first = prices[0]
+    change = round((prices[-1] - first) / first * 100, 2) if len(prices) > 1 and first else None
+    return round(sum(prices) / len(prices), 2), min(prices), max(prices), change
+
+
+def _volatility(prices: List[float]) -> Optional[float]:
+    """Std dev (populasi) perubahan harian dalam %"""
+    returns = [(b - a) / a * 100 for a, b in zip(prices, prices[1:]) if a]
+    if len(returns) < 2:
+        return None
+    mean = sum(returns) / len(returns)
+    return round(math.sqrt(sum((r - mean) ** 2 for r in returns) / len(returns)), 2)
+
+
+def compute(points: List[Tuple[str, float]]) -> Dict:
+    """
+    Statistik dari titik (tanggal ISO, harga) terurut naik, paling lama 30 hari
+    terakhir relatif ke titik terakhir.
+    """
+    as_of = points[-1][0]
+    stats = {"as_of": as_of}
+    for days in WINDOWS:
+        mean, low, high, change = _window_stats(points, _shift(as_of, days - 1))
+        stats.update({f"mean_{days}": mean, f"min_{days}": low,
+                      f"max_{days}": high, f"change_{days}": change})
+    since_30 = _shift(as_of, 29)
+    window_30 = [harga for tanggal, harga in points if tanggal >= since_30]
+    stats["volatility_30"] = _volatility(window_30)
+    stats["n_30"] = len(window_30)
+    return stats
+
+
+def update(conn: sqlite3.Connection, key: SeriesKey,
+           touched: Dict[str, str]) -> int:
+    """
+    Perbarui statistik komoditas yang baru di-ingest.
+    touched: commodity → tanggal terbaru yang ditulis untuk komoditas itu.
+    Komoditas yang titik barunya lebih tua dari jendela 30 hari dilewati.
+    Return: jumlah komoditas yang dihitung ulang
+    """
+    if not touched:
+        return 0
+
+    as_of = dict(conn.execute(
+        "SELECT commodity, as_of FROM price_stats "
+        "WHERE province_id = ? AND regency_id = ? AND price_type_id = ?",
+        key
+    ).fetchall())
+    stale = [c for c, newest in touched.items()
+             if c not in as_of or newest >= _shift(as_of[c], 29)]
+    if not stale:
+        return 0
+
+    rows = []
+    for chunk_start in range(0, len(stale), 500):
+        chunk = stale[chunk_start:chunk_start + 500]
+        marks = ",".join("?" * len(chunk))
+        latest = conn.execute(
+            f"SELECT commodity, MAX(tanggal) FROM harga_harian "
+            f"WHERE province_id = ? AND regency_id = ? AND price_type_id = ? "
+            f"AND commodity IN ({marks}) GROUP BY commodity",
+            (*key, *chunk)
+        ).fetchall()
+        for commodity, newest in latest:
+            points = conn.execute(
+                "SELECT tanggal, harga FROM harga_harian "
+                "WHERE province_id = ? AND regency_id = ? AND price_type_id = ? "
+                "AND commodity = ? AND tanggal >= ? ORDER BY tanggal",
+                (*key, commodity, _shift(newest, 29))
+            ).fetchall()
+            stats = compute([(t, h) for t, h in points])
+            rows.append((*key, commodity, stats["as_of"],
+                         stats["mean_7"], stats["min_7"], stats["max_7"], stats["change_7"],
+                         stats["mean_30"], stats["min_30"], stats["max_30"], stats["change_30"],
+                         stats["volatility_30"], stats["n_30"]))
+
+    conn.executemany(
+        "INSERT OR REPLACE INTO price_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    return len(rows)
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    """Isi price_stats dari harga_harian (store lama, sebelum ingest hanya menulis titik yang berubah)"""
+    if conn.execute("SELECT 1 FROM price_stats LIMIT 1").fetchone():
+        return
+    latest = conn.execute(
+        "SELECT province_id, regency_id, price_type_id, commodity, MAX(tanggal) "
+        "FROM harga_harian GROUP BY province_id, regency_id, price_type_id, commodity"
+    ).fetchall()
+    by_key: Dict[SeriesKey, Dict[str, str]] = {}
+    for province_id, regency_id, price_type_id, commodity, newest in latest:
+        by_key.setdefault((province_id, regency_id, price_type_id), {})[commodity] = newest
+    with conn:
+        for key, touched in by_key.items():
+            update(conn, key, touched)
+
+
+def read(conn: sqlite3.Connection, key: SeriesKey,
+         commodities: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+    """Statistik tersimpan per komoditas untuk satu seri"""
+    rows = conn.execute(
+        "SELECT * FROM price_stats "
+        "WHERE province_id = ? AND regency_id = ? AND price_type_id = ?",
+        key
+    ).fetchall()
+    wanted = set(commodities) if commodities is not None else None
+
+    result = {}
+    for row in rows:
+        row = dict(row)
+        commodity = row["commodity"]
+        if wanted is not None and commodity not in wanted:
+            continue
+        covered = row["n_30"] >= Config.STATS_MIN_DAYS_30
+        result[commodity] = {
+            "as_of": row["as_of"],
+            "mean_7": row["mean_7"],
+            "min_7": row["min_7"],
+            "max_7": row["max_7"],
+            "change_7_pct": row["change_7"],
+            "mean_30": row["mean_30"] if covered else None,
+            "min_30": row["min_30"] if covered else None,
+            "max_30": row["max_30"] if covered else None,
+            "change_30_pct": row["change_30"] if covered else None,
+            "volatility_30_pct": row["volatility_30"] if covered else None,
+            "days_30": row["n_30"]
+        }
+    return result
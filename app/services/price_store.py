@@ -0,0 +1,369 @@
+"""
+app/services/price_store.py
+Penyimpanan lokal time-series harga pangan (SQLite)
+
+Grid GetGridDataDaerah di-ingest ke tabel harga_harian, lalu /harga dijawab
+dari data lokal. Rentang yang diambil dari BI direncanakan per sel tanggal
+(sync_plan): hanya sel yang belum pernah diminta, masih baru, atau tombstone
+kosong yang jeda retry-nya sudah lewat.
+
+Tanggal yang benar-benar dipublikasikan BI dicatat per seri di tabel
+tanggal_tersedia (diisi saat ingest), dan disajikan sebagai list terurut
+untuk lookup bisect (tanggal terbaru, tanggal terdekat <= X).
+"""
+
+import bisect
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from app.services import price_rollups, price_stats, sync_plan
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS harga_harian (
+    province_id   TEXT NOT NULL,
+    regency_id    TEXT NOT NULL,
+    price_type_id TEXT NOT NULL,
+    commodity     TEXT NOT NULL,
+    tanggal       TEXT NOT NULL,          -- YYYY-MM-DD
+    harga         REAL NOT NULL,
+    PRIMARY KEY (province_id, regency_id, price_type_id, commodity, tanggal)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS komoditas (
+    commodity TEXT PRIMARY KEY,
+    urutan    INTEGER NOT NULL            -- urutan baris seperti di grid BI
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    province_id   TEXT NOT NULL,
+    regency_id    TEXT NOT NULL,
+    price_type_id TEXT NOT NULL,
+    last_date     TEXT,                   -- tanggal terakhir yang sudah di-ingest
+    synced_at     REAL NOT NULL,          -- epoch sinkronisasi terakhir
+    PRIMARY KEY (province_id, regency_id, price_type_id)
+);
+
+CREATE TABLE IF NOT EXISTS tanggal_tersedia (
+    province_id   TEXT NOT NULL,
+    regency_id    TEXT NOT NULL,
+    price_type_id TEXT NOT NULL,
+    tanggal       TEXT NOT NULL,          -- tanggal yang punya minimal satu harga
+    PRIMARY KEY (province_id, regency_id, price_type_id, tanggal)
+) WITHOUT ROWID;
+"""
+
+SeriesKey = Tuple[str, str, str]   # (province_id, regency_id, price_type_id)
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+# Index tanggal per seri: key → ((jumlah, tanggal terakhir), list tanggal terurut)
+_dates_lock = threading.Lock()
+_dates_index: Dict[SeriesKey, Tuple[Tuple[int, Optional[str]], List[str]]] = {}
+
+# -------------------------------------------------
+# 🔧 KONEKSI
+# -------------------------------------------------
+
+def _connect() -> sqlite3.Connection:
+    """Satu koneksi per thread (sqlite3 tidak thread-safe antar koneksi)"""
+    path = Config.PRICE_STORE_PATH
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "pid", None) == os.getpid() \
+            and getattr(_local, "path", None) == path:
+        return conn
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    with _schema_lock:
+        if path not in _schema_ready:
+            conn.executescript(SCHEMA)
+            conn.executescript(price_stats.SCHEMA)
+            conn.executescript(sync_plan.SCHEMA)
+            conn.executescript(price_rollups.SCHEMA)
+            _backfill_available_dates(conn)
+            sync_plan.seed_from_dates(conn)
+            price_rollups.rebuild(conn)
+            price_stats.rebuild(conn)
+            _schema_ready.add(path)
+
+    _local.conn = conn
+    _local.pid = os.getpid()
+    _local.path = path
+    return conn
+
+
+def _backfill_available_dates(conn: sqlite3.Connection) -> None:
+    """Isi tanggal_tersedia dari harga_harian untuk store yang dibuat sebelum tabel ini ada"""
+    if conn.execute("SELECT 1 FROM tanggal_tersedia LIMIT 1").fetchone():
+        return
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO tanggal_tersedia "
+            "SELECT DISTINCT province_id, regency_id, price_type_id, tanggal FROM harga_harian"
+        )
+
+# -------------------------------------------------
+# 🔹 INGEST
+# -------------------------------------------------
+
+def ingest(key: SeriesKey,
+           points: Iterable[Tuple[str, str, float]],
+           commodity_order: Optional[List[str]] = None,
+           fetched: Optional[Tuple[str, str]] = None) -> int:
+    """
+    Simpan titik harga (commodity, tanggal ISO, harga) untuk satu seri.
+    Titik yang sudah ada ditimpa (BI kadang merevisi harga hari terakhir).
+    Hanya titik baru / yang harganya berubah yang ditulis; statistik rolling
+    dan agregat periode hanya dihitung ulang untuk komoditas yang titiknya
+    berubah, dalam transaksi yang sama. Sync yang mengambil ulang hari-hari
+    yang sudah ada (settle window, look-back) jadi hampir tanpa biaya tulis.
+    fetched: rentang (start, end) yang diminta ke BI; status sel tanggalnya
+             (ada data / kosong) dicatat bersama datanya.
+    Return: jumlah titik baru / berubah yang ditulis
+    """
+    province_id, regency_id, price_type_id = key
+    rows = []
+    dates = set()
+    for commodity, tanggal, harga in points:
+        rows.append((province_id, regency_id, price_type_id, commodity, tanggal, harga))
+        dates.add(tanggal)
+
+    conn = _connect()
+    with conn:
+        rows = _changed_rows(conn, key, rows)
+        spans: Dict[str, Tuple[str, str]] = {}
+        for _, _, _, commodity, tanggal, _ in rows:
+            span = spans.get(commodity)
+            if span is None:
+                spans[commodity] = (tanggal, tanggal)
+            elif tanggal < span[0] or tanggal > span[1]:
+                spans[commodity] = (min(span[0], tanggal), max(span[1], tanggal))
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO harga_harian "
+            "(province_id, regency_id, price_type_id, commodity, tanggal, harga) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO tanggal_tersedia "
+            "(province_id, regency_id, price_type_id, tanggal) VALUES (?, ?, ?, ?)",
+            [(province_id, regency_id, price_type_id, tanggal) for tanggal in dates]
+        )
+        if commodity_order:
+            conn.executemany(
+                "INSERT OR IGNORE INTO komoditas (commodity, urutan) VALUES (?, ?)",
+                [(name, idx) for idx, name in enumerate(commodity_order)]
+            )
+        price_stats.update(conn, key, {c: newest for c, (_, newest) in spans.items()})
+        price_rollups.update(conn, key, spans)
+        if fetched:
+            sync_plan.record(conn, key, fetched[0], fetched[1], dates)
+    return len(rows)
+
+
+def _changed_rows(conn: sqlite3.Connection, key: SeriesKey, rows: List[Tuple]) -> List[Tuple]:
+    """Baris yang belum ada di harga_harian atau harganya berbeda dari yang tersimpan"""
+    if not rows:
+        return rows
+    tanggal = [row[4] for row in rows]
+    stored = {
+        (commodity, day): harga
+        for commodity, day, harga in conn.execute(
+            "SELECT commodity, tanggal, harga FROM harga_harian "
+            "WHERE province_id = ? AND regency_id = ? AND price_type_id = ? "
+            "AND tanggal BETWEEN ? AND ?",
+            (*key, min(tanggal), max(tanggal))
+        )
+    }
+    return [row for row in rows if stored.get((row[3], row[4])) != row[5]]
+
+# -------------------------------------------------
+# 🔹 SYNC STATE
+# -------------------------------------------------
+
+def get_sync_state(key: SeriesKey) -> Optional[Dict]:
+    """Ambil status sinkronisasi terakhir untuk satu seri"""
+    row = _connect().execute(
+        "SELECT last_date, synced_at FROM sync_state "
+        "WHERE province_id = ? AND regency_id = ? AND price_type_id = ?",
+        key
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def mark_synced(key: SeriesKey, last_date: Optional[str]) -> None:
+    """Catat sinkronisasi berhasil; last_date tidak pernah mundur"""
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT INTO sync_state (province_id, regency_id, price_type_id, last_date, synced_at) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (province_id, regency_id, price_type_id) DO UPDATE SET "
+            "last_date = NULLIF(MAX(COALESCE(excluded.last_date, ''), "
+            "COALESCE(sync_state.last_date, '')), ''), "
+            "synced_at = excluded.synced_at",
+            (*key, last_date, time.time())
+        )
+
+
+def plan_sync(key: SeriesKey, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+    """Rentang request BI minimal supaya [start_date, end_date] up to date (lihat sync_plan)"""
+    return sync_plan.plan(_connect(), key, start_date, end_date)
+
+
+def sync_summary(key: Optional[SeriesKey] = None) -> Dict[str, int]:
+    """Jumlah sel complete / pending / empty"""
+    return sync_plan.summary(_connect(), key)
+
+
+def is_fresh(state: Optional[Dict]) -> bool:
+    """True kalau seri sudah disinkronkan dalam PRICE_SYNC_INTERVAL terakhir"""
+    if not state:
+        return False
+    return (time.time() - state["synced_at"]) < Config.PRICE_SYNC_INTERVAL
+
+# -------------------------------------------------
+# 🔹 QUERY
+# -------------------------------------------------
+
+def latest_prices(key: SeriesKey) -> List[Dict]:
+    """
+    Harga terbaru + harga sebelumnya per komoditas untuk satu seri.
+    Return list dict: commodity, latest_date, price, prev_date, prev_price
+    """
+    rows = _connect().execute(
+        """
+        SELECT h.commodity, h.tanggal, h.harga, h.rn
+        FROM (
+            SELECT commodity, tanggal, harga,
+                   ROW_NUMBER() OVER (PARTITION BY commodity ORDER BY tanggal DESC) AS rn
+            FROM harga_harian
+            WHERE province_id = ? AND regency_id = ? AND price_type_id = ?
+        ) h
+        LEFT JOIN komoditas k ON k.commodity = h.commodity
+        WHERE h.rn <= 2
+        ORDER BY COALESCE(k.urutan, 1000000), h.commodity, h.rn
+        """,
+        key
+    ).fetchall()
+
+    result = []
+    for row in rows:
+        if row["rn"] == 1:
+            result.append({
+                "commodity": row["commodity"],
+                "latest_date": row["tanggal"],
+                "price": row["harga"],
+                "prev_date": None,
+                "prev_price": None
+            })
+        elif result and result[-1]["commodity"] == row["commodity"]:
+            result[-1]["prev_date"] = row["tanggal"]
+            result[-1]["prev_price"] = row["harga"]
+    return result
+
+
+def available_dates(key: SeriesKey) -> List[str]:
+    """
+    Tanggal ISO terurut naik yang punya data untuk satu seri.
+    List disimpan di memori dan hanya dibaca ulang kalau jumlah / tanggal
+    terakhir di tabel berubah (ingest dari thread atau worker lain).
+    """
+    conn = _connect()
+    signature = tuple(conn.execute(
+        "SELECT COUNT(*), MAX(tanggal) FROM tanggal_tersedia "
+        "WHERE province_id = ? AND regency_id = ? AND price_type_id = ?",
+        key
+    ).fetchone())
+
+    with _dates_lock:
+        cached = _dates_index.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    dates = [row[0] for row in conn.execute(
+        "SELECT tanggal FROM tanggal_tersedia "
+        "WHERE province_id = ? AND regency_id = ? AND price_type_id = ? ORDER BY tanggal",
+        key
+    )]
+    with _dates_lock:
+        _dates_index[key] = (signature, dates)
+    return dates
+
+
+def latest_available(dates: List[str]) -> Optional[str]:
+    """Tanggal terbaru yang punya data"""
+    return dates[-1] if dates else None
+
+
+def nearest_available(dates: List[str], on_or_before: str) -> Optional[str]:
+    """Tanggal terbaru yang punya data dan <= on_or_before (ISO), None kalau tidak ada"""
+    idx = bisect.bisect_right(dates, on_or_before)
+    return dates[idx - 1] if idx else None
+
+
+def rolling_stats(key: SeriesKey, commodities: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+    """Statistik rolling 7/30 hari per komoditas (lihat price_stats)"""
+    return price_stats.read(_connect(), key, commodities)
+
+
+def latest_rollups(key: SeriesKey, periode: str, until: Optional[str] = None) -> List[Dict]:
+    """Periode terbaru + sebelumnya per komoditas (lihat price_rollups)"""
+    return price_rollups.latest(_connect(), key, periode, until)
+
+
+def get_rollup_series(key: SeriesKey, periode: str, start_date: str, end_date: str,
+                      match: Optional[Callable[[str], bool]] = None):
+    """Seri agregat bentuk kolom (lihat price_rollups.series)"""
+    return price_rollups.series(_connect(), key, periode, start_date, end_date, match)
+
+
+def get_series(key: SeriesKey, start_date: str, end_date: str,
+               match: Optional[Callable[[str], bool]] = None) -> Tuple[List[str], List[str], List[List[Optional[float]]]]:
+    """
+    Seri harga harian dalam bentuk kolom untuk rentang [start_date, end_date].
+    Return: (tanggal ISO terurut, nama komoditas sesuai urutan grid,
+             harga per komoditas sejajar dengan tanggal, None = tidak ada harga)
+    """
+    rows = _connect().execute(
+        """
+        SELECT h.commodity, h.tanggal, h.harga
+        FROM harga_harian h
+        LEFT JOIN komoditas k ON k.commodity = h.commodity
+        WHERE h.province_id = ? AND h.regency_id = ? AND h.price_type_id = ?
+          AND h.tanggal BETWEEN ? AND ?
+        ORDER BY COALESCE(k.urutan, 1000000), h.commodity
+        """,
+        (*key, start_date, end_date)
+    ).fetchall()
+
+    by_commodity: Dict[str, Dict[str, float]] = {}
+    keep: Dict[str, bool] = {}
+    dates = set()
+    for commodity, tanggal, harga in rows:
+        ok = keep.get(commodity)
+        if ok is None:
+            ok = keep[commodity] = match is None or match(commodity)
+        if not ok:
+            continue
+        by_commodity.setdefault(commodity, {})[tanggal] = harga
+        dates.add(tanggal)
+
+    dates = sorted(dates)
+    names = list(by_commodity)
+    prices = [[by_commodity[name].get(tanggal) for tanggal in dates] for name in names]
+    return dates, names, prices
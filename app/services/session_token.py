@@ -0,0 +1,120 @@
+"""
+app/services/session_token.py
+Token sesi bertanda tangan (HMAC-SHA256 dengan SECRET_KEY), diterbitkan saat login
+
+Format: base64url(payload JSON) + "." + base64url(HMAC), payload berisi
+  uid, role, seller (penjual terverifikasi), iat, exp
+Route memverifikasi token tanpa query ke MySQL. Karena role ikut di token,
+perubahan role (daftar toko → petani) mencabut semua token user itu yang
+diterbitkan sebelumnya lewat revoke_user(): daftar pencabutan uid → waktu,
+disimpan di SharedCache "token_revocations" selama AUTH_TOKEN_TTL, setelah
+itu token lama sudah kadaluarsa sendiri. Selalu SQLite bersama (apa pun
+CACHE_BACKEND), supaya logout / ganti role berlaku di semua worker.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import Config
+from app.services.shared_cache import SharedCache
+
+# Kunci turunan, supaya tanda tangan token tidak bisa dipertukarkan dengan
+# pemakaian SECRET_KEY lain (cookie session Flask)
+_KEY = hmac.new(Config.SECRET_KEY.encode("utf-8"), b"simbok-session-token", hashlib.sha256).digest()
+
+if Config.SECRET_KEY == "dev-secret-key":
+    print("⚠️ [Session Token] SECRET_KEY masih default, token bisa dipalsukan. Set env SECRET_KEY!")
+
+_revocations = SharedCache(
+    "token_revocations",
+    maxsize=Config.AUTH_REVOCATION_MAXSIZE,
+    ttl=Config.AUTH_TOKEN_TTL,
+    stale_ttl=Config.AUTH_TOKEN_TTL
+)
+
+_stats_lock = threading.Lock()
+_stats = {"issued": 0, "valid": 0, "malformed": 0, "bad_signature": 0, "expired": 0, "revoked": 0}
+
+
+def _count(field: str) -> None:
+    with _stats_lock:
+        _stats[field] += 1
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_KEY, payload.encode("ascii"), hashlib.sha256).digest())
+
+# -------------------------------------------------
+# 🔹 TERBITKAN & VERIFIKASI
+# -------------------------------------------------
+
+def issue(user: Dict) -> Tuple[str, int]:
+    """
+    Token untuk user (row users: id, role, is_verified_seller).
+    Return: (token, exp epoch detik)
+    """
+    now = time.time()
+    exp = int(now + Config.AUTH_TOKEN_TTL)
+    role = user.get("role")
+    claims = {
+        "uid": int(user["id"]),
+        "role": role,
+        "seller": bool(user.get("is_verified_seller")) or role == "petani",
+        # Milidetik: token baru setelah revoke_user di detik yang sama tetap valid
+        "iat": round(now, 3),
+        "exp": exp
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    _count("issued")
+    return f"{payload}.{_sign(payload)}", exp
+
+
+def verify(token: str) -> Optional[Dict]:
+    """Claims token kalau tanda tangan cocok, belum kadaluarsa dan belum dicabut; selain itu None"""
+    try:
+        payload, signature = token.split(".")
+    except (AttributeError, ValueError):
+        _count("malformed")
+        return None
+    if not hmac.compare_digest(signature, _sign(payload)):
+        _count("bad_signature")
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+        uid, iat, exp = int(claims["uid"]), float(claims["iat"]), float(claims["exp"])
+    except (ValueError, KeyError, TypeError):
+        _count("malformed")
+        return None
+
+    if time.time() >= exp:
+        _count("expired")
+        return None
+    revoked = _revocations.get(str(uid))
+    if revoked is not None and iat < revoked[0]:
+        _count("revoked")
+        return None
+    _count("valid")
+    return claims
+
+
+def revoke_user(user_id) -> None:
+    """Cabut semua token user yang diterbitkan sebelum saat ini"""
+    _revocations.set(str(user_id), round(time.time(), 3))
+
+
+def stats() -> Dict:
+    with _stats_lock:
+        return {"ttl": Config.AUTH_TOKEN_TTL, **_stats, "revocations": _revocations.stats()["size"]}
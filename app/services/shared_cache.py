@@ -0,0 +1,290 @@
+"""
+app/services/shared_cache.py
+Cache bersama antar worker gunicorn (SQLite WAL, tanpa service eksternal)
+
+Interface sama dengan TTLCache (get / set / invalidate / stats / get_or_load),
+tapi entry disimpan di satu file SQLite per host, jadi hasil yang di-load satu
+worker langsung dipakai worker lain dan invalidasi berlaku untuk semua worker.
+Load dan refresh per key dikoordinasikan dengan lease di tabel cache_leases:
+hanya satu worker yang memanggil loader, worker lain menunggu hasilnya.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+from app.services.cache import HIT, MISS, STALE, TTLCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    cache     TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    used_at   REAL NOT NULL DEFAULT 0,    -- akses terakhir (untuk LRU)
+    value     BLOB NOT NULL,              -- pickle
+    PRIMARY KEY (cache, key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS cache_entries_age ON cache_entries (cache, stored_at);
+
+CREATE TABLE IF NOT EXISTS cache_leases (
+    cache  TEXT NOT NULL,
+    key    TEXT NOT NULL,
+    holder TEXT NOT NULL,                 -- pid:thread yang sedang load
+    until  REAL NOT NULL,
+    PRIMARY KEY (cache, key)
+) WITHOUT ROWID;
+"""
+
+# File cache lama belum punya kolom used_at
+MIGRATION = """
+CREATE INDEX IF NOT EXISTS cache_entries_used ON cache_entries (cache, used_at);
+"""
+
+# Waktu akses di-update paling sering sekali per interval ini per key,
+# supaya hit beruntun tidak selalu menulis ke SQLite
+TOUCH_INTERVAL = 5.0
+
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+class SharedCache(TTLCache):
+    """
+    TTLCache dengan storage SQLite bersama.
+    Eviction kalau jumlah entry > maxsize: entry yang paling lama tidak
+    dipakai dibuang (LRU; waktu akses dicatat paling sering sekali per
+    TOUCH_INTERVAL detik per key, jadi urutannya perkiraan).
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: float = 3600,
+                 stale_ttl: float = 86400, path: Optional[str] = None,
+                 lease_timeout: float = 30):
+        super().__init__(name, maxsize, ttl, stale_ttl)
+        self.path = path or Config.CACHE_PATH
+        self.lease_timeout = lease_timeout
+        self._local = threading.local()
+        self._stats.update({"lease_waits": 0, "lease_wait_hits": 0})
+
+    # -------------------------------------------------
+    # 🔧 KONEKSI
+    # -------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        """Satu koneksi per thread per process"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _schema_lock:
+            if self.path not in _schema_ready:
+                conn.executescript(SCHEMA)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+                if "used_at" not in columns:
+                    conn.execute("ALTER TABLE cache_entries ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+                conn.executescript(MIGRATION)
+                _schema_ready.add(self.path)
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    # -------------------------------------------------
+    # 🔹 OPERASI DASAR
+    # -------------------------------------------------
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT stored_at, used_at, value FROM cache_entries WHERE cache = ? AND key = ?",
+            (self.name, key)
+        ).fetchone()
+        if row is None:
+            return None
+        stored_at, used_at, blob = row
+        now = time.time()
+        age = now - stored_at
+        if age > self.stale_ttl:
+            return None
+        try:
+            value = pickle.loads(blob)
+        except Exception as e:
+            print(f"[Cache {self.name}] Entry {key} rusak, diabaikan: {e}")
+            return None
+        if now - used_at > TOUCH_INTERVAL:
+            conn.execute(
+                "UPDATE cache_entries SET used_at = ? WHERE cache = ? AND key = ?",
+                (now, self.name, key)
+            )
+        return value, age > self.ttl
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"[Cache {self.name}] Nilai untuk {key} tidak bisa disimpan: {e}")
+            return
+
+        now = time.time()
+        conn = self._connect()
+        with _transaction(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (cache, key, stored_at, used_at, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.name, key, now, now, sqlite3.Binary(blob))
+            )
+            conn.execute(
+                "DELETE FROM cache_entries WHERE cache = ? AND stored_at < ?",
+                (self.name, now - self.stale_ttl)
+            )
+            evicted = conn.execute(
+                "DELETE FROM cache_entries WHERE cache = ? AND key IN ("
+                "  SELECT key FROM cache_entries WHERE cache = ? "
+                "  ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.name, self.name, self.maxsize)
+            ).rowcount
+        if evicted > 0:
+            self._count("evictions", evicted)
+
+    def invalidate(self, pattern: Optional[str] = None) -> int:
+        """Hapus entry yang key-nya cocok dengan pattern glob (None = semua), untuk semua worker"""
+        conn = self._connect()
+        if not pattern or pattern == "*":
+            return conn.execute("DELETE FROM cache_entries WHERE cache = ?", (self.name,)).rowcount
+        return conn.execute(
+            "DELETE FROM cache_entries WHERE cache = ? AND key GLOB ?", (self.name, pattern)
+        ).rowcount
+
+    def stats(self) -> Dict:
+        size = self._connect().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE cache = ?", (self.name,)
+        ).fetchone()[0]
+        with self._lock:
+            return {
+                "name": self.name,
+                "backend": "sqlite",
+                "path": self.path,
+                "pid": os.getpid(),
+                "size": size,
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                **self._stats
+            }
+
+    # -------------------------------------------------
+    # 🔹 LEASE ANTAR WORKER
+    # -------------------------------------------------
+
+    def _holder(self) -> str:
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def _acquire(self, key: str) -> bool:
+        """Ambil lease load untuk key; gagal kalau worker/thread lain masih memegangnya"""
+        now = time.time()
+        return self._connect().execute(
+            "INSERT INTO cache_leases (cache, key, holder, until) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (cache, key) DO UPDATE SET holder = excluded.holder, until = excluded.until "
+            "WHERE cache_leases.until < ?",
+            (self.name, key, self._holder(), now + self.lease_timeout, now)
+        ).rowcount == 1
+
+    def _release(self, key: str, holder: str) -> None:
+        self._connect().execute(
+            "DELETE FROM cache_leases WHERE cache = ? AND key = ? AND holder = ?",
+            (self.name, key, holder)
+        )
+
+    def _leased(self, key: str) -> bool:
+        row = self._connect().execute(
+            "SELECT until FROM cache_leases WHERE cache = ? AND key = ?", (self.name, key)
+        ).fetchone()
+        return row is not None and row[0] >= time.time()
+
+    def get_or_load(self, key: str, loader: Callable[[], Any],
+                    cacheable: Callable[[Any], bool] = lambda v: True) -> Tuple[Any, str]:
+        """
+        Seperti TTLCache.get_or_load. Saat miss, hanya pemegang lease yang
+        memanggil loader; yang lain menunggu entry muncul (paling lama
+        lease_timeout), lalu load sendiri kalau pemegang lease gagal.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            value, is_stale = cached
+            if not is_stale:
+                self._count("hits")
+                return value, HIT
+            self._count("stale_hits")
+            self._refresh_in_background(key, loader, cacheable)
+            return value, STALE
+
+        self._count("misses")
+        if not self._acquire(key):
+            self._count("lease_waits")
+            deadline = time.time() + self.lease_timeout
+            while time.time() < deadline:
+                time.sleep(0.05)
+                cached = self.get(key)
+                if cached is not None:
+                    self._count("lease_wait_hits")
+                    return cached[0], HIT
+                if not self._leased(key):
+                    break
+            self._acquire(key)
+
+        holder = self._holder()
+        try:
+            value = loader()
+            if cacheable(value):
+                self.set(key, value)
+        finally:
+            self._release(key, holder)
+        return value, MISS
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Any],
+                               cacheable: Callable[[Any], bool]) -> bool:
+        """Refresh entry stale; hanya satu worker per key (lewat lease)"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+        if not self._acquire(key):
+            return False
+        holder = self._holder()
+
+        def leased_loader():
+            try:
+                return loader()
+            finally:
+                self._release(key, holder)
+
+        started = super()._refresh_in_background(key, leased_loader, cacheable)
+        if not started:
+            # Thread lain di worker ini mendahului: lease jangan ditahan sampai lease_timeout
+            self._release(key, holder)
+        return started
+
+
+class _transaction:
+    """BEGIN IMMEDIATE ... COMMIT (koneksi dibuka dengan autocommit)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,82 @@
+"""
+app/services/singleflight.py
+Request coalescing: caller yang meminta key sama secara bersamaan
+menunggu satu fetch yang sedang berjalan dan memakai hasil yang sama.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.callers = 1
+        self.started = time.time()
+
+
+class SingleFlight:
+    """
+    Satu fetch per key dalam satu waktu (per process).
+    Hasil dibagi ke semua caller, jadi caller tidak boleh mengubah hasilnya.
+    """
+
+    def __init__(self, name: str, history: int = 50):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=history)
+        self._fetches = 0
+        self._collapsed = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Jalankan fn untuk key, atau tunggu fetch yang sedang berjalan untuk key itu"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.callers += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._fetches += 1
+                self._collapsed += call.callers - 1
+                self._recent.append({
+                    "key": key,
+                    "callers": call.callers,
+                    "collapsed": call.callers - 1,
+                    "duration_ms": round((time.time() - call.started) * 1000, 1),
+                    "error": str(call.error) if call.error else None
+                })
+            call.event.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "fetches": self._fetches,
+                "collapsed_callers": self._collapsed,
+                "in_flight": len(self._calls),
+                "recent": list(self._recent)
+            }
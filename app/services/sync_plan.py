@@ -0,0 +1,210 @@
+"""
+app/services/sync_plan.py
+Status sinkronisasi per sel (province, regency, price_type, tanggal) dan
+perencana request GetGridDataDaerah minimal
+
+Status sel di tabel sync_cells:
+  - complete : ada harga dan tanggalnya sudah lewat SYNC_SETTLE_DAYS, tidak
+               diambil ulang lagi
+  - pending  : ada harga tapi masih baru (BI kadang merevisi / melengkapi
+               beberapa hari terakhir); diambil ulang setelah PRICE_SYNC_INTERVAL
+  - empty    : sudah diminta tapi BI tidak punya harga (tombstone); dicoba
+               lagi setelah retry_at, jeda berlipat dua tiap percobaan
+               (PRICE_SYNC_INTERVAL, 2x, 4x, ... maks SYNC_EMPTY_MAX_BACKOFF)
+  - absent   : tanggal kosong yang sudah lewat SYNC_SETTLE_DAYS dan dianggap
+               memang tidak ada harganya (akhir pekan, libur), tidak diminta
+               lagi. Terjadi kalau BI sudah punya harga tanggal sesudahnya di
+               response yang sama, atau setelah SYNC_EMPTY_MAX_ATTEMPTS percobaan
+Sel tanpa baris belum pernah diminta. checked_at adalah watermark kapan sel
+terakhir dikonfirmasi dari BI.
+
+plan() mengubah sel yang perlu diambil dalam satu rentang menjadi daftar
+rentang request seminimal mungkin: sel berurutan digabung, dan celah sel yang
+sudah lengkap sampai SYNC_MERGE_GAP hari ikut diambil supaya tidak perlu
+round trip tambahan. Celah hanya ikut diambil kalau salah satu ujungnya sel
+yang belum pernah diminta / pending; retry sel kosong tidak boleh menarik
+ulang hari-hari yang sudah lengkap.
+
+Seperti price_stats, modul ini tidak membuka koneksi sendiri; dipanggil oleh
+price_store dengan koneksi SQLite yang sama (dalam transaksi ingest).
+"""
+
+import sqlite3
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_cells (
+    province_id   TEXT NOT NULL,
+    regency_id    TEXT NOT NULL,
+    price_type_id TEXT NOT NULL,
+    tanggal       TEXT NOT NULL,          -- YYYY-MM-DD
+    status        TEXT NOT NULL,          -- complete / pending / empty / absent
+    checked_at    REAL NOT NULL,          -- epoch terakhir dikonfirmasi dari BI
+    attempts      INTEGER NOT NULL DEFAULT 0,   -- percobaan berturut-turut yang kosong
+    retry_at      REAL,                   -- epoch boleh dicoba lagi (empty)
+    PRIMARY KEY (province_id, regency_id, price_type_id, tanggal)
+) WITHOUT ROWID;
+"""
+
+COMPLETE = "complete"
+PENDING = "pending"
+EMPTY = "empty"
+ABSENT = "absent"
+
+# Hasil _due(): sel perlu diambil karena belum ada / pending, atau retry sel kosong
+FETCH = "fetch"
+RETRY = "retry"
+
+SeriesKey = Tuple[str, str, str]
+
+
+def _days(start: str, end: str) -> List[str]:
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+def _gap(a: str, b: str) -> int:
+    """Jumlah hari di antara a dan b (eksklusif)"""
+    return (date.fromisoformat(b) - date.fromisoformat(a)).days - 1
+
+
+def _backoff(attempts: int) -> float:
+    return min(Config.PRICE_SYNC_INTERVAL * 2 ** (attempts - 1), Config.SYNC_EMPTY_MAX_BACKOFF)
+
+
+def _settled() -> str:
+    return (date.today() - timedelta(days=Config.SYNC_SETTLE_DAYS)).isoformat()
+
+
+def _load(conn: sqlite3.Connection, key: SeriesKey, start: str, end: str) -> Dict[str, sqlite3.Row]:
+    rows = conn.execute(
+        "SELECT tanggal, status, checked_at, attempts, retry_at FROM sync_cells "
+        "WHERE province_id = ? AND regency_id = ? AND price_type_id = ? "
+        "AND tanggal BETWEEN ? AND ?",
+        (*key, start, end)
+    ).fetchall()
+    return {row["tanggal"]: row for row in rows}
+
+# -------------------------------------------------
+# 🔹 PENCATATAN HASIL FETCH
+# -------------------------------------------------
+
+def record(conn: sqlite3.Connection, key: SeriesKey, start: str, end: str,
+           dates_with_data: Iterable[str], now: Optional[float] = None) -> None:
+    """Catat status semua sel [start, end] setelah rentang itu diambil dari BI"""
+    now = now or time.time()
+    end = min(end, date.today().isoformat())
+    if start > end:
+        return
+    settled = _settled()
+    with_data = set(dates_with_data)
+    latest_with_data = max(with_data) if with_data else ""
+    previous = _load(conn, key, start, end)
+
+    rows = []
+    for tanggal in _days(start, end):
+        if tanggal in with_data:
+            status = COMPLETE if tanggal <= settled else PENDING
+            rows.append((*key, tanggal, status, now, 0, None))
+        else:
+            before = previous.get(tanggal)
+            attempts = (before["attempts"] if before is not None and before["status"] == EMPTY else 0) + 1
+            if tanggal <= settled and (tanggal < latest_with_data
+                                       or attempts >= Config.SYNC_EMPTY_MAX_ATTEMPTS):
+                rows.append((*key, tanggal, ABSENT, now, attempts, None))
+            else:
+                rows.append((*key, tanggal, EMPTY, now, attempts, now + _backoff(attempts)))
+
+    conn.executemany(
+        "INSERT OR REPLACE INTO sync_cells "
+        "(province_id, regency_id, price_type_id, tanggal, status, checked_at, attempts, retry_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+
+
+def seed_from_dates(conn: sqlite3.Connection) -> None:
+    """
+    Store lama (sebelum sync_cells ada): tanggal yang sudah punya data dianggap
+    sel lengkap / pending, supaya tidak diambil ulang semuanya.
+    """
+    if conn.execute("SELECT 1 FROM sync_cells LIMIT 1").fetchone():
+        return
+    settled = _settled()
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO sync_cells "
+            "(province_id, regency_id, price_type_id, tanggal, status, checked_at, attempts, retry_at) "
+            "SELECT province_id, regency_id, price_type_id, tanggal, "
+            "CASE WHEN tanggal <= ? THEN ? ELSE ? END, ?, 0, NULL FROM tanggal_tersedia",
+            (settled, COMPLETE, PENDING, time.time())
+        )
+
+# -------------------------------------------------
+# 🔹 PERENCANA
+# -------------------------------------------------
+
+def _due(cell: Optional[sqlite3.Row], now: float, settled: str) -> Optional[str]:
+    """FETCH / RETRY kalau sel perlu diambil sekarang, None kalau tidak"""
+    if cell is None:
+        return FETCH
+    if cell["status"] in (COMPLETE, ABSENT):
+        return None
+    if cell["status"] == PENDING:
+        return FETCH if now - cell["checked_at"] >= Config.PRICE_SYNC_INTERVAL else None
+    # Sel kosong lama dari sebelum status absent ada: jangan dicoba terus
+    if cell["tanggal"] <= settled and cell["attempts"] >= Config.SYNC_EMPTY_MAX_ATTEMPTS:
+        return None
+    return RETRY if cell["retry_at"] is None or now >= cell["retry_at"] else None
+
+
+def plan(conn: sqlite3.Connection, key: SeriesKey, start: str, end: str,
+         now: Optional[float] = None) -> List[Tuple[str, str]]:
+    """
+    Rentang (start, end) GetGridDataDaerah minimal supaya semua sel
+    [start, end] up to date. Tanggal setelah hari ini tidak direncanakan.
+    """
+    now = now or time.time()
+    end = min(end, date.today().isoformat())
+    if start > end:
+        return []
+
+    cells = _load(conn, key, start, end)
+    settled = _settled()
+    # [awal, akhir, jenis sel terakhir]
+    ranges: List[list] = []
+    for tanggal in _days(start, end):
+        due = _due(cells.get(tanggal), now, settled)
+        if due is None:
+            continue
+        if ranges:
+            last = ranges[-1]
+            gap = _gap(last[1], tanggal)
+            # Celah sel lengkap hanya ikut diambil kalau salah satu ujungnya sel FETCH,
+            # supaya deretan retry akhir pekan tidak berantai jadi satu rentang panjang
+            mergeable = gap == 0 or due == FETCH or last[2] == FETCH
+            if mergeable and gap <= Config.SYNC_MERGE_GAP \
+                    and _gap(last[0], tanggal) + 2 <= Config.SYNC_MAX_RANGE_DAYS:
+                last[1], last[2] = tanggal, due
+                continue
+        ranges.append([tanggal, tanggal, due])
+    return [(first, last) for first, last, _ in ranges]
+
+
+def summary(conn: sqlite3.Connection, key: Optional[SeriesKey] = None) -> Dict[str, int]:
+    """Jumlah sel per status (satu seri, atau semua seri kalau key None)"""
+    if key is None:
+        rows = conn.execute("SELECT status, COUNT(*) FROM sync_cells GROUP BY status").fetchall()
+    else:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) FROM sync_cells "
+            "WHERE province_id = ? AND regency_id = ? AND price_type_id = ? GROUP BY status",
+            key
+        ).fetchall()
+    counts = {COMPLETE: 0, PENDING: 0, EMPTY: 0, ABSENT: 0}
+    counts.update({status: n for status, n in rows})
+    return counts
@@ -0,0 +1,73 @@
+"""
+benchmarks/bench_grid_stream.py
+Peak memory: r.json() + matrix vs parse streaming (grid_stream) + matrix
+
+Jalankan dari root project:
+    python -m benchmarks.bench_grid_stream                       # grid sintetis 365 hari
+    python -m benchmarks.bench_grid_stream --fixture file.json   # response BI yang direkam
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from app.services import grid_stream, grid_transform
+from benchmarks.fixtures import synthetic_grid
+
+CHUNK_SIZE = 65536
+
+
+def _peak(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def load_full(body: bytes, match=None):
+    """Cara lama: seluruh body (r.content) di memori, json.loads, baru difilter"""
+    content = bytes(body)                        # r.content
+    data = json.loads(content)['data']           # r.json()
+    return grid_transform.build_matrix(data, match)
+
+
+def load_stream(body: bytes, match=None):
+    """Streaming: body datang per chunk (r.iter_content), baris diproses satu per satu"""
+    view = memoryview(body)
+    chunks = (bytes(view[i:i + CHUNK_SIZE]) for i in range(0, len(body), CHUNK_SIZE))
+    return grid_transform.build_matrix(grid_stream.iter_rows(chunks, keep=match))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture", help="file JSON response GetGridDataDaerah")
+    parser.add_argument("--days", type=int, default=365, help="panjang grid sintetis")
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, "rb") as f:
+            body = f.read()
+        # Fixture dari recorder dibungkus {"response": ...}
+        payload = json.loads(body)
+        if isinstance(payload, dict) and "response" in payload:
+            body = json.dumps(payload["response"]).encode()
+    else:
+        body = json.dumps(synthetic_grid(n_days=args.days)).encode()
+
+    cabai = lambda name: "cabai" in name.lower()
+    print(f"Body: {len(body) / 1024:.0f} KiB")
+    print(f"{'skenario':<28} {'peak (KiB)':>11} {'waktu (ms)':>11}")
+    for label, match in (("semua komoditas", None), ("filter 'cabai'", cabai)):
+        full_peak, full_time = _peak(lambda: load_full(body, match))
+        stream_peak, stream_time = _peak(lambda: load_stream(body, match))
+        print(f"{'r.json() ' + label:<28} {full_peak / 1024:>11.0f} {full_time * 1000:>11.1f}")
+        print(f"{'stream ' + label:<28} {stream_peak / 1024:>11.0f} {stream_time * 1000:>11.1f}")
+        print(f"{'  hemat':<28} {(1 - stream_peak / full_peak) * 100:>10.0f}%")
+
+
+if __name__ == "__main__":
+    main()
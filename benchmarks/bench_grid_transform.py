@@ -0,0 +1,113 @@
+"""
+benchmarks/bench_grid_transform.py
+Micro-benchmark: transform grid lama (sort tanggal per baris) vs matrix grid_transform
+
+Jalankan dari root project:
+    python -m benchmarks.bench_grid_transform
+"""
+
+import timeit
+
+from app.services import grid_transform
+from app.services.bi_service import _calculate_trend, _date_sort_key, _parse_price
+from benchmarks.fixtures import synthetic_grid
+
+
+def legacy_transform(data_list):
+    """Salinan loop transform lama di get_harga_data (sebelum grid_transform)"""
+    transformed = []
+    for item in data_list:
+        if item.get('level', 0) == 1:
+            continue
+        date_keys = [k for k in item.keys() if '/' in str(k)]
+        if not date_keys:
+            continue
+        sorted_dates = sorted(date_keys, key=_date_sort_key, reverse=True)
+
+        latest_price = None
+        latest_date = None
+        for date in sorted_dates:
+            parsed = _parse_price(item.get(date, '0'))
+            if parsed and parsed > 0:
+                latest_price = parsed
+                latest_date = date
+                break
+        if latest_price is None:
+            continue
+
+        prev_price = latest_price
+        for i, date in enumerate(sorted_dates):
+            if i > 0 and date != latest_date:
+                parsed = _parse_price(item.get(date, '0'))
+                if parsed and parsed > 0:
+                    prev_price = parsed
+                    break
+
+        trend, change = _calculate_trend(latest_price, prev_price)
+        transformed.append((item['name'].strip(), latest_price, latest_date, trend, change))
+    return transformed
+
+
+def legacy_points(data_list):
+    """Ekstraksi titik harga per sel (cara lama: parse tanggal & harga per sel)"""
+    points = []
+    for item in data_list:
+        if item.get('level', 0) == 1:
+            continue
+        name = item['name'].strip()
+        for key, value in item.items():
+            if '/' in str(key):
+                price = _parse_price(value)
+                if price and price > 0:
+                    points.append((name, _date_sort_key(key), price))
+    return points
+
+
+def matrix_transform(data_list):
+    """Transform baru: satu matrix untuk semua komoditas"""
+    matrix = grid_transform.build_matrix(data_list)
+    transformed = []
+    for row, col, price, prev in grid_transform.latest_and_previous(matrix):
+        trend, change = _calculate_trend(price, prev or price)
+        transformed.append((matrix.names[row].strip(), price, matrix.keys[col], trend, change))
+    return transformed
+
+
+def legacy_transform_and_points(data_list):
+    return legacy_transform(data_list), legacy_points(data_list)
+
+
+def matrix_transform_and_points(data_list):
+    """Satu matrix dipakai untuk response dan ingest price store (seperti _load_harga)"""
+    matrix = grid_transform.build_matrix(data_list)
+    transformed = []
+    for row, col, price, prev in grid_transform.latest_and_previous(matrix):
+        trend, change = _calculate_trend(price, prev or price)
+        transformed.append((matrix.names[row].strip(), price, matrix.keys[col], trend, change))
+    return transformed, list(grid_transform.iter_points(matrix))
+
+
+def _time(fn, data_list, number):
+    return min(timeit.repeat(lambda: fn(data_list), number=number, repeat=5)) / number
+
+
+def main():
+    scenarios = [
+        ("latest+prev", legacy_transform, matrix_transform),
+        ("latest+prev+ingest", legacy_transform_and_points, matrix_transform_and_points),
+    ]
+    print(f"{'skenario':<20} {'hari':>5} {'legacy (ms)':>12} {'matrix (ms)':>12} {'speedup':>8}")
+    for label, legacy_fn, matrix_fn in scenarios:
+        for n_days in (7, 30, 90, 365):
+            data_list = synthetic_grid(n_days=n_days)["data"]
+            assert legacy_transform(data_list) == matrix_transform(data_list), "hasil berbeda"
+
+            number = max(1, 2000 // n_days)
+            legacy = _time(legacy_fn, data_list, number)
+            matrix = _time(matrix_fn, data_list, number)
+            print(f"{label:<20} {n_days:>5} {legacy * 1000:>12.3f} {matrix * 1000:>12.3f} "
+                  f"{legacy / matrix:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
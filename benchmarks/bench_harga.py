@@ -0,0 +1,232 @@
+"""
+benchmarks/bench_harga.py
+Benchmark pipeline harga: end-to-end get_harga_data / get_cabai_data dan per tahap
+(parse, transform, serialisasi JSON) untuk beberapa ukuran grid
+
+BI diganti server replay lokal (tools.bi_mock) dengan latency 0, jadi yang
+terukur hanya kerja aplikasi. Fixture recorder dipakai kalau ada; provinsi
+tanpa fixture dijawab data sintetis.
+
+Jalankan dari root project:
+    python -m benchmarks.bench_harga
+    python -m benchmarks.bench_harga --sizes 1x30,34x365 --repeat 5
+    python -m benchmarks.bench_harga --out hasil-baru.json --compare hasil-lama.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from tools.bi_mock import fixtures as mock_fixtures
+from tools.bi_mock.server import MockBI
+
+DEFAULT_SIZES = "1x30,1x90,1x365,34x30,34x365"
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _measure(fn, repeat: int):
+    """Jalankan fn `repeat` kali: waktu (median & min, ms) dan peak alokasi (KiB) run pertama"""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+@contextlib.contextmanager
+def _quiet(verbose: bool):
+    """Log service ("[BI Service] ...") tetap ditulis, tapi ke devnull kecuali --verbose"""
+    if verbose:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def run(sizes, repeat: int, fixture_dir: str, verbose: bool = False):
+    # Mock harus jalan dan env harus di-set sebelum modul app di-import (Config dibaca saat import)
+    mock = MockBI(fixture_dir, synthetic=True).start()
+    workdir = tempfile.mkdtemp(prefix="bench-harga-")
+    os.environ.update({
+        "BI_BASE_URL": mock.url,
+        "PRICE_STORE_PATH": os.path.join(workdir, "harga.sqlite3"),
+        "CACHE_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "MASTER_SNAPSHOT_PATH": os.path.join(workdir, "master.json"),
+    })
+
+    from app.services import bi_service, grid_stream
+    from benchmarks.bench_grid_transform import legacy_transform, matrix_transform
+
+    end = datetime.now()
+    results = []
+    for n_provinces, n_days in sizes:
+        label = f"{n_provinces}x{n_days}"
+        provinces = [str(i) for i in range(1, n_provinces + 1)] if n_provinces > 1 else ["14"]
+        start_date = (end - timedelta(days=n_days - 1)).strftime("%Y-%m-%d")
+        end_date = end.strftime("%Y-%m-%d")
+
+        # Body grid persis seperti yang dikirim server replay
+        bodies = [
+            mock.body_for(mock_fixtures.GRID, {"province_id": p, "regency_id": "", "price_type_id": "1",
+                                               "start_date": start_date, "end_date": end_date})
+            for p in provinces
+        ]
+        grids = [json.loads(body)["data"] for body in bodies]
+        rows = sum(len(g) for g in grids)
+        cells = sum(len(row) for g in grids for row in g)
+
+        def parse_json():
+            for body in bodies:
+                json.loads(body)
+
+        def parse_stream():
+            for body in bodies:
+                chunks = (body[i:i + 65536] for i in range(0, len(body), 65536))
+                for _ in grid_stream.iter_rows(chunks):
+                    pass
+
+        def transform_legacy():
+            for g in grids:
+                legacy_transform(g)
+
+        def transform_matrix():
+            for g in grids:
+                matrix_transform(g)
+
+        def harga_e2e():
+            bi_service.clear_cache()
+            return [bi_service.get_harga_data(province_id=p, start_date=start_date, end_date=end_date)
+                    for p in provinces]
+
+        def cabai_e2e():
+            bi_service.clear_cache()
+            return [bi_service.get_cabai_data(province_id=p, start_date=start_date, end_date=end_date)
+                    for p in provinces]
+
+        with _quiet(verbose):
+            responses = harga_e2e()
+            assert all(r.get("success") for r in responses), responses[0]
+
+        def serialize():
+            for r in responses:
+                json.dumps(r, sort_keys=True, separators=(",", ":"))
+
+        stages = {
+            "parse_json": parse_json,
+            "parse_stream": parse_stream,
+            "transform_legacy": transform_legacy,
+            "transform_matrix": transform_matrix,
+            "serialize": serialize,
+            "e2e_harga": harga_e2e,
+            "e2e_cabai": cabai_e2e,
+        }
+        size_result = {
+            "size": label,
+            "provinces": len(provinces),
+            "days": n_days,
+            "grid_bytes": sum(len(b) for b in bodies),
+            "rows": rows,
+            "cells": cells,
+            "stages": {}
+        }
+        for name, fn in stages.items():
+            with _quiet(verbose):
+                measured = _measure(fn, repeat)
+            seconds = measured["median_ms"] / 1000
+            measured["cells_per_s"] = round(cells / seconds) if seconds else None
+            measured["requests_per_s"] = round(len(provinces) / seconds, 1) if seconds else None
+            size_result["stages"][name] = measured
+        results.append(size_result)
+        _print_size(size_result)
+
+    mock.stop()
+    return {
+        "benchmark": "harga",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": results
+    }
+
+
+def _print_size(size_result):
+    print(f"\n{size_result['size']}: {size_result['provinces']} provinsi × {size_result['days']} hari, "
+          f"{size_result['grid_bytes'] / 1024:.0f} KiB grid, {size_result['cells']} sel")
+    print(f"  {'tahap':<18} {'median (ms)':>12} {'min (ms)':>10} {'peak (KiB)':>11} {'sel/s':>12}")
+    for name, m in size_result["stages"].items():
+        print(f"  {name:<18} {m['median_ms']:>12.2f} {m['min_ms']:>10.2f} "
+              f"{m['peak_kib']:>11.0f} {m['cells_per_s'] or 0:>12,}")
+
+
+def compare(old, new):
+    """Cetak rasio median lama / baru per ukuran dan tahap (>1 = lebih cepat)"""
+    old_by_size = {r["size"]: r for r in old["results"]}
+    print(f"\nPerbandingan {old.get('commit')} → {new.get('commit')} (speedup median, >1 lebih cepat)")
+    for result in new["results"]:
+        before = old_by_size.get(result["size"])
+        if before is None:
+            continue
+        parts = []
+        for name, m in result["stages"].items():
+            prev = before["stages"].get(name)
+            if prev and m["median_ms"]:
+                parts.append(f"{name} {prev['median_ms'] / m['median_ms']:.2f}x")
+        print(f"  {result['size']:<8} " + ", ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="daftar PROVINSIxHARI dipisah koma (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures", default=mock_fixtures.DEFAULT_DIR, help="folder fixture recorder")
+    parser.add_argument("--out", help="file hasil JSON (default: benchmarks/results/harga-<waktu>.json)")
+    parser.add_argument("--compare", help="file hasil JSON sebelumnya untuk dibandingkan")
+    parser.add_argument("--verbose", action="store_true", help="tampilkan log service")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(x) for x in size.split("x")) for size in args.sizes.split(",")]
+    report = run(sizes, args.repeat, args.fixtures, args.verbose)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"harga-{datetime.now():%Y%m%d-%H%M%S}.json")
+    folder = os.path.dirname(out)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
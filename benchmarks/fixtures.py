@@ -0,0 +1,56 @@
+"""
+benchmarks/fixtures.py
+Grid GetGridDataDaerah sintetis dengan bentuk yang sama seperti response BI
+(baris kategori level 1, baris komoditas level 2, satu key "D/M/YYYY" per tanggal)
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+KATEGORI = {
+    "Beras": ["Beras Kualitas Bawah I", "Beras Kualitas Bawah II", "Beras Kualitas Medium I",
+              "Beras Kualitas Medium II", "Beras Kualitas Super I", "Beras Kualitas Super II"],
+    "Daging Ayam": ["Daging Ayam Ras Segar"],
+    "Daging Sapi": ["Daging Sapi Kualitas 1", "Daging Sapi Kualitas 2"],
+    "Telur Ayam": ["Telur Ayam Ras Segar"],
+    "Bawang Merah": ["Bawang Merah Ukuran Sedang"],
+    "Bawang Putih": ["Bawang Putih Ukuran Sedang"],
+    "Cabai Merah": ["Cabai Merah Besar", "Cabai Merah Keriting "],
+    "Cabai Rawit": ["Cabai Rawit Hijau", "Cabai Rawit Merah"],
+    "Minyak Goreng": ["Minyak Goreng Curah", "Minyak Goreng Kemasan Bermerk 1",
+                      "Minyak Goreng Kemasan Bermerk 2"],
+    "Gula Pasir": ["Gula Pasir Kualitas Premium", "Gula Pasir Lokal"],
+}
+
+
+def synthetic_grid(n_days: int = 90, end_date: Optional[datetime] = None,
+                   seed: int = 14, empty_ratio: float = 0.3) -> Dict:
+    """
+    Buat satu response GetGridDataDaerah.
+    empty_ratio: proporsi sel "-" (akhir pekan / pasar tidak lapor)
+    """
+    rng = random.Random(seed)
+    end_date = end_date or datetime(2025, 12, 7)
+    dates = [end_date - timedelta(days=i) for i in range(n_days - 1, -1, -1)]
+    # BI mengirim tanggal tanpa leading zero untuk sebagian key
+    keys = [f"{d.day}/{d.month}/{d.year}" if d.day % 3 == 0 else d.strftime("%d/%m/%Y")
+            for d in dates]
+
+    rows: List[Dict] = []
+    no = 0
+    for kategori, komoditas in KATEGORI.items():
+        no += 1
+        rows.append({"no": str(no), "name": kategori, "level": 1})
+        for name in komoditas:
+            base = rng.randint(10, 120) * 1000
+            row = {"no": "", "name": name, "level": 2}
+            for key in keys:
+                if rng.random() < empty_ratio:
+                    row[key] = "-"
+                else:
+                    base = max(1000, base + rng.randint(-5, 5) * 50)
+                    row[key] = f"{base:,}"
+            rows.append(row)
+
+    return {"data": rows}
@@ -11,6 +11,89 @@ class Config:
     MYSQL_DB = os.getenv("MYSQLDATABASE", "railway")
     MYSQL_PORT = int(os.getenv("MYSQLPORT", "48397"))
     
+    # Pool koneksi MySQL (app/config/database.py), per worker process
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))                 # koneksi idle yang dipertahankan
+    DB_POOL_OVERFLOW = int(os.getenv("DB_POOL_OVERFLOW", "5"))         # koneksi tambahan saat ramai
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))        # detik menunggu koneksi bebas
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))        # detik, umur maksimal koneksi
+    DB_POOL_PING_IDLE = int(os.getenv("DB_POOL_PING_IDLE", "30"))      # detik idle sebelum di-ping
+    DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))     # detik
+    DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "500"))             # baris per batch executemany
+    DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))     # statement lebih lambat dicetak ke log
+    
+    # Bank Indonesia PIHPS API
+    BI_BASE_URL = os.getenv("BI_BASE_URL", "https://www.bi.go.id/hargapangan/WebSite")
+    BI_POOL_CONNECTIONS = int(os.getenv("BI_POOL_CONNECTIONS", "4"))   # jumlah host yang di-pool
+    BI_POOL_MAXSIZE = int(os.getenv("BI_POOL_MAXSIZE", "10"))          # koneksi keep-alive per host
+    BI_CONNECT_TIMEOUT = float(os.getenv("BI_CONNECT_TIMEOUT", "5"))
+    BI_READ_TIMEOUT = float(os.getenv("BI_READ_TIMEOUT", "15"))
+    BI_RETRIES = int(os.getenv("BI_RETRIES", "1"))                     # retry koneksi / 5xx, bukan read timeout
+    BI_STREAM_GRID = os.getenv("BI_STREAM_GRID", "true").lower() == "true"  # parse grid per chunk
+    BI_STREAM_CHUNK_SIZE = int(os.getenv("BI_STREAM_CHUNK_SIZE", "65536"))
+    BI_FANOUT_WORKERS = int(os.getenv("BI_FANOUT_WORKERS", "8"))       # <= BI_POOL_MAXSIZE
+    NASIONAL_DEADLINE = float(os.getenv("NASIONAL_DEADLINE", "20"))    # detik per request
+    
+    # Client asyncio (httpx) untuk fan-out banyak request ke BI dari satu worker
+    BI_ASYNC_ENABLED = os.getenv("BI_ASYNC_ENABLED", "true").lower() == "true"
+    BI_ASYNC_MAX_PER_HOST = int(os.getenv("BI_ASYNC_MAX_PER_HOST", "16"))  # request paralel per host
+    REGIONAL_WINDOW_DAYS = int(os.getenv("REGIONAL_WINDOW_DAYS", "14"))    # jendela grid per kabupaten
+    REGIONAL_DEADLINE = float(os.getenv("REGIONAL_DEADLINE", "20"))        # detik per request
+    
+    # Circuit breaker BI: open setelah N panggilan gagal / lambat berturut-turut
+    BI_BREAKER_THRESHOLD = int(os.getenv("BI_BREAKER_THRESHOLD", "5"))
+    BI_BREAKER_LATENCY_SLO = float(os.getenv("BI_BREAKER_LATENCY_SLO", "8"))   # detik
+    BI_BREAKER_RESET = float(os.getenv("BI_BREAKER_RESET", "30"))             # detik sebelum probe
+    BI_PROBE_TIMEOUT = float(os.getenv("BI_PROBE_TIMEOUT", "3"))              # detik, connect & read probe
+    LAST_GOOD_TTL = int(os.getenv("LAST_GOOD_TTL", str(7 * 86400)))           # detik, fallback terakhir
+    
+    # Price store lokal (SQLite) untuk data harga harian
+    PRICE_STORE_ENABLED = os.getenv("PRICE_STORE_ENABLED", "true").lower() == "true"
+    PRICE_STORE_PATH = os.getenv("PRICE_STORE_PATH", "data/harga_pangan.sqlite3")
+    PRICE_SYNC_INTERVAL = int(os.getenv("PRICE_SYNC_INTERVAL", "1800"))  # detik
+    SYNC_SETTLE_DAYS = int(os.getenv("SYNC_SETTLE_DAYS", "3"))           # hari terakhir yang masih bisa direvisi BI
+    SYNC_MERGE_GAP = int(os.getenv("SYNC_MERGE_GAP", "7"))               # celah (hari) yang ikut diambil saat menggabung rentang
+    SYNC_MAX_RANGE_DAYS = int(os.getenv("SYNC_MAX_RANGE_DAYS", "366"))   # panjang maksimal satu request grid
+    SYNC_EMPTY_MAX_BACKOFF = int(os.getenv("SYNC_EMPTY_MAX_BACKOFF", str(7 * 86400)))  # detik, retry tanggal kosong
+    SYNC_EMPTY_MAX_ATTEMPTS = int(os.getenv("SYNC_EMPTY_MAX_ATTEMPTS", "3"))  # percobaan sebelum tanggal lama kosong dianggap absent
+    
+    # Snapshot data master (provinsi, kabupaten, komoditas, jenis harga)
+    MASTER_SNAPSHOT_PATH = os.getenv("MASTER_SNAPSHOT_PATH", "data/master_snapshot.json")
+    MASTER_SNAPSHOT_TTL = int(os.getenv("MASTER_SNAPSHOT_TTL", str(7 * 24 * 3600)))  # detik
+    
+    # Jendela look-back adaptif untuk harga terbaru (7 → 21 → 63 → 90 hari)
+    LOOKBACK_MIN_DAYS = int(os.getenv("LOOKBACK_MIN_DAYS", "7"))
+    LOOKBACK_MAX_DAYS = int(os.getenv("LOOKBACK_MAX_DAYS", "90"))
+    LOOKBACK_FACTOR = int(os.getenv("LOOKBACK_FACTOR", "3"))
+    
+    # /harga/series
+    SERIES_DEFAULT_DAYS = int(os.getenv("SERIES_DEFAULT_DAYS", "365"))   # tanpa start_date
+    SERIES_MAX_DAYS = int(os.getenv("SERIES_MAX_DAYS", "730"))           # rentang maksimal
+    SERIES_MAX_POINTS = int(os.getenv("SERIES_MAX_POINTS", "2000"))      # batas parameter points
+    STATS_MIN_DAYS_30 = int(os.getenv("STATS_MIN_DAYS_30", "15"))        # hari berharga minimal untuk statistik 30 hari
+    
+    # Backend cache: "sqlite" = satu cache bersama semua worker per host, "memory" = per worker
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite").lower()
+    CACHE_PATH = os.getenv("CACHE_PATH", "data/shared_cache.sqlite3")
+    
+    # Cache halaman katalog produk (popular / all-products)
+    KATALOG_CACHE_TTL = int(os.getenv("KATALOG_CACHE_TTL", "60"))     # detik
+    PRODUK_PAGE_SIZE = int(os.getenv("PRODUK_PAGE_SIZE", "20"))       # default limit /api/produk & /api/all-products
+    PRODUK_PAGE_MAX = int(os.getenv("PRODUK_PAGE_MAX", "100"))        # limit maksimal per halaman
+    
+    # Cache identitas user (X-User-Id → id, role, nama)
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "30"))         # detik
+    IDENTITY_CACHE_MAXSIZE = int(os.getenv("IDENTITY_CACHE_MAXSIZE", "4096"))
+    
+    # Token sesi (HMAC dengan SECRET_KEY), diterbitkan di /login dan /login-phone
+    AUTH_TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL", str(7 * 86400)))      # detik
+    AUTH_REVOCATION_MAXSIZE = int(os.getenv("AUTH_REVOCATION_MAXSIZE", "100000"))
+    AUTH_ALLOW_USER_ID_HEADER = os.getenv("AUTH_ALLOW_USER_ID_HEADER", "true").lower() == "true"  # X-User-Id lama, matikan setelah semua client kirim token
+    
+    # Cache response /harga (TTL + stale-while-revalidate)
+    HARGA_CACHE_TTL = int(os.getenv("HARGA_CACHE_TTL", "3600"))            # detik, fresh
+    HARGA_CACHE_STALE_TTL = int(os.getenv("HARGA_CACHE_STALE_TTL", "86400"))  # detik, boleh stale
+    HARGA_CACHE_MAXSIZE = int(os.getenv("HARGA_CACHE_MAXSIZE", "512"))
+    
     # Debug
     @staticmethod
     def print_debug():
@@ -0,0 +1,17 @@
+"""
+tests/conftest.py
+Env untuk test: cache & store SQLite di folder sementara, tanpa BI / MySQL
+"""
+
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="simbok-test-")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("CACHE_PATH", os.path.join(_tmp, "shared_cache.sqlite3"))
+os.environ.setdefault("PRICE_STORE_PATH", os.path.join(_tmp, "harga_pangan.sqlite3"))
+os.environ.setdefault("MASTER_SNAPSHOT_PATH", os.path.join(_tmp, "master_snapshot.json"))
+os.environ.setdefault("BI_BASE_URL", "http://127.0.0.1:9")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,113 @@
+"""
+tests/test_circuit_breaker.py
+Transisi state circuit breaker: closed → open → half-open → closed / open
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def _fail():
+    raise RuntimeError("upstream error")
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def _breaker(probe=lambda: None, **kwargs):
+    options = {"threshold": 3, "latency_slo": 1.0, "reset_timeout": 0.02, "max_reset_timeout": 0.05}
+    options.update(kwargs)
+    return CircuitBreaker("test", probe=probe, **options)
+
+
+def test_opens_after_threshold_consecutive_failures():
+    breaker = _breaker(reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+    assert breaker.state == CLOSED
+
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+    stats = breaker.stats()
+    assert (stats["failures"], stats["rejected"], stats["times_opened"]) == (3, 1, 1)
+
+
+def test_success_resets_streak():
+    breaker = _breaker()
+    for _ in range(5):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+        assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_count_as_bad():
+    breaker = _breaker(latency_slo=0.0, reset_timeout=60)
+    for _ in range(3):
+        assert breaker.call(lambda: time.sleep(0.001) or "ok") == "ok"
+    assert breaker.state == OPEN
+    assert breaker.stats()["slow_calls"] == 3
+
+
+def test_probe_success_closes():
+    breaker = _breaker()
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+    assert _wait_for(lambda: breaker.state == CLOSED)
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.stats()["bad_streak"] == 0
+
+
+def test_probe_failure_stays_open_until_probe_succeeds():
+    healthy = threading.Event()
+
+    def probe():
+        if not healthy.is_set():
+            raise RuntimeError("masih down")
+
+    breaker = _breaker(probe=probe)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+    assert _wait_for(lambda: breaker.stats()["probe_failures"] >= 2)
+    assert breaker.state != CLOSED
+
+    healthy.set()
+    assert _wait_for(lambda: breaker.state == CLOSED)
+
+
+def test_async_calls_share_state():
+    breaker = _breaker(reset_timeout=60)
+
+    async def fail():
+        raise RuntimeError("upstream error")
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await breaker.call_async(fail)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call_async(fail)
+
+    asyncio.run(run())
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
@@ -0,0 +1,112 @@
+"""
+tests/test_keyset.py
+Cursor keyset: round-trip, validasi, dan paging NEXT / PREV (termasuk NULL)
+di SQLite, yang mengurutkan NULL sebagai nilai terkecil seperti MySQL
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.services import keyset
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=" "))
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE produk (id INTEGER PRIMARY KEY, tanggal_upload TEXT, harga_per_kg NUMERIC)")
+    base = datetime(2026, 1, 1, 8, 0, 0)
+    rows = []
+    for i in range(1, 24):
+        # Beberapa tanggal & harga kembar, beberapa tanggal NULL
+        tanggal = None if i % 7 == 0 else base + timedelta(days=i // 3)
+        rows.append((i, tanggal, Decimal(10000 + (i % 5) * 500)))
+    conn.executemany("INSERT INTO produk VALUES (?, ?, ?)", rows)
+    return conn
+
+
+def _query(conn, sort, cursor, limit):
+    condition, params, order_by, direction = keyset.seek(sort, cursor)
+    sql = "SELECT p.id, p.tanggal_upload, p.harga_per_kg FROM produk p"
+    if condition:
+        sql += f" WHERE {condition}"
+    sql += f" ORDER BY {order_by} LIMIT ?"
+    raw = conn.execute(sql.replace("%s", "?"), [*params, limit + 1]).fetchall()
+    rows = [{"id": r[0],
+             "tanggal_upload": datetime.fromisoformat(r[1]) if r[1] else None,
+             "harga_per_kg": Decimal(str(r[2]))} for r in raw]
+    return keyset.page(sort, cursor, direction, rows, limit)
+
+
+def _expected(conn, sort):
+    column, _, order = keyset.SORTS[sort]
+    sql = f"SELECT p.id FROM produk p ORDER BY {column} {order}, p.id {order}"
+    return [r[0] for r in conn.execute(sql)]
+
+
+def test_cursor_round_trip():
+    row = {"id": 42, "tanggal_upload": datetime(2026, 3, 4, 5, 6, 7), "harga_per_kg": Decimal("12500.50")}
+    cursor = keyset.encode("terbaru", keyset.NEXT, row)
+    assert keyset.decode(cursor, "terbaru") == (keyset.NEXT, row["tanggal_upload"], 42)
+
+    cursor = keyset.encode("termurah", keyset.PREV, row)
+    assert keyset.decode(cursor, "termurah") == (keyset.PREV, Decimal("12500.50"), 42)
+
+
+def test_cursor_null_value():
+    cursor = keyset.encode("terbaru", keyset.NEXT, {"id": 3, "tanggal_upload": None})
+    assert keyset.decode(cursor, "terbaru") == (keyset.NEXT, None, 3)
+
+
+@pytest.mark.parametrize("cursor", ["", "bukan-base64!!", "e30", "eyJzIjoieCJ9"])
+def test_cursor_invalid(cursor):
+    with pytest.raises(ValueError):
+        keyset.decode(cursor, "terbaru")
+
+
+def test_cursor_other_sort_rejected():
+    cursor = keyset.encode("termurah", keyset.NEXT, {"id": 1, "harga_per_kg": Decimal("1")})
+    with pytest.raises(ValueError):
+        keyset.decode(cursor, "termahal")
+
+
+@pytest.mark.parametrize("sort", sorted(keyset.SORTS))
+def test_next_pages_cover_all_rows_once(db, sort):
+    seen, cursor = [], None
+    while True:
+        rows, next_cursor, prev_cursor = _query(db, sort, cursor, 4)
+        assert (prev_cursor is None) == (cursor is None)
+        seen.extend(r["id"] for r in rows)
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    assert seen == _expected(db, sort)
+
+
+@pytest.mark.parametrize("sort", sorted(keyset.SORTS))
+def test_prev_pages_walk_back(db, sort):
+    pages, cursor = [], None
+    while True:
+        rows, next_cursor, _ = _query(db, sort, cursor, 5)
+        pages.append([r["id"] for r in rows])
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+
+    # Dari halaman terakhir mundur dengan prev_cursor sampai halaman pertama
+    _, _, prev_cursor = _query(db, sort, cursor, 5)
+    back = []
+    while prev_cursor:
+        rows, next_cursor, prev_cursor = _query(db, sort, prev_cursor, 5)
+        assert next_cursor is not None
+        back.append([r["id"] for r in rows])
+    assert back == pages[-2::-1]
+
+
+def test_empty_page():
+    assert keyset.page("terbaru", None, keyset.NEXT, [], 10) == ([], None, None)
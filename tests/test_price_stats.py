@@ -0,0 +1,67 @@
+"""
+tests/test_price_stats.py
+Statistik rolling 7/30 hari: perhitungan dan pembaruan saat ingest
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from config import Config
+from app.services import price_stats, price_store
+
+KEY = ("14", "", "1")
+
+
+def _days(n, start=date(2026, 9, 1)):
+    return [(start + timedelta(days=i)).isoformat() for i in range(n)]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "PRICE_STORE_PATH", str(tmp_path / "store.sqlite3"))
+    return price_store
+
+
+def test_compute_windows():
+    points = [(d, 100.0 + i) for i, d in enumerate(_days(30))]
+    stats = price_stats.compute(points)
+    assert stats["as_of"] == points[-1][0]
+    assert stats["n_30"] == 30
+    assert (stats["min_7"], stats["max_7"]) == (123.0, 129.0)
+    assert stats["mean_7"] == 126.0
+    assert stats["change_30"] == 29.0
+    assert stats["volatility_30"] is not None
+
+
+def test_compute_single_point():
+    stats = price_stats.compute([("2026-09-01", 100.0)])
+    assert stats["change_7"] is None
+    assert stats["volatility_30"] is None
+    assert stats["n_30"] == 1
+
+
+def test_read_hides_short_30_day_window(store):
+    store.ingest(KEY, [("Beras", d, 12000.0) for d in _days(Config.STATS_MIN_DAYS_30 - 1)])
+    stats = store.rolling_stats(KEY)["Beras"]
+    assert stats["mean_7"] == 12000.0
+    assert stats["mean_30"] is None and stats["days_30"] == Config.STATS_MIN_DAYS_30 - 1
+
+
+def test_reingest_same_prices_skips_recompute(store, monkeypatch):
+    points = [("Beras", d, 12000.0 + i) for i, d in enumerate(_days(20))]
+    assert store.ingest(KEY, points) == 20
+
+    calls = []
+    original = price_stats.update
+    monkeypatch.setattr(price_stats, "update",
+                        lambda conn, key, touched: calls.append(dict(touched)) or original(conn, key, touched))
+
+    assert store.ingest(KEY, points[-3:]) == 0
+    assert calls == [{}]
+
+    # Revisi BI pada hari terakhir: hanya komoditas itu yang dihitung ulang
+    revised = points[-1][:2] + (15000.0,)
+    assert store.ingest(KEY, [revised]) == 1
+    assert calls[-1] == {"Beras": revised[1]}
+    assert store.rolling_stats(KEY)["Beras"]["max_7"] == 15000.0
@@ -0,0 +1,61 @@
+"""
+tests/test_session_token.py
+Token sesi: terbitkan, verifikasi, tolak token rusak / kadaluarsa / dicabut
+"""
+
+import time
+
+from config import Config
+from app.services import session_token
+
+USER = {"id": 7, "role": "pembeli", "is_verified_seller": 0}
+
+
+def test_issue_and_verify():
+    token, exp = session_token.issue(USER)
+    claims = session_token.verify(token)
+    assert claims["uid"] == 7 and claims["role"] == "pembeli" and claims["seller"] is False
+    assert claims["exp"] == exp
+
+
+def test_petani_is_seller():
+    token, _ = session_token.issue({"id": 8, "role": "petani"})
+    assert session_token.verify(token)["seller"] is True
+
+
+def test_tampered_payload_rejected():
+    token, _ = session_token.issue(USER)
+    other, _ = session_token.issue({"id": 9, "role": "admin"})
+    forged = other.split(".")[0] + "." + token.split(".")[1]
+    assert session_token.verify(forged) is None
+
+
+def test_malformed_rejected():
+    for token in ("", "abc", "a.b.c", None):
+        assert session_token.verify(token) is None
+
+
+def test_expired_rejected(monkeypatch):
+    token, _ = session_token.issue(USER)
+    now = time.time()
+    monkeypatch.setattr(session_token.time, "time", lambda: now + Config.AUTH_TOKEN_TTL + 1)
+    assert session_token.verify(token) is None
+
+
+def test_revoke_rejects_older_tokens_only(monkeypatch):
+    clock = [time.time()]
+    monkeypatch.setattr(session_token.time, "time", lambda: clock[0])
+    user = {"id": 11, "role": "pembeli"}
+
+    old, _ = session_token.issue(user)
+    clock[0] += 1
+    session_token.revoke_user(11)
+    assert session_token.verify(old) is None
+
+    clock[0] += 1
+    new, _ = session_token.issue(user)
+    assert session_token.verify(new) is not None
+
+    # User lain tidak ikut dicabut
+    other, _ = session_token.issue({"id": 12, "role": "pembeli"})
+    assert session_token.verify(other) is not None
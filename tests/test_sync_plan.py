@@ -0,0 +1,117 @@
+"""
+tests/test_sync_plan.py
+Status sel sinkronisasi dan perencana rentang request BI
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from config import Config
+from app.services import sync_plan
+
+KEY = ("14", "", "1")
+NOW = 1_800_000_000.0
+
+
+def _day(offset: int) -> str:
+    """Tanggal `offset` hari sebelum hari ini (jauh sebelum SYNC_SETTLE_DAYS)"""
+    return (date.today() - timedelta(days=offset)).isoformat()
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(sync_plan.SCHEMA)
+    return conn
+
+
+def _set(conn, tanggal, status, checked_at=NOW, attempts=0, retry_at=None):
+    conn.execute("INSERT OR REPLACE INTO sync_cells VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                 (*KEY, tanggal, status, checked_at, attempts, retry_at))
+
+
+def _status(conn, tanggal):
+    return conn.execute("SELECT status FROM sync_cells WHERE tanggal = ?", (tanggal,)).fetchone()[0]
+
+
+def test_unknown_range_is_one_request(conn):
+    assert sync_plan.plan(conn, KEY, _day(40), _day(30), now=NOW) == [(_day(40), _day(30))]
+
+
+def test_future_dates_not_planned(conn):
+    future = (date.today() + timedelta(days=5)).isoformat()
+    assert sync_plan.plan(conn, KEY, _day(2), future, now=NOW) == [(_day(2), date.today().isoformat())]
+
+
+def test_complete_range_needs_nothing(conn):
+    days = [_day(i) for i in range(40, 29, -1)]
+    sync_plan.record(conn, KEY, days[0], days[-1], days, now=NOW)
+    assert {_status(conn, d) for d in days} == {sync_plan.COMPLETE}
+    assert sync_plan.plan(conn, KEY, days[0], days[-1], now=NOW) == []
+
+
+def test_gaps_before_later_data_become_absent(conn):
+    days = [_day(i) for i in range(40, 29, -1)]
+    with_data = days[:3] + days[5:]
+    sync_plan.record(conn, KEY, days[0], days[-1], with_data, now=NOW)
+    assert _status(conn, days[3]) == _status(conn, days[4]) == sync_plan.ABSENT
+    assert sync_plan.plan(conn, KEY, days[0], days[-1], now=NOW + 10 ** 7) == []
+
+
+def test_settled_empty_tail_gives_up_after_max_attempts(conn):
+    day = _day(30)
+    for attempt in range(1, Config.SYNC_EMPTY_MAX_ATTEMPTS + 1):
+        sync_plan.record(conn, KEY, day, day, [], now=NOW + attempt)
+        expected = sync_plan.ABSENT if attempt == Config.SYNC_EMPTY_MAX_ATTEMPTS else sync_plan.EMPTY
+        assert _status(conn, day) == expected
+    assert sync_plan.plan(conn, KEY, day, day, now=NOW + 10 ** 7) == []
+
+
+def test_empty_backoff(conn):
+    day = _day(30)
+    sync_plan.record(conn, KEY, day, day, [], now=NOW)
+    assert sync_plan.plan(conn, KEY, day, day, now=NOW + 1) == []
+    assert sync_plan.plan(conn, KEY, day, day, now=NOW + Config.PRICE_SYNC_INTERVAL) == [(day, day)]
+
+
+def test_pending_refetched_after_interval(conn):
+    day = _day(0)
+    sync_plan.record(conn, KEY, day, day, [day], now=NOW)
+    assert _status(conn, day) == sync_plan.PENDING
+    assert sync_plan.plan(conn, KEY, day, day, now=NOW + 1) == []
+    assert sync_plan.plan(conn, KEY, day, day, now=NOW + Config.PRICE_SYNC_INTERVAL) == [(day, day)]
+
+
+def test_retries_do_not_merge_across_complete_days(conn):
+    days = [_day(i) for i in range(40, 29, -1)]
+    for d in days:
+        _set(conn, d, sync_plan.COMPLETE)
+    for d in (days[2], days[6]):
+        _set(conn, d, sync_plan.EMPTY, attempts=1, retry_at=NOW - 1)
+    assert sync_plan.plan(conn, KEY, days[0], days[-1], now=NOW) == [(days[2], days[2]), (days[6], days[6])]
+
+
+def test_unknown_end_pulls_gap_into_one_request(conn):
+    days = [_day(i) for i in range(40, 29, -1)]
+    for d in days:
+        _set(conn, d, sync_plan.COMPLETE)
+    _set(conn, days[2], sync_plan.EMPTY, attempts=1, retry_at=NOW - 1)
+    conn.execute("DELETE FROM sync_cells WHERE tanggal = ?", (days[6],))
+    assert sync_plan.plan(conn, KEY, days[0], days[-1], now=NOW) == [(days[2], days[6])]
+
+
+def test_gap_wider_than_merge_gap_splits(conn):
+    first, last = _day(60), _day(60 - Config.SYNC_MERGE_GAP - 2)
+    for i in range(60, 60 - Config.SYNC_MERGE_GAP - 3, -1):
+        _set(conn, _day(i), sync_plan.COMPLETE)
+    conn.execute("DELETE FROM sync_cells WHERE tanggal IN (?, ?)", (first, last))
+    assert sync_plan.plan(conn, KEY, first, last, now=NOW) == [(first, first), (last, last)]
+
+
+def test_summary_counts(conn):
+    _set(conn, _day(40), sync_plan.COMPLETE)
+    _set(conn, _day(39), sync_plan.ABSENT)
+    assert sync_plan.summary(conn, KEY) == {"complete": 1, "pending": 0, "empty": 0, "absent": 1}
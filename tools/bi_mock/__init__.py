@@ -0,0 +1,4 @@
+"""
+tools/bi_mock
+Recorder dan server replay offline untuk API BI (PIHPS)
+"""
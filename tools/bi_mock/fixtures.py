@@ -0,0 +1,150 @@
+"""
+tools/bi_mock/fixtures.py
+Format file fixture BI dan lookup untuk replay
+
+Satu file JSON per request yang direkam:
+    {
+        "path": "/TabelHarga/GetGridDataDaerah",
+        "params": {...},
+        "status": 200,
+        "elapsed_ms": 812.4,
+        "recorded_at": "2026-10-17T08:00:00",
+        "response": <body JSON dari BI>
+    }
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DEFAULT_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+GRID = "GetGridDataDaerah"
+ENDPOINTS = (GRID, "GetProvinceAll", "GetRegencyAll", "GetCommoditiesTree", "GetType")
+
+# Parameter yang menentukan isi response (tanggal grid ditangani terpisah)
+KEY_PARAMS = {
+    GRID: ("province_id", "regency_id", "price_type_id"),
+    "GetRegencyAll": ("ref_prov_id",),
+}
+
+
+def endpoint_of(path: str) -> str:
+    return path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def fixture_key(endpoint: str, params: Dict) -> str:
+    """Key lookup: endpoint + parameter penentu, contoh GetGridDataDaerah__province_id=14__..."""
+    parts = [endpoint] + [f"{p}={params.get(p) or ''}" for p in KEY_PARAMS.get(endpoint, ())]
+    return "__".join(parts)
+
+
+def filename_for(endpoint: str, params: Dict) -> str:
+    name = fixture_key(endpoint, params)
+    if endpoint == GRID:
+        name += f"__{params.get('start_date')}__{params.get('end_date')}"
+    return re.sub(r"[^A-Za-z0-9_=.-]", "_", name) + ".json"
+
+
+def save(folder: str, path: str, params: Dict, status: int,
+         elapsed_ms: float, response) -> str:
+    os.makedirs(folder, exist_ok=True)
+    file_path = os.path.join(folder, filename_for(endpoint_of(path), params))
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "path": path,
+            "params": params,
+            "status": status,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "response": response
+        }, f, ensure_ascii=False)
+    return file_path
+
+
+def load_all(folder: str) -> Dict[str, List[Dict]]:
+    """fixture_key → daftar fixture (grid bisa punya beberapa rentang tanggal)"""
+    index: Dict[str, List[Dict]] = {}
+    if not os.path.isdir(folder):
+        return index
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(folder, name), encoding="utf-8") as f:
+            fixture = json.load(f)
+        key = fixture_key(endpoint_of(fixture["path"]), fixture.get("params") or {})
+        index.setdefault(key, []).append(fixture)
+    return index
+
+# -------------------------------------------------
+# 🔹 GRID: GESER TANGGAL KE RENTANG YANG DIMINTA
+# -------------------------------------------------
+
+def _parse_key(key: str) -> Optional[datetime]:
+    parts = key.split("/")
+    if len(parts) != 3 or not all(p.isdigit() for p in parts):
+        return None
+    day, month, year = (int(p) for p in parts)
+    try:
+        return datetime(year, month, day)
+    except ValueError:
+        return None
+
+
+def _format_key(original: str, d: datetime) -> str:
+    """Pertahankan gaya key asli (dengan / tanpa leading zero)"""
+    day, month, _ = original.split("/")
+    if len(day) == 2 and len(month) == 2:
+        return d.strftime("%d/%m/%Y")
+    return f"{d.day}/{d.month}/{d.year}"
+
+
+def pick_grid(fixtures: List[Dict], start: str, end: str) -> Dict:
+    """Fixture grid dengan rentang terpanjang yang paling mendekati permintaan"""
+    wanted = (datetime.strptime(end, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days
+
+    def span(fixture):
+        params = fixture["params"]
+        return (datetime.strptime(params["end_date"], "%Y-%m-%d")
+                - datetime.strptime(params["start_date"], "%Y-%m-%d")).days
+
+    covering = [f for f in fixtures if span(f) >= wanted]
+    if covering:
+        return min(covering, key=span)
+    return max(fixtures, key=span)
+
+
+def redate_grid(fixture: Dict, start: str, end: str) -> Dict:
+    """
+    Geser tanggal grid rekaman supaya tanggal terakhirnya = end, lalu potong
+    ke [start, end]. Replay jadi deterministik berapapun tanggal hari ini.
+    """
+    response = fixture["response"]
+    rows = response["data"] if isinstance(response, dict) else response
+    start_d = datetime.strptime(start, "%Y-%m-%d")
+    end_d = datetime.strptime(end, "%Y-%m-%d")
+    offset = end_d - datetime.strptime(fixture["params"]["end_date"], "%Y-%m-%d")
+
+    new_keys = {}
+    out_rows = []
+    for row in rows:
+        new_row = {}
+        for key, value in row.items():
+            if key not in new_keys:
+                d = _parse_key(key)
+                if d is None:
+                    new_keys[key] = key
+                else:
+                    shifted = d + offset
+                    new_keys[key] = (_format_key(key, shifted)
+                                     if start_d <= shifted <= end_d else None)
+            new_key = new_keys[key]
+            if new_key is not None:
+                new_row[new_key] = value
+        out_rows.append(new_row)
+
+    if isinstance(response, dict):
+        return {**response, "data": out_rows}
+    return out_rows
@@ -0,0 +1,93 @@
+"""
+tools/bi_mock/recorder.py
+Rekam response asli API BI (PIHPS) ke file fixture untuk replay offline
+
+Jalankan dari root project (butuh akses ke bi.go.id):
+    python -m tools.bi_mock.recorder
+    python -m tools.bi_mock.recorder --provinces 14,31 --price-types 1,2 --days 30,365
+    python -m tools.bi_mock.recorder --provinces all --days 365 --delay 1
+
+Request dikirim berurutan dengan jeda (--delay) supaya tidak membebani bi.go.id.
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+from config import Config
+from tools.bi_mock import fixtures
+
+
+def _record(session: requests.Session, folder: str, path: str, params: dict):
+    started = time.perf_counter()
+    r = session.get(f"{Config.BI_BASE_URL}{path}", params=params,
+                    timeout=(Config.BI_CONNECT_TIMEOUT, 120))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    r.raise_for_status()
+    body = r.json()
+    file_path = fixtures.save(folder, path, params, r.status_code, elapsed_ms, body)
+    print(f"[Recorder] {path} {params or ''} → {file_path} "
+          f"({len(r.content) / 1024:.0f} KiB, {elapsed_ms:.0f} ms)")
+    return body
+
+
+def _province_ids(provinces_body) -> list:
+    data = provinces_body.get("data") if isinstance(provinces_body, dict) else provinces_body
+    ids = []
+    for item in data or []:
+        if isinstance(item, dict):
+            province_id = item.get("province_id") or item.get("id") or item.get("ProvinceID")
+            if province_id is not None:
+                ids.append(str(province_id))
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=fixtures.DEFAULT_DIR, help="folder fixture")
+    parser.add_argument("--provinces", default="14",
+                        help="ID provinsi dipisah koma, atau 'all' (default: 14)")
+    parser.add_argument("--price-types", default="1", help="jenis harga dipisah koma (default: 1)")
+    parser.add_argument("--days", default="30,365", help="panjang grid (hari) dipisah koma")
+    parser.add_argument("--end-date", help="tanggal akhir grid YYYY-MM-DD (default: hari ini)")
+    parser.add_argument("--delay", type=float, default=0.5, help="jeda antar request (detik)")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    end = datetime.strptime(args.end_date, "%Y-%m-%d") if args.end_date else datetime.now()
+
+    # Data master
+    provinces_body = _record(session, args.out, "/Home/GetProvinceAll", {})
+    _record(session, args.out, "/Home/GetCommoditiesTree", {})
+    _record(session, args.out, "/Home/GetType", {})
+
+    province_ids = (_province_ids(provinces_body) if args.provinces == "all"
+                    else [p.strip() for p in args.provinces.split(",") if p.strip()])
+
+    for province_id in province_ids:
+        time.sleep(args.delay)
+        _record(session, args.out, "/Home/GetRegencyAll", {"ref_prov_id": province_id})
+
+        for price_type_id in args.price_types.split(","):
+            for days in args.days.split(","):
+                time.sleep(args.delay)
+                params = {
+                    "price_type_id": price_type_id.strip(),
+                    "comcat_id": "",
+                    "province_id": province_id,
+                    "regency_id": "",
+                    "market_id": "",
+                    "tipe_laporan": "1",
+                    "start_date": (end - timedelta(days=int(days))).strftime("%Y-%m-%d"),
+                    "end_date": end.strftime("%Y-%m-%d")
+                }
+                try:
+                    _record(session, args.out, "/TabelHarga/GetGridDataDaerah", params)
+                except Exception as e:
+                    print(f"[Recorder] Gagal merekam grid provinsi {province_id}: {e}")
+
+
+if __name__ == "__main__":
+    main()
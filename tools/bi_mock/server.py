@@ -0,0 +1,272 @@
+"""
+tools/bi_mock/server.py
+Server replay lokal pengganti API BI (PIHPS), tanpa jaringan
+
+Menyajikan fixture hasil recorder dengan latency, jitter dan error yang bisa
+diatur, supaya parsing, cache dan fan-out bisa diukur secara deterministik.
+
+Jalankan dari root project:
+    python -m tools.bi_mock.server --port 8099 --latency 0.3 --jitter 0.1
+    python -m tools.bi_mock.server --synthetic --error-rate 0.05 --error-status 503
+
+Lalu arahkan aplikasi ke server ini:
+    BI_BASE_URL=http://127.0.0.1:8099 gunicorn app:app ...
+
+Grid direkam pada tanggal tertentu, jadi saat replay tanggalnya digeser supaya
+berakhir di end_date yang diminta. Dengan --synthetic, endpoint / provinsi
+yang tidak punya fixture dijawab dengan data sintetis (benchmarks.fixtures).
+Statistik request: GET /__mock__/stats
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fixtures import KATEGORI, synthetic_grid
+from tools.bi_mock import fixtures
+
+PROVINCE_COUNT = 34
+
+
+class MockBI:
+    """
+    State server replay. Atribut perilaku boleh diubah saat server berjalan:
+      latency      : detik per request
+      jitter       : ± detik acak (uniform) di atas latency
+      error_rate   : peluang request dijawab error_status
+      error_status : status HTTP untuk error yang disuntikkan
+      slow_rate    : peluang request ditahan slow_seconds (memicu timeout klien)
+    """
+
+    def __init__(self, fixture_dir: str = fixtures.DEFAULT_DIR, synthetic: bool = False,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, slow_rate: float = 0.0, slow_seconds: float = 30.0,
+                 seed: int = 14):
+        self.index = fixtures.load_all(fixture_dir)
+        self.synthetic = synthetic
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._stats = {"requests": 0, "errors_injected": 0, "slow_injected": 0,
+                       "not_found": 0, "by_endpoint": {}}
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    # -------------------------------------------------
+    # 🔹 PERILAKU (LATENCY / ERROR)
+    # -------------------------------------------------
+
+    def plan(self, endpoint: str):
+        """Tentukan (delay, fault) untuk satu request; fault: None / "error" / "slow" """
+        with self._lock:
+            self._stats["requests"] += 1
+            by_endpoint = self._stats["by_endpoint"]
+            by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            roll = self._rng.random()
+            if roll < self.error_rate:
+                self._stats["errors_injected"] += 1
+                return delay, "error"
+            if roll < self.error_rate + self.slow_rate:
+                self._stats["slow_injected"] += 1
+                return delay, "slow"
+            return delay, None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "by_endpoint": dict(self._stats["by_endpoint"]),
+                "fixtures": sum(len(v) for v in self.index.values()),
+                "latency": self.latency,
+                "jitter": self.jitter,
+                "error_rate": self.error_rate,
+                "slow_rate": self.slow_rate
+            }
+
+    def count_not_found(self) -> None:
+        with self._lock:
+            self._stats["not_found"] += 1
+
+    # -------------------------------------------------
+    # 🔹 ISI RESPONSE
+    # -------------------------------------------------
+
+    def body_for(self, endpoint: str, params: Dict) -> Optional[bytes]:
+        """Body JSON (bytes) untuk request, None kalau tidak ada fixture"""
+        cache_key = fixtures.fixture_key(endpoint, params)
+        if endpoint == fixtures.GRID:
+            cache_key += f"__{params.get('start_date')}__{params.get('end_date')}"
+
+        with self._lock:
+            body = self._bodies.get(cache_key)
+            if body is not None:
+                self._bodies.move_to_end(cache_key)
+                return body
+
+        payload = self._payload(endpoint, params)
+        if payload is None:
+            return None
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+        with self._lock:
+            self._bodies[cache_key] = body
+            while len(self._bodies) > 256:
+                self._bodies.popitem(last=False)
+        return body
+
+    def _payload(self, endpoint: str, params: Dict):
+        recorded = self.index.get(fixtures.fixture_key(endpoint, params))
+        if endpoint == fixtures.GRID:
+            start, end = params.get("start_date"), params.get("end_date")
+            if not (start and end):
+                return None
+            if recorded:
+                return fixtures.redate_grid(fixtures.pick_grid(recorded, start, end), start, end)
+        elif recorded:
+            return recorded[-1]["response"]
+
+        if self.synthetic:
+            return _synthetic_payload(endpoint, params)
+        return None
+
+    # -------------------------------------------------
+    # 🔹 SERVER
+    # -------------------------------------------------
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "MockBI":
+        """Jalankan server di thread background (port 0 = pilih port bebas)"""
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.mock = self
+        threading.Thread(target=self.server.serve_forever, name="bi-mock", daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header dan body dikirim dengan write terpisah; tanpa TCP_NODELAY, Nagle +
+    # delayed ACK menambah ~40 ms per request keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        mock: MockBI = self.server.mock
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+
+        if url.path == "/__mock__/stats":
+            return self._send(200, json.dumps(mock.stats()).encode("utf-8"))
+
+        endpoint = fixtures.endpoint_of(url.path)
+        delay, fault = mock.plan(endpoint)
+        if delay:
+            time.sleep(delay)
+        if fault == "error":
+            return self._send(mock.error_status, b'{"error": "injected"}')
+        if fault == "slow":
+            time.sleep(mock.slow_seconds)
+
+        body = mock.body_for(endpoint, params)
+        if body is None:
+            mock.count_not_found()
+            return self._send(404, b'{"error": "fixture tidak ditemukan"}')
+        self._send(200, body)
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# -------------------------------------------------
+# 🔹 DATA SINTETIS (TANPA FIXTURE)
+# -------------------------------------------------
+
+def _synthetic_payload(endpoint: str, params: Dict):
+    if endpoint == "GetProvinceAll":
+        return {"data": [{"province_id": str(i), "province_name": f"Provinsi {i}"}
+                         for i in range(1, PROVINCE_COUNT + 1)]}
+    if endpoint == "GetRegencyAll":
+        province_id = params.get("ref_prov_id") or "0"
+        return {"data": [{"regency_id": f"{province_id}{i:02d}", "regency_name": f"Kabupaten {i}"}
+                         for i in range(1, 11)]}
+    if endpoint == "GetType":
+        return {"data": [{"price_type_id": i, "price_type_name": name} for i, name in enumerate(
+            ["Pasar Tradisional", "Pasar Modern", "Pedagang Besar", "Produsen"], start=1)]}
+    if endpoint == "GetCommoditiesTree":
+        tree = []
+        for i, (kategori, komoditas) in enumerate(KATEGORI.items(), start=1):
+            tree.append({
+                "TreeID": f"cat_{i}", "TreeName": kategori, "ParentID": None,
+                "items": [{"TreeID": f"com_{i}_{j}", "TreeName": name.strip(), "ParentID": f"cat_{i}"}
+                          for j, name in enumerate(komoditas, start=1)]
+            })
+        return {"data": tree}
+    if endpoint == fixtures.GRID:
+        start = datetime.strptime(params["start_date"], "%Y-%m-%d")
+        end = datetime.strptime(params["end_date"], "%Y-%m-%d")
+        seed = int(params.get("province_id") or 0) * 100 + int(params.get("price_type_id") or 1)
+        seed = seed * 1000 + int(params.get("regency_id") or 0) % 1000
+        return synthetic_grid(n_days=(end - start).days + 1, end_date=end, seed=seed)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=fixtures.DEFAULT_DIR, help="folder fixture recorder")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="detik per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± detik acak")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="peluang error (0-1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="peluang request sangat lambat")
+    parser.add_argument("--slow-seconds", type=float, default=30.0)
+    parser.add_argument("--synthetic", action="store_true",
+                        help="jawab dengan data sintetis kalau fixture tidak ada")
+    parser.add_argument("--seed", type=int, default=14)
+    args = parser.parse_args()
+
+    mock = MockBI(args.fixtures, synthetic=args.synthetic, latency=args.latency,
+                  jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status,
+                  slow_rate=args.slow_rate, slow_seconds=args.slow_seconds, seed=args.seed)
+    print(f"[BI Mock] {mock.stats()['fixtures']} fixture dimuat dari {args.fixtures}"
+          f"{' (+ sintetis)' if args.synthetic else ''}")
+    mock.start(args.host, args.port)
+    print(f"[BI Mock] Siap di {mock.url}  →  BI_BASE_URL={mock.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()